@@ -0,0 +1,180 @@
+"""
+Write-behind activity log.
+
+``record`` (behind ``core.views.log_activity``) appends an unsaved ActivityLog to
+the process-wide buffer instead of inserting it, and the buffer is written with
+one ``bulk_create`` when:
+
+    - a request ends (``core.middleware.ActivityFlushMiddleware``) or a Celery
+      task finishes,
+    - it holds ACTIVITY_BUFFER_SIZE entries or its oldest entry is
+      ACTIVITY_BUFFER_MAX_AGE seconds old (checked on record, and only outside
+      atomic blocks so a rollback never takes other requests' entries with it),
+    - the process shuts down cleanly (atexit, Celery worker shutdown).
+
+With ACTIVITY_LOG_SINK = "celery" a flush hands the rows to the
+``core.tasks.write_activity`` job instead of inserting them (inserting directly
+when the broker is unreachable). ACTIVITY_LOG_SYNC writes every entry at once,
+for tests and scripts that read the log straight back. ``buffer_stats`` reports
+the buffer depth and flush counters.
+
+A batch that cannot be written goes back on the buffer (keeping its
+``created_at``) and is retried by the next flush; entries are dropped, and
+counted as failed, only after ACTIVITY_FLUSH_ATTEMPTS tries.
+
+Entries are buffered outside the database transaction, so one recorded inside
+an atomic block that later rolls back is still written.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ["organization_id", "user_id", "action", "entity_type", "entity_id", "entity_name", "details"]
+
+
+class ActivityBuffer:
+    """Thread-safe list of pending entries plus the counters behind ``stats``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._oldest = None
+        self.high_water = 0
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+
+    def add(self, entry):
+        """Append ``entry``; return True once the buffer is due for a flush."""
+        with self._lock:
+            if not self._entries:
+                self._oldest = time.monotonic()
+            self._entries.append(entry)
+            depth = len(self._entries)
+            self.high_water = max(self.high_water, depth)
+            return (
+                depth >= settings.ACTIVITY_BUFFER_SIZE
+                or time.monotonic() - self._oldest >= settings.ACTIVITY_BUFFER_MAX_AGE
+            )
+
+    def requeue(self, entries):
+        """Put entries from a failed flush back in front of newer ones. The
+        age clock restarts so a failing sink isn't retried on every record."""
+        with self._lock:
+            self._entries[:0] = entries
+            self._oldest = time.monotonic()
+
+    def drain(self):
+        with self._lock:
+            entries, self._entries, self._oldest = self._entries, [], None
+        return entries
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": len(self._entries),
+                "oldest_age": round(time.monotonic() - self._oldest, 3) if self._oldest else 0,
+                "high_water": self.high_water,
+                "flushes": self.flushes,
+                "written": self.written,
+                "failed": self.failed,
+                "last_flush_ms": self.last_flush_ms,
+            }
+
+
+_buffer = ActivityBuffer()
+
+
+def buffer_stats():
+    """Depth and flush metrics of this process's activity buffer."""
+    return _buffer.stats()
+
+
+def record(org, user_profile, action, entity_type, entity_id=None, entity_name="", details=""):
+    from .models import ActivityLog
+
+    entry = ActivityLog(
+        organization_id=getattr(org, "pk", org), user_id=getattr(user_profile, "pk", user_profile),
+        action=action, entity_type=entity_type, entity_id=entity_id,
+        entity_name=(entity_name or "")[:255], details=details or "", created_at=timezone.now(),
+    )
+    if settings.ACTIVITY_LOG_SYNC:
+        _write([entry])
+    elif _buffer.add(entry) and not connection.in_atomic_block:
+        flush()
+
+
+def flush():
+    """Write every buffered entry; returns the number handed to the sink."""
+    entries = _buffer.drain()
+    if not entries:
+        return 0
+    started = time.monotonic()
+    try:
+        _write(entries)
+    except Exception:
+        logger.exception("Could not write %d activity log entries", len(entries))
+        retry = []
+        for entry in entries:
+            entry.flush_attempts = getattr(entry, "flush_attempts", 0) + 1
+            if entry.flush_attempts < settings.ACTIVITY_FLUSH_ATTEMPTS:
+                retry.append(entry)
+        _buffer.failed += len(entries) - len(retry)
+        if retry:
+            _buffer.requeue(retry)
+        return 0
+    _buffer.flushes += 1
+    _buffer.written += len(entries)
+    _buffer.last_flush_ms = round((time.monotonic() - started) * 1000, 2)
+    logger.debug("Flushed %d activity log entries in %.2fms", len(entries), _buffer.last_flush_ms)
+    return len(entries)
+
+
+def _write(entries):
+    from .models import ActivityLog
+
+    if settings.ACTIVITY_LOG_SINK == "celery":
+        from kombu.exceptions import OperationalError
+        from .tasks import write_activity
+
+        try:
+            write_activity.delay([serialize(e) for e in entries])
+            return
+        except OperationalError:
+            logger.warning("Celery broker unavailable; writing %d activity entries directly", len(entries))
+    ActivityLog.objects.bulk_create(entries, batch_size=500)
+
+
+def serialize(entry):
+    row = {f: getattr(entry, f) for f in FIELDS}
+    row["created_at"] = entry.created_at.isoformat()
+    return row
+
+
+def deserialize(row):
+    from .models import ActivityLog
+
+    return ActivityLog(**{**row, "created_at": parse_datetime(row["created_at"])})
+
+
+def _flush_on_signal(**kwargs):
+    flush()
+
+
+def connect_signals():
+    """Flush after every Celery task and on clean shutdown (called from CoreConfig.ready)."""
+    from celery.signals import task_postrun, worker_process_shutdown, worker_shutdown
+
+    task_postrun.connect(_flush_on_signal, dispatch_uid="activity_flush_task")
+    worker_process_shutdown.connect(_flush_on_signal, dispatch_uid="activity_flush_process")
+    worker_shutdown.connect(_flush_on_signal, dispatch_uid="activity_flush_worker")
+    atexit.register(flush)
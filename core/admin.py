@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Organization, Outlet, Team, Permission, Role,
-    UserProfile, ActivityLog,
+    UserProfile, ActivityLog, OutletStats,
 )
 
 
@@ -49,3 +49,9 @@ class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'action', 'entity_type', 'organization', 'created_at')
     list_filter = ('action', 'entity_type', 'organization')
     date_hierarchy = 'created_at'
+
+
+@admin.register(OutletStats)
+class OutletStatsAdmin(admin.ModelAdmin):
+    list_display = ('outlet', 'entity_type', 'status', 'count', 'updated_at')
+    list_filter = ('organization', 'entity_type')
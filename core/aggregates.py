@@ -0,0 +1,125 @@
+"""
+Grouped aggregation helpers for dashboard and report counters.
+
+Each helper runs a single grouped query (conditional ``Count(filter=Q(...))``
+aggregates or a read of the denormalized ``OutletStats`` table), so callers pay
+a fixed number of queries no matter how many outlets, tasks, issues or forms an
+organization has.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import stats
+from .models import Outlet
+
+
+def _count(**lookups):
+    return Count("id", filter=Q(**lookups))
+
+
+def related_count(queryset, link):
+    """Correlated ``COUNT(*)`` of the ``queryset`` rows whose ``link`` field
+    points at the outer row, for annotating list querysets.
+
+    A subquery rather than a JOIN + GROUP BY keeps the outer query's Meta
+    ordering (which Django drops from grouped queries) and never multiplies
+    rows when several counts are annotated side by side.
+    """
+    counts = (
+        queryset.filter(**{link: OuterRef("pk")})
+        .order_by().values(link).annotate(n=Count("pk")).values("n")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def overdue_by_outlet(org, now=None, statuses=None, exclude_statuses=None):
+    """Return {outlet_id: overdue task count}.
+
+    Overdue depends on the clock, so it cannot live in ``OutletStats``; this is a
+    single grouped query over the (organization, due_date) index instead.
+    """
+    from tasks.models import Task
+
+    now = now or timezone.now()
+    qs = Task.objects.filter(
+        organization=org, is_trashed=False, outlet__isnull=False, due_date__lt=now
+    )
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+    if exclude_statuses:
+        qs = qs.exclude(status__in=exclude_statuses)
+    return count_by(qs, "outlet_id")
+
+
+def outlet_summary(org, now=None):
+    """Per-outlet task/issue/form counters for every active outlet of the org.
+
+    Reads the denormalized ``OutletStats`` rows plus one grouped overdue query,
+    so it runs three queries in total regardless of data size.
+    """
+    outlets = list(Outlet.objects.filter(organization=org, is_active=True))
+    counts = stats.status_counts(org)
+    overdue = overdue_by_outlet(org, now, statuses=["todo", "in_progress"])
+
+    summary = []
+    for o in outlets:
+        t = counts["task"][o.id]
+        i = counts["issue"][o.id]
+        f = counts["form"][o.id]
+        r = counts["form_response"][o.id]
+        summary.append({
+            "outlet": o,
+            "tasks_total": stats.total(t),
+            "tasks_ongoing": t.get("in_progress", 0),
+            "tasks_completed": t.get("completed", 0),
+            "tasks_overdue": overdue.get(o.id, 0),
+            "tasks_scheduled": t.get("scheduled", 0),
+            "issues_total": stats.total(i),
+            "issues_open": i.get("open", 0),
+            "issues_ignored": i.get("ignored", 0),
+            "issues_resolved": i.get("resolved", 0),
+            "forms_total": stats.total(f),
+            "forms_ongoing": f.get("published", 0),
+            "forms_open_responses": r.get("open", 0),
+            "forms_submitted": stats.total(r),
+        })
+    return summary
+
+
+def task_stats(org, outlet=None, now=None):
+    """Headline task counters for the dashboard stat cards."""
+    from tasks.models import Task
+
+    now = now or timezone.now()
+    qs = Task.objects.filter(organization=org, is_trashed=False)
+    if outlet:
+        qs = qs.filter(outlet=outlet)
+    return qs.aggregate(
+        total_tasks=Count("id"),
+        ongoing=_count(status="in_progress"),
+        completed=_count(status="completed"),
+        overdue=Count("id", filter=Q(due_date__lt=now) & ~Q(status="completed")),
+        scheduled=_count(status="scheduled"),
+    )
+
+
+def issue_stats(org, outlet=None):
+    """Headline issue counters for the dashboard stat cards."""
+    from issues.models import Issue
+
+    qs = Issue.objects.filter(organization=org, is_trashed=False)
+    if outlet:
+        qs = qs.filter(outlet=outlet)
+    return qs.aggregate(
+        issues_count=Count("id"),
+        issues_open=_count(status="open"),
+        issues_ignored=_count(status="ignored"),
+        issues_resolved=_count(status="resolved"),
+    )
+
+
+def count_by(queryset, field):
+    """Return {value: count} for ``field`` over the queryset in one grouped query."""
+    rows = queryset.values(field).annotate(n=Count("id")).order_by()
+    return {row[field]: row["n"] for row in rows}
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        from . import activity, caching, permissions, search, stats
+        stats.connect_signals()
+        caching.connect_signals()
+        permissions.connect_signals()
+        search.connect_signals()
+        activity.connect_signals()
@@ -0,0 +1,163 @@
+"""
+Tiered retention for the activity log.
+
+ActivityLog rows older than ACTIVITY_RETENTION_DAYS move out of the hot table
+into append-only archive files, one per organization and month:
+
+    ACTIVITY_ARCHIVE_DIR/org<organization id>/<YYYY-MM>.jsonl.gz
+
+Each archiving pass reads a chunk of old rows, appends them as one gzip member
+per file (gzip readers see concatenated members as one stream), fsyncs, and
+only then deletes the chunk from the table. A crash between the two steps can
+archive a row twice but never loses one; the reader drops repeated ids. Files
+are read back as a stream, so browsing an archived month never loads it whole.
+"""
+import gzip
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+FIELDS = ["id", "user_id", "action", "entity_type", "entity_id", "entity_name", "details"]
+
+
+def _org_dir(org_id):
+    return Path(settings.ACTIVITY_ARCHIVE_DIR) / f"org{org_id}"
+
+
+def archive_path(org_id, month):
+    return _org_dir(org_id) / f"{month}.jsonl.gz"
+
+
+def _user_name(first_name, last_name, username):
+    return f"{first_name or ''} {last_name or ''}".strip() or username or ""
+
+
+def _append(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows:
+                gz.write(json.dumps(row, separators=(",", ":")).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_activity(older_than=None, org_ids=None, chunk_size=None):
+    """Move activity rows older than ``older_than`` (default
+    ACTIVITY_RETENTION_DAYS) into the archive files, a chunk at a time.
+    Returns the number of rows archived."""
+    from .models import ActivityLog, Organization
+
+    if older_than is None:
+        older_than = timedelta(days=settings.ACTIVITY_RETENTION_DAYS)
+    cutoff = timezone.now() - older_than
+    chunk_size = chunk_size or settings.ACTIVITY_ARCHIVE_CHUNK
+    if org_ids is None:
+        org_ids = Organization.objects.values_list("id", flat=True)
+
+    archived = 0
+    for org_id in org_ids:
+        # Walks the (organization, created_at) index oldest first.
+        old = ActivityLog.objects.filter(organization_id=org_id, created_at__lt=cutoff).order_by(
+            "created_at", "id",
+        ).values_list(
+            *FIELDS, "created_at", "user__user__first_name", "user__user__last_name", "user__user__username",
+        )
+        while True:
+            chunk = list(old[:chunk_size])
+            if not chunk:
+                break
+            months = defaultdict(list)
+            for *values, created_at, first_name, last_name, username in chunk:
+                row = dict(zip(FIELDS, values))
+                row["created_at"] = created_at.isoformat()
+                row["user_name"] = _user_name(first_name, last_name, username)
+                months[timezone.localtime(created_at).strftime("%Y-%m")].append(row)
+            for month, rows in months.items():
+                _append(archive_path(org_id, month), rows)
+            ActivityLog.objects.filter(id__in=[values[0] for values in chunk]).delete()
+            archived += len(chunk)
+    return archived
+
+
+def archived_months(org_id):
+    """Months with an archive file for the organization, newest first."""
+    directory = _org_dir(org_id)
+    if not directory.is_dir():
+        return []
+    months = (p.name.removesuffix(".jsonl.gz") for p in directory.glob("*.jsonl.gz"))
+    return sorted((m for m in months if MONTH_RE.match(m)), reverse=True)
+
+
+class ArchivedActivity:
+    """An archived row, shaped like an ActivityLog for the templates."""
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.action = row["action"]
+        self.entity_type = row["entity_type"]
+        self.entity_id = row["entity_id"]
+        self.entity_name = row["entity_name"]
+        self.details = row["details"]
+        self.created_at = parse_datetime(row["created_at"])
+        self.user = {"id": row["user_id"], "full_name": row["user_name"]} if row["user_id"] else None
+
+
+def iter_archived(org_id, month, search="", action=""):
+    """Stream the archived entries of one month, oldest first, optionally
+    filtered like the activity log view (substring ``search``, exact ``action``)."""
+    if not MONTH_RE.match(month or ""):
+        return
+    path = archive_path(org_id, month)
+    if not path.exists():
+        return
+    search = search.lower()
+    seen = set()
+    with gzip.open(path, "rt", encoding="utf-8") as lines:
+        for line in lines:
+            row = json.loads(line)
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            if action and row["action"] != action:
+                continue
+            if search and search not in row["entity_name"].lower() and search not in row["details"].lower():
+                continue
+            yield ArchivedActivity(row)
+
+
+class ArchivePage:
+    """A page of ``iter_archived``, duck-typed like core.pagination.CursorPage;
+    the cursor is the number of entries to skip."""
+
+    def __init__(self, entries, offset, per_page):
+        self.offset = offset
+        rows = list(islice(entries, offset, offset + per_page + 1))
+        self.object_list = rows[:per_page]
+        self.has_next = len(rows) > per_page
+        self.has_previous = offset > 0
+        self.next_cursor = str(offset + per_page) if self.has_next else ""
+        self.previous_cursor = str(max(offset - per_page, 0)) if self.has_previous else ""
+        self.approximate_total = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
@@ -0,0 +1,170 @@
+"""
+Versioned snapshot cache for dashboard and report payloads, plus the cached
+organization and outlet lists used by the template context.
+
+Every organization has a data-version counter in the cache. Cache keys embed
+(namespace, org, outlet, version), and any write to a tracked model bumps the
+org's version after commit, so a stale snapshot is never served: it simply stops
+being addressed and ages out. Only ``get``/``set``/``add``/``incr`` are used,
+which behave the same on the LocMem and django-redis backends.
+"""
+import hashlib
+import json
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+# Models whose writes invalidate every cached payload of their organization.
+TRACKED_MODELS = [
+    "core.Outlet",
+    "tasks.Task",
+    "issues.Issue",
+    "forms_app.Form",
+    "forms_app.FormResponse",
+    "projects.Project",
+    "core.UserProfile",
+]
+
+# Assignment changes reshape the employee-wise reports.
+TRACKED_M2M = [
+    ("tasks.Task", "assigned_to"),
+    ("issues.Issue", "assigned_to"),
+]
+
+# Bookkeeping saves that never change a cached payload.
+IGNORED_UPDATE_FIELDS = {
+    "core.UserProfile": {"last_login_at", "stylehr_data"},
+}
+
+
+def _version_key(org_id):
+    return f"orgver:{org_id}"
+
+
+def org_version(org_id):
+    """Current data version of an organization.
+
+    A missing counter (first use, eviction, restart of a LocMem process) is
+    seeded from the clock so it never repeats a version that is still cached.
+    """
+    key = _version_key(org_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_org_version(org_id):
+    """Invalidate every cached payload of the organization."""
+    if not org_id:
+        return
+    try:
+        cache.incr(_version_key(org_id))
+    except ValueError:
+        org_version(org_id)
+
+
+def bump_org_version_on_commit(org_id):
+    transaction.on_commit(lambda: bump_org_version(org_id))
+
+
+def cache_key(namespace, org_id, outlet_id=None, params=None):
+    key = f"{namespace}:org{org_id}:outlet{outlet_id or 0}:v{org_version(org_id)}"
+    if params:
+        digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        key = f"{key}:{digest}"
+    return key
+
+
+def get_or_build(namespace, org, builder, timeout, outlet=None, params=None):
+    """Return the cached payload for (namespace, org, outlet, version, params),
+    calling ``builder()`` and storing its result on a miss."""
+    org_id = getattr(org, "id", org)
+    outlet_id = getattr(outlet, "id", outlet)
+    return cache.get_or_set(cache_key(namespace, org_id, outlet_id, params), builder, timeout)
+
+
+# ============================================================
+# SHARED LOOKUPS (template context)
+# ============================================================
+
+ORGANIZATIONS_KEY = "ctx:organizations"
+
+
+def _outlets_key(org_id):
+    return f"ctx:outlets:{org_id}"
+
+
+def active_organizations():
+    """Active organizations for the org switcher, cached until one is saved."""
+    Organization = apps.get_model("core", "Organization")
+    return cache.get_or_set(
+        ORGANIZATIONS_KEY, lambda: list(Organization.objects.filter(is_active=True)), timeout=None,
+    )
+
+
+def active_outlets(org_id):
+    """Active outlets of an organization, cached until one of them is saved."""
+    Outlet = apps.get_model("core", "Outlet")
+    return cache.get_or_set(
+        _outlets_key(org_id),
+        lambda: list(Outlet.objects.filter(organization_id=org_id, is_active=True)),
+        timeout=None,
+    )
+
+
+def _on_organization_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: cache.delete(ORGANIZATIONS_KEY))
+
+
+def _on_outlet_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        key = _outlets_key(instance.organization_id)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+def _org_id_of(instance):
+    org_id = getattr(instance, "organization_id", None)
+    if org_id is None and getattr(instance, "form_id", None):
+        form = instance._state.fields_cache.get("form")
+        if form is None:
+            form = apps.get_model("forms_app", "Form").objects.filter(pk=instance.form_id).first()
+        org_id = form.organization_id if form else None
+    return org_id
+
+
+def _on_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    ignored = IGNORED_UPDATE_FIELDS.get(sender._meta.label)
+    if ignored and update_fields and set(update_fields) <= ignored:
+        return
+    bump_org_version_on_commit(_org_id_of(instance))
+
+
+def _on_m2m_change(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        bump_org_version_on_commit(_org_id_of(instance))
+
+
+def connect_signals():
+    """Bump the org version on save/delete of tracked models and drop the cached
+    org/outlet lists (called from CoreConfig.ready)."""
+    for label in TRACKED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f"orgver_{label}")
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f"orgver_{label}")
+    for label, field in TRACKED_M2M:
+        through = getattr(apps.get_model(label), field).through
+        m2m_changed.connect(_on_m2m_change, sender=through, dispatch_uid=f"orgver_{label}_{field}")
+
+    for label, handler in (("core.Organization", _on_organization_change), ("core.Outlet", _on_outlet_change)):
+        model = apps.get_model(label)
+        post_save.connect(handler, sender=model, dispatch_uid=f"ctx_{label}")
+        post_delete.connect(handler, sender=model, dispatch_uid=f"ctx_{label}")
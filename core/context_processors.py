@@ -1,38 +1,33 @@
-from core.models import Organization, Outlet, UserProfile
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from core import caching
+from core.middleware import current_context
 
 
 def global_context(request):
-    """Add global context variables available in all templates."""
-    context = {
-        "organizations": Organization.objects.filter(is_active=True),
-        "current_org_id": request.session.get("current_org_id"),
-        "current_outlet_id": request.session.get("current_outlet_id"),
-        "outlets": [],
-        "user_profile": None,
-        "unread_notifications": 0,
-        "user_perms": {},
-    }
+    """Add global context variables available in all templates.
 
+    Every value is lazy, so a template only pays for what it renders. The org
+    and outlet lists, unread count and permission codes come from caches
+    (core.caching, notifications.counters, core.permissions).
+    """
+    current = current_context(request)
     org_id = request.session.get("current_org_id")
-    if org_id:
-        context["outlets"] = Outlet.objects.filter(organization_id=org_id, is_active=True)
 
-    user_id = request.session.get("user_id")
-    if user_id:
-        try:
-            profile = UserProfile.objects.select_related(
-                "user", "organization", "role", "outlet", "team"
-            ).get(id=user_id)
-            context["user_profile"] = profile
-            from notifications.models import Notification
-            context["unread_notifications"] = Notification.objects.filter(
-                user=profile, is_read=False
-            ).count()
-            # Build permission lookup dict for templates
-            if profile.role:
-                perm_codes = profile.role.permissions.values_list("codename", flat=True)
-                context["user_perms"] = {code: True for code in perm_codes}
-        except UserProfile.DoesNotExist:
-            pass
+    def unread():
+        from notifications.counters import unread_count
+        profile = current.profile
+        return unread_count(profile.id) if profile else 0
 
-    return context
+    return {
+        "organizations": SimpleLazyObject(caching.active_organizations),
+        "current_org_id": org_id,
+        "current_outlet_id": request.session.get("current_outlet_id"),
+        "outlets": SimpleLazyObject(lambda: caching.active_outlets(org_id) if org_id else []),
+        "user_profile": SimpleLazyObject(lambda: current.profile),
+        "unread_notifications": SimpleLazyObject(unread),
+        "notification_poll_interval_ms": settings.NOTIFICATION_POLL_INTERVAL_MS,
+        # Permission lookup dict for templates
+        "user_perms": SimpleLazyObject(lambda: {code: True for code in current.perms}),
+    }
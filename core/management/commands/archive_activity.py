@@ -0,0 +1,23 @@
+"""
+Move old activity log entries into the per-org, per-month archive files.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.archive import archive_activity
+
+
+class Command(BaseCommand):
+    help = "Archive activity log entries older than the retention age"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.ACTIVITY_RETENTION_DAYS,
+                            help=f"Archive entries older than this many days (default: {settings.ACTIVITY_RETENTION_DAYS})")
+        parser.add_argument("--org", type=int, action="append", dest="org_ids",
+                            help="Only this organization id (repeatable)")
+
+    def handle(self, *args, **options):
+        archived = archive_activity(timedelta(days=options["days"]), options["org_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} activity entries to {settings.ACTIVITY_ARCHIVE_DIR}"))
@@ -0,0 +1,21 @@
+"""
+Rebuild the full-text search index (core.SearchEntry) from the source tables.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import SOURCES, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search index for all (or some) entity types"
+
+    def add_arguments(self, parser):
+        parser.add_argument("entity_types", nargs="*",
+                            help=f"Entity types to rebuild: {', '.join(SOURCES)} (default: all)")
+
+    def handle(self, *args, **options):
+        unknown = set(options["entity_types"]) - set(SOURCES)
+        if unknown:
+            raise CommandError(f"Unknown entity types: {', '.join(sorted(unknown))}")
+        written = rebuild_search_index(options["entity_types"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} objects"))
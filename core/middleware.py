@@ -24,3 +24,112 @@ class LoginRequiredMiddleware:
 
     def _is_exempt(self, path):
         return any(path.startswith(url) for url in self.EXEMPT_URLS)
+
+
+class CurrentContext:
+    """Profile, organization, outlet and permissions of one request.
+
+    Each value is resolved lazily and at most once per session id, so the view
+    helpers and the context processor share the same objects. The org and outlet
+    are taken from the already-loaded profile when they are the user's own.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._resolved = {}
+
+    def _get(self, name, key, loader):
+        cached = self._resolved.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = loader(key)
+        self._resolved[name] = (key, value)
+        return value
+
+    @property
+    def profile(self):
+        return self._get("profile", self.request.session.get("user_id"), self._load_profile)
+
+    @property
+    def org(self):
+        return self._get("org", self.request.session.get("current_org_id"), self._load_org)
+
+    @property
+    def outlet(self):
+        return self._get("outlet", self.request.session.get("current_outlet_id"), self._load_outlet)
+
+    @property
+    def perms(self):
+        profile = self.profile
+        return profile.permission_codes() if profile else frozenset()
+
+    def _load_profile(self, user_id):
+        from .models import UserProfile
+
+        if not user_id:
+            return None
+        return UserProfile.objects.select_related(
+            "user", "organization", "role", "outlet", "team"
+        ).filter(id=user_id).first()
+
+    def _load_org(self, org_id):
+        from .models import Organization
+
+        profile = self.profile
+        if org_id:
+            if profile and profile.organization_id == org_id:
+                return profile.organization
+            org = Organization.objects.filter(id=org_id).first()
+            if org:
+                return org
+        if profile:
+            self.request.session["current_org_id"] = profile.organization_id
+            # The session key changed; remember the result under the new one.
+            self._resolved["org"] = (profile.organization_id, profile.organization)
+            return profile.organization
+        return None
+
+    def _load_outlet(self, outlet_id):
+        from .models import Outlet
+
+        if not outlet_id:
+            return None
+        profile = self.profile
+        if profile and profile.outlet_id == outlet_id:
+            return profile.outlet
+        return Outlet.objects.filter(id=outlet_id).first()
+
+
+def current_context(request):
+    """Return the request's CurrentContext, creating it outside the middleware."""
+    ctx = getattr(request, "current", None)
+    if ctx is None:
+        ctx = request.current = CurrentContext(request)
+    return ctx
+
+
+class CurrentContextMiddleware:
+    """Attach a lazily resolved ``request.current`` (see CurrentContext)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.current = CurrentContext(request)
+        return self.get_response(request)
+
+
+class ActivityFlushMiddleware:
+    """Write the activity entries buffered while handling the request (see
+    core.activity); listed first so it wraps every other middleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .activity import flush
+
+        try:
+            return self.get_response(request)
+        finally:
+            flush()
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_outlet_stats(apps, schema_editor):
+    from core.stats import rebuild_outlet_stats
+    rebuild_outlet_stats(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("tasks", "0001_initial"),
+        ("issues", "0001_initial"),
+        ("forms_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutletStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("entity_type", models.CharField(choices=[("task", "Task"), ("issue", "Issue"), ("form", "Form"), ("form_response", "Form Response")], max_length=20)),
+                ("status", models.CharField(max_length=20)),
+                ("count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("organization", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="outlet_stats", to="core.organization")),
+                ("outlet", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="stats", to="core.outlet")),
+            ],
+            options={
+                "verbose_name_plural": "Outlet Stats",
+                "indexes": [models.Index(fields=["organization", "entity_type"], name="core_outlet_organiz_41e4b3_idx")],
+                "unique_together": {("organization", "outlet", "entity_type", "status")},
+            },
+        ),
+        migrations.RunPython(backfill_outlet_stats, migrations.RunPython.noop),
+    ]
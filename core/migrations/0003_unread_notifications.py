@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:47
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_notifications(apps, schema_editor):
+    UserProfile = apps.get_model("core", "UserProfile")
+    Notification = apps.get_model("notifications", "Notification")
+    counts = (
+        Notification.objects.filter(is_read=False)
+        .values_list("user_id").annotate(n=Count("id")).order_by()
+    )
+    UserProfile.objects.bulk_update(
+        [UserProfile(id=user_id, unread_notifications=n) for user_id, n in counts],
+        ["unread_notifications"], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_outlet_stats"),
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="unread_notifications",
+            field=models.IntegerField(default=0, help_text="Denormalized unread notification count (see notifications.counters)."),
+        ),
+        migrations.RunPython(backfill_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE core_searchentry_fts USING fts5("
+    "title, body, content='core_searchentry', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER core_searchentry_fts_ai AFTER INSERT ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER core_searchentry_fts_ad AFTER DELETE ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER core_searchentry_fts_au AFTER UPDATE OF title, body ON core_searchentry BEGIN "
+    "INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO core_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_au",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchentry_fts_ai",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+
+POSTGRES_FTS = [
+    "ALTER TABLE core_searchentry ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED",
+    "CREATE INDEX core_searchentry_vector_gin ON core_searchentry USING GIN (search_vector)",
+]
+
+POSTGRES_FTS_DROP = [
+    "DROP INDEX IF EXISTS core_searchentry_vector_gin",
+    "ALTER TABLE core_searchentry DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _run(schema_editor, SQLITE_FTS)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_FTS)
+
+
+def drop_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _run(schema_editor, SQLITE_FTS_DROP)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_FTS_DROP)
+
+
+def backfill_search_index(apps, schema_editor):
+    from core.search import rebuild_search_index
+    rebuild_search_index(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_unread_notifications"),
+        ("tasks", "0002_recurrence_tracking"),
+        ("issues", "0001_initial"),
+        ("projects", "0001_initial"),
+        ("forms_app", "0001_initial"),
+        ("templates_lib", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("entity_type", models.CharField(choices=[("task", "Task"), ("issue", "Issue"), ("project", "Project"), ("form", "Form"), ("task_template", "Task Template"), ("project_template", "Project Template")], max_length=20)),
+                ("entity_id", models.PositiveBigIntegerField()),
+                ("title", models.CharField(max_length=500)),
+                ("body", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("organization", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="search_entries", to="core.organization")),
+                ("outlet", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="search_entries", to="core.outlet")),
+            ],
+            options={
+                "verbose_name_plural": "Search Entries",
+                "indexes": [models.Index(fields=["organization", "entity_type"], name="core_search_organiz_aabb41_idx")],
+                "unique_together": {("entity_type", "entity_id")},
+            },
+        ),
+        migrations.RunPython(create_fulltext, drop_fulltext),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:14
+
+from django.db import migrations, models
+
+
+def rebuild(apps, schema_editor):
+    # Adds the user entries and drops trashed/inactive rows indexed by 0004.
+    from core.search import rebuild_search_index
+    rebuild_search_index(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="searchentry",
+            name="entity_type",
+            field=models.CharField(choices=[("task", "Task"), ("issue", "Issue"), ("project", "Project"), ("form", "Form"), ("task_template", "Task Template"), ("project_template", "Project Template"), ("user", "User")], max_length=20),
+        ),
+        migrations.RunPython(rebuild, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_search_users"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="activitylog",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
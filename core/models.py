@@ -1,5 +1,5 @@
 """
-Core models: Organization, Outlet, Team, Permission, Role, UserProfile, ActivityLog, Notification
+Core models: Organization, Outlet, Team, Permission, Role, UserProfile, ActivityLog, Notification, OutletStats, SearchEntry
 """
 from django.db import models
 from django.contrib.auth.models import User
@@ -140,6 +140,9 @@ class UserProfile(models.Model):
     stylehr_data = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
     last_login_at = models.DateTimeField(null=True, blank=True)
+    unread_notifications = models.IntegerField(
+        default=0, help_text="Denormalized unread notification count (see notifications.counters)."
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -156,6 +159,16 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.organization.code})"
 
+    def save(self, *args, **kwargs):
+        # The unread counter is only changed by atomic UPDATEs; never write it
+        # back from a possibly stale instance.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "unread_notifications"
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return self.user.get_full_name() or self.user.username
@@ -168,10 +181,13 @@ class UserProfile(models.Model):
             return (parts[0][0] + parts[-1][0]).upper()
         return name[:2].upper()
 
+    def permission_codes(self):
+        """Codenames granted by the user's role (cached per role, see core.permissions)."""
+        from .permissions import role_permissions
+        return role_permissions(self.role_id)
+
     def has_perm(self, codename):
-        if not self.role:
-            return False
-        return self.role.permissions.filter(codename=codename).exists()
+        return codename in self.permission_codes()
 
 
 class ActivityLog(models.Model):
@@ -193,7 +209,8 @@ class ActivityLog(models.Model):
     entity_id = models.IntegerField(null=True, blank=True)
     entity_name = models.CharField(max_length=255, blank=True)
     details = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Stamped when the entry is recorded, not when its buffer is written.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
@@ -206,3 +223,70 @@ class ActivityLog(models.Model):
     def __str__(self):
         return f"{self.user} {self.action} {self.entity_type}"
 
+
+
+class OutletStats(models.Model):
+    """Denormalized task/issue/form counters per (organization, outlet, status).
+
+    Maintained incrementally by ``core.stats`` from model save/delete signals and
+    reconciled periodically against the source tables.
+    """
+    ENTITY_CHOICES = [
+        ("task", "Task"),
+        ("issue", "Issue"),
+        ("form", "Form"),
+        ("form_response", "Form Response"),
+    ]
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="outlet_stats")
+    outlet = models.ForeignKey(Outlet, on_delete=models.CASCADE, related_name="stats")
+    entity_type = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Outlet Stats"
+        unique_together = ["organization", "outlet", "entity_type", "status"]
+        indexes = [
+            models.Index(fields=["organization", "entity_type"]),
+        ]
+
+    def __str__(self):
+        return f"{self.outlet_id} {self.entity_type}:{self.status} = {self.count}"
+
+
+class SearchEntry(models.Model):
+    """One searchable row per indexed object (see ``core.search``).
+
+    Mirrors the title/body text of tasks, issues, projects, forms and templates
+    so every list searches a single full-text index (FTS5 on SQLite, tsvector
+    on PostgreSQL) instead of scanning its own table.
+    """
+    ENTITY_CHOICES = [
+        ("task", "Task"),
+        ("issue", "Issue"),
+        ("project", "Project"),
+        ("form", "Form"),
+        ("task_template", "Task Template"),
+        ("project_template", "Project Template"),
+        ("user", "User"),
+    ]
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name="search_entries")
+    outlet = models.ForeignKey(Outlet, on_delete=models.SET_NULL, null=True, blank=True, related_name="search_entries")
+    entity_type = models.CharField(max_length=20, choices=ENTITY_CHOICES)
+    entity_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=500)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Search Entries"
+        unique_together = ["entity_type", "entity_id"]
+        indexes = [
+            models.Index(fields=["organization", "entity_type"]),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.entity_id} {self.title}"
@@ -0,0 +1,187 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with ``WHERE (ordering columns) < (last row's values)``
+instead of ``OFFSET``, so every page costs the same index range scan no matter
+how deep it is, and no ``COUNT(*)`` is needed to render it. The ordering is the
+queryset's (or the model's ``Meta.ordering``) with the primary key appended as
+a tie-breaker, and may include annotations (e.g. ``search_rank``); cursors are
+opaque url-safe tokens holding the boundary values.
+"""
+import base64
+import hashlib
+import json
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _ordering(queryset):
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    fields = []
+    for item in ordering:
+        if not isinstance(item, str) or item == "?":
+            raise ValueError(f"Cannot keyset-paginate on ordering {item!r}")
+        fields.append((item.lstrip("-"), item.startswith("-")))
+    pk = queryset.model._meta.pk.name
+    if not any(path in ("pk", pk, "id") for path, _desc in fields):
+        fields.append((pk, fields[0][1] if fields else False))
+    return fields
+
+
+def _model_field(model, path):
+    *relations, name = path.split("__")
+    for rel in relations:
+        model = model._meta.get_field(rel).related_model
+    return model._meta.pk if name == "pk" else model._meta.get_field(name)
+
+
+def _to_python(model, path, raw):
+    try:
+        field = _model_field(model, path)
+    except FieldDoesNotExist:
+        return raw  # an annotation such as search_rank
+    return field.to_python(raw)
+
+
+def _value(obj, path):
+    return reduce(getattr, path.split("__"), obj)
+
+
+def _encode(values, backwards):
+    payload = json.dumps({
+        "v": [v.isoformat() if hasattr(v, "isoformat") else v for v in values],
+        "b": backwards,
+    })
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode(token, model, fields):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        values = [
+            None if raw is None else _to_python(model, path, raw)
+            for (path, _desc), raw in zip(fields, payload["v"], strict=True)
+        ]
+        return values, bool(payload["b"])
+    except Exception as exc:
+        raise InvalidCursor(token) from exc
+
+
+def _after(fields, values, backwards):
+    """Rows strictly past ``values`` in the (possibly reversed) ordering."""
+    condition = Q()
+    for i, (path, desc) in enumerate(fields):
+        op = "gt" if desc == backwards else "lt"
+        clause = Q(**{f"{path}__{op}": values[i]})
+        for (prev_path, _desc), prev_value in zip(fields[:i], values[:i]):
+            clause &= Q(**{prev_path: prev_value})
+        condition |= clause
+    return condition
+
+
+class CursorPage:
+    """One page of a CursorPaginator; iterable like Django's Page."""
+
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return ""
+        return self.paginator.cursor_for(self.object_list[-1], backwards=False)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return ""
+        return self.paginator.cursor_for(self.object_list[0], backwards=True)
+
+    @property
+    def approximate_total(self):
+        return self.paginator.approximate_count()
+
+
+class CursorPaginator:
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = _ordering(queryset)
+
+    def cursor_for(self, obj, backwards):
+        return _encode([_value(obj, path) for path, _desc in self.fields], backwards)
+
+    def page(self, cursor=None):
+        """Return the page after (or, for a backwards cursor, before) ``cursor``."""
+        ordering = [f"-{p}" if desc else p for p, desc in self.fields]
+        if not cursor:
+            rows = list(self.queryset.order_by(*ordering)[:self.per_page + 1])
+            return CursorPage(self, rows[:self.per_page], len(rows) > self.per_page, False)
+
+        values, backwards = _decode(cursor, self.queryset.model, self.fields)
+        qs = self.queryset.filter(_after(self.fields, values, backwards))
+        if backwards:
+            reversed_ordering = [p[1:] if p.startswith("-") else f"-{p}" for p in ordering]
+            rows = list(qs.order_by(*reversed_ordering)[:self.per_page + 1])
+            more = len(rows) > self.per_page
+            return CursorPage(self, rows[:self.per_page][::-1], True, more)
+        rows = list(qs.order_by(*ordering)[:self.per_page + 1])
+        return CursorPage(self, rows[:self.per_page], len(rows) > self.per_page, True)
+
+    def first_pages(self, field):
+        """The first page of every ``field`` group (e.g. each board column) from
+        one query numbering the rows of each group with ROW_NUMBER().
+
+        Returns {value: CursorPage}; groups without rows are absent. The pages'
+        cursors continue within the group on ``queryset.filter(field=value)``.
+        """
+        ordering = [f"-{p}" if desc else p for p, desc in self.fields]
+        position = Window(
+            RowNumber(), partition_by=F(field),
+            order_by=[F(p).desc() if desc else F(p).asc() for p, desc in self.fields],
+        )
+        rows = (
+            self.queryset.annotate(group_position=position)
+            .filter(group_position__lte=self.per_page + 1)
+            .order_by(*ordering)
+        )
+        groups = {}
+        for obj in rows:
+            groups.setdefault(_value(obj, field), []).append(obj)
+        return {
+            value: CursorPage(self, objs[:self.per_page], len(objs) > self.per_page, False)
+            for value, objs in groups.items()
+        }
+
+    def approximate_count(self):
+        """Row count of the full queryset, cached for CACHE_TTL_PAGE_COUNT seconds."""
+        sql = str(self.queryset.order_by().query)
+        key = "pagecount:" + hashlib.md5(sql.encode()).hexdigest()
+        return cache.get_or_set(key, self.queryset.order_by().count, settings.CACHE_TTL_PAGE_COUNT)
@@ -0,0 +1,115 @@
+"""
+Per-role permission sets.
+
+``role_permissions(role_id)`` returns the frozenset of codenames granted to a
+role. Lookups go through a small process-local LRU, then the shared cache, and
+only then the database. Local entries live for ``ROLE_PERMS_LOCAL_TTL`` seconds
+so other processes pick up an invalidation quickly; the process that changes a
+role drops its own entry at once.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _key(role_id):
+    return f"roleperms:{role_id}"
+
+
+def _local_get(role_id):
+    with _lock:
+        entry = _local.get(role_id)
+        if entry is None:
+            return None
+        codes, expires = entry
+        if expires < time.monotonic():
+            del _local[role_id]
+            return None
+        _local.move_to_end(role_id)
+        return codes
+
+
+def _local_set(role_id, codes):
+    with _lock:
+        _local[role_id] = (codes, time.monotonic() + settings.ROLE_PERMS_LOCAL_TTL)
+        _local.move_to_end(role_id)
+        while len(_local) > settings.ROLE_PERMS_LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def role_permissions(role_id):
+    """Frozenset of permission codenames granted to the role (empty for None)."""
+    if not role_id:
+        return frozenset()
+    codes = _local_get(role_id)
+    if codes is not None:
+        return codes
+    codes = cache.get(_key(role_id))
+    if codes is None:
+        Role = apps.get_model("core", "Role")
+        codes = frozenset(
+            Role.permissions.through.objects.filter(role_id=role_id)
+            .values_list("permission__codename", flat=True)
+        )
+        cache.set(_key(role_id), codes, settings.CACHE_TTL_ROLE_PERMS)
+    _local_set(role_id, codes)
+    return codes
+
+
+def invalidate_roles(role_ids):
+    """Forget the cached permission sets of the given roles."""
+    role_ids = [r for r in role_ids if r]
+    if not role_ids:
+        return
+    cache.delete_many([_key(r) for r in role_ids])
+    with _lock:
+        for r in role_ids:
+            _local.pop(r, None)
+
+
+def invalidate_roles_on_commit(role_ids):
+    role_ids = list(role_ids)
+    transaction.on_commit(lambda: invalidate_roles(role_ids))
+
+
+def _on_role_perms_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_roles_on_commit([instance.pk])
+    elif action == "post_clear" or not pk_set:
+        # permission.roles.clear(): the affected roles are gone from the table.
+        invalidate_roles_on_commit(apps.get_model("core", "Role").objects.values_list("id", flat=True))
+    else:
+        invalidate_roles_on_commit(pk_set)
+
+
+def _on_role_delete(sender, instance, **kwargs):
+    invalidate_roles_on_commit([instance.pk])
+
+
+def _on_permission_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # A renamed or deleted codename can be held by any role.
+    invalidate_roles_on_commit(apps.get_model("core", "Role").objects.values_list("id", flat=True))
+
+
+def connect_signals():
+    """Invalidate role permission sets on change (called from CoreConfig.ready)."""
+    Role = apps.get_model("core", "Role")
+    Permission = apps.get_model("core", "Permission")
+    m2m_changed.connect(_on_role_perms_changed, sender=Role.permissions.through, dispatch_uid="roleperms_m2m")
+    post_delete.connect(_on_role_delete, sender=Role, dispatch_uid="roleperms_role")
+    post_save.connect(_on_permission_change, sender=Permission, dispatch_uid="roleperms_permission")
+    post_delete.connect(_on_permission_change, sender=Permission, dispatch_uid="roleperms_permission")
@@ -0,0 +1,369 @@
+"""
+Full-text search over tasks, issues, projects, forms, templates and users.
+
+Every indexed object has one ``SearchEntry`` row (organization, outlet, title,
+body), written by save/delete signals; bulk paths that bypass signals call
+``index_objects`` and ``manage.py rebuild_search_index`` rebuilds everything.
+The backend is picked from the database vendor:
+
+    sqlite      FTS5 external-content table ``core_searchentry_fts``, kept in
+                sync with core_searchentry by triggers, ranked with bm25()
+    postgresql  generated ``search_vector`` tsvector column with a GIN index,
+                ranked with ts_rank()
+    other       icontains over core_searchentry (no ranking beyond recency)
+
+Queries are tokenized into words and every word is prefix-matched, so "inv
+aud" finds "Inventory audit".
+
+List searches (``filter_queryset``) match and rank inside the database against
+the already-filtered queryset, so they return every hit. The global type-ahead
+(``grouped_search``) keeps the top few hits of each entity type.
+"""
+import re
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+
+def _profile_name(profile):
+    # Spelled out rather than User.get_full_name() so historical models work.
+    user = profile.user
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+# entity_type -> model label, title field (or callable), body fields, outlet
+# field, and the filter/exclude lookups an object must pass to be indexed at all
+# (trashed and inactive objects are kept out of the index).
+SOURCES = {
+    "task": {"model": "tasks.Task", "title": "title", "body": ["description", "tags"],
+             "outlet": "outlet_id", "filter": {"is_trashed": False}},
+    "issue": {"model": "issues.Issue", "title": "title", "body": ["description", "tags"],
+              "outlet": "outlet_id", "filter": {"is_trashed": False}},
+    "project": {"model": "projects.Project", "title": "name", "body": ["description"],
+                "outlet": "outlet_id", "filter": {"is_active": True}},
+    "form": {"model": "forms_app.Form", "title": "name", "body": ["description"],
+             "outlet": "outlet_id", "exclude": {"status": "trashed"}},
+    "task_template": {"model": "templates_lib.TaskTemplate", "title": "name", "body": ["description"],
+                      "filter": {"is_active": True}},
+    "project_template": {"model": "templates_lib.ProjectTemplate", "title": "name", "body": ["description"],
+                         "filter": {"is_active": True}},
+    "user": {"model": "core.UserProfile", "title": _profile_name,
+             "body": ["employee_id", "designation", "department", "phone"],
+             "outlet": "outlet_id", "filter": {"is_active": True}, "related": ["user"]},
+}
+
+FTS_TABLE = "core_searchentry_fts"
+
+# Bookkeeping saves that never change an entry.
+IGNORED_UPDATE_FIELDS = {"last_login_at", "stylehr_data", "updated_at", "next_run_at", "is_starred"}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query):
+    return _WORD.findall(query or "")[:settings.SEARCH_MAX_TERMS]
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class BasicBackend:
+    """Substring match on the index table; used where no full-text engine is set up."""
+
+    def _matching(self, entries, terms):
+        for term in terms:
+            entries = entries.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        return entries
+
+    def top_per_type(self, entries, terms, entity_types, per_type):
+        matching = self._matching(entries, terms).order_by("-updated_at")
+        return [
+            hit for entity_type in entity_types
+            for hit in matching.filter(entity_type=entity_type).values_list("entity_type", "entity_id")[:per_type]
+        ]
+
+    def matching_ids(self, entries, terms):
+        return self._matching(entries, terms).values("entity_id")
+
+    def rank(self, entity_type, terms, outer_pk):
+        return Value(0.0, output_field=FloatField())
+
+
+class SQLiteFTSBackend:
+    def _match(self, terms):
+        return " ".join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+
+    def top_per_type(self, entries, terms, entity_types, per_type):
+        scope_sql, scope_params = entries.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT entity_type, entity_id FROM ("
+                " SELECT entity_type, entity_id,"
+                " ROW_NUMBER() OVER (PARTITION BY entity_type ORDER BY rank) AS n FROM ("
+                f"  SELECT e.entity_type, e.entity_id, bm25({FTS_TABLE}, 10.0, 1.0) AS rank FROM {FTS_TABLE} f "
+                f"  JOIN core_searchentry e ON e.id = f.rowid WHERE {FTS_TABLE} MATCH %s AND e.id IN ({scope_sql})"
+                " )"
+                ") WHERE n <= %s ORDER BY entity_type, n",
+                [self._match(terms), *scope_params, per_type],
+            )
+            return cursor.fetchall()
+
+    def matching_ids(self, entries, terms):
+        scope_sql, scope_params = entries.values("id").query.sql_with_params()
+        return RawSQL(
+            f"SELECT e.entity_id FROM {FTS_TABLE} f JOIN core_searchentry e ON e.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.id IN ({scope_sql})",
+            [self._match(terms), *scope_params],
+        )
+
+    def rank(self, entity_type, terms, outer_pk):
+        return RawSQL(
+            f"SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} f JOIN core_searchentry e ON e.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.entity_type = %s AND e.entity_id = {outer_pk} LIMIT 1",
+            [self._match(terms), entity_type], output_field=FloatField(),
+        )
+
+
+class PostgresBackend:
+    def _tsquery(self, terms):
+        return " & ".join("{}:*".format(t.replace("'", "")) for t in terms)
+
+    def top_per_type(self, entries, terms, entity_types, per_type):
+        tsquery = self._tsquery(terms)
+        scope_sql, scope_params = entries.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT entity_type, entity_id FROM ("
+                " SELECT e.entity_type, e.entity_id, ROW_NUMBER() OVER ("
+                "  PARTITION BY e.entity_type ORDER BY ts_rank(e.search_vector, to_tsquery('simple', %s)) DESC"
+                " ) AS n FROM core_searchentry e "
+                " WHERE e.search_vector @@ to_tsquery('simple', %s) "
+                f" AND e.id IN ({scope_sql})"
+                ") ranked WHERE n <= %s ORDER BY entity_type, n",
+                [tsquery, tsquery, *scope_params, per_type],
+            )
+            return cursor.fetchall()
+
+    def matching_ids(self, entries, terms):
+        scope_sql, scope_params = entries.values("id").query.sql_with_params()
+        return RawSQL(
+            "SELECT e.entity_id FROM core_searchentry e WHERE e.search_vector @@ to_tsquery('simple', %s) "
+            f"AND e.id IN ({scope_sql})",
+            [self._tsquery(terms), *scope_params],
+        )
+
+    def rank(self, entity_type, terms, outer_pk):
+        # Negated so that, as with bm25(), lower ranks sort first.
+        return RawSQL(
+            "SELECT -ts_rank(e.search_vector, to_tsquery('simple', %s)) FROM core_searchentry e "
+            f"WHERE e.entity_type = %s AND e.entity_id = {outer_pk} LIMIT 1",
+            [self._tsquery(terms), entity_type], output_field=FloatField(),
+        )
+
+
+_backend = None
+
+
+def _fts_table_exists():
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if connection.vendor == "sqlite" and _fts_table_exists():
+            _backend = SQLiteFTSBackend()
+        elif connection.vendor == "postgresql":
+            _backend = PostgresBackend()
+        else:
+            _backend = BasicBackend()
+    return _backend
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _entries(org, entity_types, outlet=None):
+    """Index rows visible to the org: organization-less rows (built-in
+    templates) are visible to every org; with an outlet only its rows match."""
+    from .models import SearchEntry
+
+    entries = SearchEntry.objects.filter(
+        Q(organization=org) | Q(organization__isnull=True), entity_type__in=entity_types,
+    )
+    if outlet:
+        entries = entries.filter(outlet=outlet)
+    return entries
+
+
+def filter_queryset(queryset, query, entity_type, org, outlet=None):
+    """Restrict ``queryset`` to every search hit, annotated with ``search_rank``
+    (lower is better) and ordered by it.
+
+    The hits are a subquery of the index joined against ``queryset`` in the
+    database, so other filters on the queryset never lose matches to a cap.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset.none()
+    backend = get_backend()
+    meta = queryset.model._meta
+    outer_pk = f"{connection.ops.quote_name(meta.db_table)}.{connection.ops.quote_name(meta.pk.column)}"
+    return queryset.filter(
+        pk__in=backend.matching_ids(_entries(org, [entity_type], outlet), terms),
+    ).annotate(search_rank=backend.rank(entity_type, terms, outer_pk)).order_by("search_rank", "pk")
+
+
+def grouped_search(query, org, entity_types, per_type):
+    """Top ``per_type`` hits of each entity type for one query, limited per
+    type in the database so a common prefix in one type cannot crowd out the
+    others: {entity_type: [(entity_id, title), ...]}."""
+    from .models import SearchEntry
+
+    terms = tokenize(query)
+    if not terms:
+        return {}
+    hits = get_backend().top_per_type(_entries(org, entity_types), terms, entity_types, per_type)
+    grouped = {}
+    for entity_type, entity_id in hits:
+        grouped.setdefault(entity_type, []).append(entity_id)
+    if not grouped:
+        return {}
+    lookup = Q()
+    for entity_type, ids in grouped.items():
+        lookup |= Q(entity_type=entity_type, entity_id__in=ids)
+    titles = {
+        (t, i): title
+        for t, i, title in SearchEntry.objects.filter(lookup).values_list("entity_type", "entity_id", "title")
+    }
+    return {t: [(i, titles.get((t, i), "")) for i in ids] for t, ids in grouped.items()}
+
+
+# ============================================================
+# INDEXING
+# ============================================================
+
+def _entity_type_of(model):
+    for entity_type, source in SOURCES.items():
+        if model._meta.label == source["model"]:
+            return entity_type
+    return None
+
+
+def _is_live(source, obj):
+    return (
+        all(getattr(obj, k) == v for k, v in source.get("filter", {}).items())
+        and not any(getattr(obj, k) == v for k, v in source.get("exclude", {}).items())
+    )
+
+
+def _entry_values(entity_type, obj):
+    source = SOURCES[entity_type]
+    title = source["title"](obj) if callable(source["title"]) else getattr(obj, source["title"])
+    return {
+        "organization_id": getattr(obj, "organization_id", None),
+        "outlet_id": getattr(obj, source["outlet"]) if source.get("outlet") else None,
+        "title": (title or "")[:500],
+        "body": "\n".join(str(getattr(obj, f) or "") for f in source["body"]),
+    }
+
+
+def index_objects(objs):
+    """Create or refresh the index rows of saved objects of one model (objects
+    that are trashed or inactive are removed from the index instead)."""
+    from .models import SearchEntry
+
+    objs = [o for o in objs if o.pk]
+    if not objs:
+        return
+    entity_type = _entity_type_of(type(objs[0]))
+    dead = [o.pk for o in objs if not _is_live(SOURCES[entity_type], o)]
+    objs = [o for o in objs if _is_live(SOURCES[entity_type], o)]
+    with transaction.atomic():
+        unindex(entity_type, dead)
+        existing = dict(SearchEntry.objects.filter(
+            entity_type=entity_type, entity_id__in=[o.pk for o in objs]
+        ).values_list("entity_id", "id"))
+        new, changed = [], []
+        for obj in objs:
+            entry = SearchEntry(entity_type=entity_type, entity_id=obj.pk, **_entry_values(entity_type, obj))
+            if obj.pk in existing:
+                entry.id = existing[obj.pk]
+                changed.append(entry)
+            else:
+                new.append(entry)
+        SearchEntry.objects.bulk_create(new, batch_size=500)
+        SearchEntry.objects.bulk_update(
+            changed, ["organization_id", "outlet_id", "title", "body"], batch_size=500,
+        )
+
+
+def unindex(entity_type, ids):
+    from .models import SearchEntry
+
+    SearchEntry.objects.filter(entity_type=entity_type, entity_id__in=ids).delete()
+
+
+def _on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and set(update_fields) <= IGNORED_UPDATE_FIELDS:
+        return
+    index_objects([instance])
+
+
+def _on_user_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """A renamed auth user renames its profile's entry."""
+    if raw or (update_fields is not None and set(update_fields) <= {"last_login", "password"}):
+        return
+    profile = getattr(instance, "profile", None)
+    if profile is not None:
+        index_objects([profile])
+
+
+def _on_delete(sender, instance, **kwargs):
+    unindex(_entity_type_of(sender), [instance.pk])
+
+
+def connect_signals():
+    """Keep the index in sync on save/delete (called from CoreConfig.ready)."""
+    for entity_type, source in SOURCES.items():
+        model = global_apps.get_model(source["model"])
+        post_save.connect(_on_save, sender=model, dispatch_uid=f"search_{entity_type}")
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f"search_{entity_type}")
+    post_save.connect(_on_user_save, sender=global_apps.get_model("auth.User"), dispatch_uid="search_auth_user")
+
+
+def rebuild_search_index(entity_types=None, apps=global_apps):
+    """Recreate the index rows from the source tables. Returns the number written.
+
+    ``apps`` lets data migrations pass their historical registry.
+    """
+    SearchEntry = apps.get_model("core", "SearchEntry")
+    written = 0
+    with transaction.atomic():
+        for entity_type in entity_types or SOURCES:
+            source = SOURCES[entity_type]
+            SearchEntry.objects.filter(entity_type=entity_type).delete()
+            objects = (
+                apps.get_model(source["model"]).objects
+                .filter(**source.get("filter", {})).exclude(**source.get("exclude", {}))
+                .select_related(*source.get("related", []))
+            )
+            batch = []
+            for obj in objects.iterator(chunk_size=2000):
+                batch.append(SearchEntry(entity_type=entity_type, entity_id=obj.pk, **_entry_values(entity_type, obj)))
+                if len(batch) >= 2000:
+                    SearchEntry.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            SearchEntry.objects.bulk_create(batch)
+            written += len(batch)
+    return written
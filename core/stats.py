@@ -0,0 +1,215 @@
+"""
+Incrementally maintained per-outlet counters (``OutletStats``).
+
+Every tracked row (Task, Issue, Form, FormResponse) contributes +1 to exactly one
+(organization, outlet, entity_type, status) bucket, or to none at all when it has
+no outlet or is trashed. Save/delete signals move that contribution between
+buckets inside a transaction; bulk paths that bypass signals (``QuerySet.update``,
+``bulk_create``) call ``rebuild_outlet_stats`` for the outlets they touched, and
+``core.tasks.reconcile_outlet_stats`` rebuilds everything periodically to correct
+drift.
+"""
+from collections import defaultdict
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+
+# entity_type -> (model label, values() lookups for organization, outlet, status, base filters)
+SOURCES = {
+    "task": ("tasks.Task", "organization_id", "outlet_id", {"is_trashed": False}),
+    "issue": ("issues.Issue", "organization_id", "outlet_id", {"is_trashed": False}),
+    "form": ("forms_app.Form", "organization_id", "outlet_id", {}),
+    "form_response": ("forms_app.FormResponse", "form__organization_id", "form__outlet_id", {}),
+}
+
+
+# ============================================================
+# READS
+# ============================================================
+
+def status_counts(org, entity_types=None):
+    """Return {entity_type: {outlet_id: {status: count}}} for the org in one query."""
+    from .models import OutletStats
+
+    rows = OutletStats.objects.filter(organization=org, count__gt=0)
+    if entity_types:
+        rows = rows.filter(entity_type__in=entity_types)
+
+    data = defaultdict(lambda: defaultdict(dict))
+    for entity_type, outlet_id, status, count in rows.values_list(
+        "entity_type", "outlet_id", "status", "count"
+    ):
+        data[entity_type][outlet_id][status] = count
+    return data
+
+
+def total(counts, statuses=None):
+    """Sum a {status: count} dict, optionally restricted to some statuses."""
+    if statuses is None:
+        return sum(counts.values())
+    return sum(counts.get(s, 0) for s in statuses)
+
+
+# ============================================================
+# INCREMENTAL MAINTENANCE
+# ============================================================
+
+def _snapshot_fields(entity_type):
+    if entity_type == "form_response":
+        return ["form_id", "status"]
+    if entity_type in ("task", "issue"):
+        return ["organization_id", "outlet_id", "status", "is_trashed"]
+    return ["organization_id", "outlet_id", "status"]
+
+
+def _snapshot(entity_type, instance):
+    """Cheap copy of the fields that decide an instance's bucket.
+
+    Reads ``__dict__`` directly so deferred fields are never fetched; returns
+    None when a field is missing (e.g. the row was loaded with ``only()``).
+    """
+    d = instance.__dict__
+    fields = _snapshot_fields(entity_type)
+    if any(f not in d for f in fields):
+        return None
+    return tuple(d[f] for f in fields)
+
+
+def _stored_snapshot(entity_type, instance):
+    """Read the bucket fields of the stored row."""
+    fields = _snapshot_fields(entity_type)
+    return type(instance)._base_manager.filter(pk=instance.pk).values_list(*fields).first()
+
+
+def _form_location(form_id, instance=None):
+    form = instance._state.fields_cache.get("form") if instance is not None else None
+    if form is not None and form.pk == form_id:
+        return form.organization_id, form.outlet_id
+    Form = global_apps.get_model("forms_app", "Form")
+    return Form.objects.filter(pk=form_id).values_list("organization_id", "outlet_id").first() or (None, None)
+
+
+def _bucket(entity_type, snapshot, instance=None):
+    """Translate a snapshot into an OutletStats key, or None if it counts nowhere."""
+    if snapshot is None:
+        return None
+    if entity_type == "form_response":
+        form_id, status = snapshot
+        org_id, outlet_id = _form_location(form_id, instance)
+    else:
+        org_id, outlet_id, status = snapshot[:3]
+        if entity_type in ("task", "issue") and snapshot[3]:
+            return None
+    if not org_id or not outlet_id:
+        return None
+    return (org_id, outlet_id, entity_type, status)
+
+
+def _apply(bucket, delta):
+    from .models import OutletStats
+
+    org_id, outlet_id, entity_type, status = bucket
+    lookup = dict(organization_id=org_id, outlet_id=outlet_id, entity_type=entity_type, status=status)
+    updated = OutletStats.objects.filter(**lookup).update(count=F("count") + delta)
+    if not updated and delta > 0:
+        # A missing row on decrement means the outlet or org is being deleted
+        # (or the table drifted); reconciliation takes care of the latter.
+        OutletStats.objects.get_or_create(**lookup, defaults={"count": 0})
+        OutletStats.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def _make_handlers(entity_type):
+    def on_init(sender, instance, **kwargs):
+        instance._outlet_stats_snapshot = _snapshot(entity_type, instance)
+
+    def on_pre_save(sender, instance, raw=False, **kwargs):
+        if raw or instance._state.adding:
+            return
+        if instance._outlet_stats_snapshot is None:
+            instance._outlet_stats_snapshot = _stored_snapshot(entity_type, instance)
+
+    def on_save(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        old = None if created else instance._outlet_stats_snapshot
+        new = _snapshot(entity_type, instance) or _stored_snapshot(entity_type, instance)
+        if old == new:
+            return
+        old_bucket = _bucket(entity_type, old, instance)
+        new_bucket = _bucket(entity_type, new, instance)
+        with transaction.atomic():
+            if old_bucket != new_bucket:
+                if old_bucket:
+                    _apply(old_bucket, -1)
+                if new_bucket:
+                    _apply(new_bucket, 1)
+            if entity_type == "form" and old and old[:2] != new[:2]:
+                # Responses follow their form to its new outlet.
+                outlets = [o for o in (old[1], new[1]) if o]
+                for org_id in {old[0], new[0]}:
+                    rebuild_outlet_stats(org_id, outlets, ["form_response"])
+        instance._outlet_stats_snapshot = new
+
+    def on_delete(sender, instance, **kwargs):
+        snap = instance.__dict__.get("_outlet_stats_snapshot") or _snapshot(entity_type, instance)
+        bucket = _bucket(entity_type, snap, instance)
+        if bucket:
+            _apply(bucket, -1)
+
+    return on_init, on_pre_save, on_save, on_delete
+
+
+def connect_signals():
+    """Wire the save/delete hooks for every tracked model (called from CoreConfig.ready)."""
+    for entity_type, (label, *_rest) in SOURCES.items():
+        model = global_apps.get_model(label)
+        on_init, on_pre_save, on_save, on_delete = _make_handlers(entity_type)
+        uid = f"outlet_stats_{entity_type}"
+        post_init.connect(on_init, sender=model, weak=False, dispatch_uid=uid)
+        pre_save.connect(on_pre_save, sender=model, weak=False, dispatch_uid=uid)
+        post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+
+
+# ============================================================
+# REBUILD / RECONCILIATION
+# ============================================================
+
+def rebuild_outlet_stats(org_id=None, outlet_ids=None, entity_types=None, apps=global_apps):
+    """Recompute counters from the source tables with one grouped query per entity.
+
+    Scoped to an organization, a set of outlets and/or entity types; with no
+    arguments the whole table is rebuilt. Returns the number of rows written.
+    ``apps`` lets data migrations pass their historical registry.
+    """
+    OutletStats = apps.get_model("core", "OutletStats")
+    written = 0
+
+    with transaction.atomic():
+        for entity_type in entity_types or SOURCES:
+            label, org_field, outlet_field, filters = SOURCES[entity_type]
+            source = apps.get_model(label).objects.filter(**filters).exclude(**{f"{outlet_field}__isnull": True})
+            existing = OutletStats.objects.filter(entity_type=entity_type)
+            if org_id:
+                source = source.filter(**{org_field: org_id})
+                existing = existing.filter(organization_id=org_id)
+            if outlet_ids is not None:
+                source = source.filter(**{f"{outlet_field}__in": outlet_ids})
+                existing = existing.filter(outlet_id__in=outlet_ids)
+
+            rows = source.values(org_field, outlet_field, "status").annotate(n=Count("id")).order_by()
+            existing.delete()
+            objs = [
+                OutletStats(
+                    organization_id=row[org_field], outlet_id=row[outlet_field],
+                    entity_type=entity_type, status=row["status"], count=row["n"],
+                )
+                for row in rows
+            ]
+            OutletStats.objects.bulk_create(objs)
+            written += len(objs)
+
+    return written
@@ -0,0 +1,35 @@
+"""
+Celery tasks for core maintenance jobs.
+"""
+from celery import shared_task
+
+
+@shared_task
+def reconcile_outlet_stats():
+    """Rebuild the OutletStats counters from the source tables to correct drift."""
+    from core.caching import bump_org_version
+    from core.models import Organization
+    from core.stats import rebuild_outlet_stats
+
+    rows = rebuild_outlet_stats()
+    for org_id in Organization.objects.values_list("id", flat=True):
+        bump_org_version(org_id)
+    return f"Reconciled {rows} outlet stat rows"
+
+
+@shared_task
+def archive_activity_logs():
+    """Move activity entries past the retention age into the archive files."""
+    from core.archive import archive_activity
+
+    return f"Archived {archive_activity()} activity entries"
+
+
+@shared_task(ignore_result=True)
+def write_activity(rows):
+    """Insert activity entries flushed by a web process (ACTIVITY_LOG_SINK = "celery")."""
+    from core.activity import deserialize
+    from core.models import ActivityLog
+
+    created = ActivityLog.objects.bulk_create([deserialize(row) for row in rows], batch_size=500)
+    return f"Wrote {len(created)} activity entries"
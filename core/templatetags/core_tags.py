@@ -100,3 +100,12 @@ def active_class(request, pattern):
     if re.search(pattern, request.path):
         return "bg-indigo-50 text-indigo-700 border-r-2 border-indigo-600"
     return "text-gray-600 hover:bg-gray-50 hover:text-gray-900"
+
+
+@register.simple_tag
+def cursor_url(request, cursor):
+    """Current query string with ``cursor`` replaced (and any ``page`` dropped)."""
+    params = request.GET.copy()
+    params.pop("page", None)
+    params["cursor"] = cursor
+    return "?" + params.urlencode()
@@ -1,3 +1,29 @@
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from projects.models import Project
+from tasks.models import Task
+from . import search
+from .models import Organization
+
+
+class GroupedSearchTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org", code="ORG")
+        tasks = Task.objects.bulk_create([Task(organization=self.org, title=f"Report {i}") for i in range(250)])
+        search.index_objects(tasks)
+        self.project = Project.objects.create(organization=self.org, name="Report plan")
+
+    def assert_every_type_found(self):
+        grouped = search.grouped_search("rep", self.org, ["task", "project"], 5)
+
+        self.assertEqual(len(grouped["task"]), 5)
+        self.assertEqual(grouped["project"], [(self.project.id, "Report plan")])
+
+    def test_crowded_type_does_not_hide_others(self):
+        self.assert_every_type_found()
+
+    def test_crowded_type_does_not_hide_others_without_fulltext(self):
+        with mock.patch.object(search, "_backend", search.BasicBackend()):
+            self.assert_every_type_found()
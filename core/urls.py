@@ -41,4 +41,5 @@ urlpatterns = [
     # API
     path("api/dashboard/", views.api_dashboard_data, name="api_dashboard"),
     path("api/notifications/", views.api_notifications, name="api_notifications"),
+    path("api/search/", views.api_search, name="api_search"),
 ]
@@ -6,7 +6,9 @@ import random
 import requests
 from datetime import date, timedelta
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.db.models import Count, Q, Sum
@@ -19,6 +21,10 @@ from .models import (
     Organization, Outlet, Team, Permission, Role,
     UserProfile, ActivityLog,
 )
+from . import activity, aggregates, archive, caching
+from .middleware import current_context
+from .pagination import CursorPage, CursorPaginator, InvalidCursor
+from .search import grouped_search, tokenize
 
 
 # ============================================================
@@ -26,47 +32,20 @@ from .models import (
 # ============================================================
 
 def get_current_profile(request):
-    user_id = request.session.get("user_id")
-    if not user_id:
-        return None
-    try:
-        return UserProfile.objects.select_related(
-            "user", "organization", "role", "outlet", "team"
-        ).get(id=user_id)
-    except UserProfile.DoesNotExist:
-        return None
+    return current_context(request).profile
 
 
 def get_current_org(request):
-    org_id = request.session.get("current_org_id")
-    if org_id:
-        try:
-            return Organization.objects.get(id=org_id)
-        except Organization.DoesNotExist:
-            pass
-    profile = get_current_profile(request)
-    if profile:
-        request.session["current_org_id"] = profile.organization.id
-        return profile.organization
-    return None
+    return current_context(request).org
 
 
 def get_current_outlet(request):
-    outlet_id = request.session.get("current_outlet_id")
-    if outlet_id:
-        try:
-            return Outlet.objects.get(id=outlet_id)
-        except Outlet.DoesNotExist:
-            pass
-    return None
+    return current_context(request).outlet
 
 
 def log_activity(org, user_profile, action, entity_type, entity_id=None, entity_name="", details=""):
-    ActivityLog.objects.create(
-        organization=org, user=user_profile, action=action,
-        entity_type=entity_type, entity_id=entity_id,
-        entity_name=entity_name, details=details,
-    )
+    """Record an activity entry (buffered; see core.activity)."""
+    activity.record(org, user_profile, action, entity_type, entity_id, entity_name, details)
 
 
 def paginate(queryset, request, per_page=None):
@@ -75,6 +54,50 @@ def paginate(queryset, request, per_page=None):
     return paginator.get_page(request.GET.get("page", 1))
 
 
+def cursor_paginate(queryset, request, per_page=None):
+    """Keyset-paginate on the queryset's ordering (see core.pagination).
+
+    Pages are addressed by the opaque ``cursor`` query parameter; an invalid or
+    stale cursor falls back to the first page.
+    """
+    per_page = per_page or int(request.GET.get("per_page", getattr(settings, "DEFAULT_PAGE_SIZE", 10)))
+    paginator = CursorPaginator(queryset, per_page)
+    try:
+        return paginator.page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return paginator.page()
+
+
+def board_columns(queryset, field, columns, per_column=None):
+    """Fill each of ``columns`` ({value: {"label": ..., ...}}) with the first
+    ``per_column`` cards (``cards``, a CursorPage) and the total ``count`` of
+    its ``field`` value: one windowed query for the cards of every column and
+    one grouped COUNT, however many rows the board holds."""
+    per_column = per_column or settings.BOARD_COLUMN_SIZE
+    queryset = queryset.filter(**{f"{field}__in": list(columns)})
+    paginator = CursorPaginator(queryset, per_column)
+    pages = paginator.first_pages(field)
+    counts = aggregates.count_by(queryset, field)
+    for value, column in columns.items():
+        column["cards"] = pages.get(value) or CursorPage(paginator, [], False, False)
+        column["count"] = counts.get(value, 0)
+    return columns
+
+
+def board_column_response(request, queryset, template, per_column=None):
+    """JSON for the next cards of one board column: the rendered ``template``
+    (given ``cards``) and the cursor of the page after it."""
+    paginator = CursorPaginator(queryset, per_column or settings.BOARD_COLUMN_SIZE)
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+    return JsonResponse({
+        "html": render_to_string(template, {"cards": page}, request),
+        "next_cursor": page.next_cursor,
+    })
+
+
 def require_perm(profile, codename):
     """Return a redirect response if the user lacks the given permission, else None."""
     if not profile or not profile.has_perm(codename):
@@ -245,66 +268,46 @@ def clear_outlet(request):
 # DASHBOARD
 # ============================================================
 
-def dashboard_view(request):
-    org = get_current_org(request)
-    profile = get_current_profile(request)
-    if not org or not profile:
-        return redirect("login")
-
-    from tasks.models import Task
-    from issues.models import Issue
+def _dashboard_payload(org, outlet):
+    """Counters shown on the dashboard; cached per (org, outlet, data version)."""
     from projects.models import Project
     from forms_app.models import Form
 
-    outlet = get_current_outlet(request)
-
-    # Outlet-wise summary for home page (like Petpooja)
-    outlets = Outlet.objects.filter(organization=org, is_active=True)
-    outlet_summary = []
-    for o in outlets:
-        t = Task.objects.filter(organization=org, outlet=o, is_trashed=False)
-        i = Issue.objects.filter(organization=org, outlet=o, is_trashed=False)
-        f = Form.objects.filter(organization=org, outlet=o)
-        outlet_summary.append({
-            "outlet": o,
-            "tasks_total": t.count(),
-            "tasks_ongoing": t.filter(status="in_progress").count(),
-            "tasks_completed": t.filter(status="completed").count(),
-            "tasks_overdue": t.filter(due_date__lt=timezone.now(), status__in=["todo", "in_progress"]).count(),
-            "tasks_scheduled": t.filter(status="scheduled").count(),
-            "issues_total": i.count(),
-            "issues_open": i.filter(status="open").count(),
-            "issues_ignored": i.filter(status="ignored").count(),
-            "issues_resolved": i.filter(status="resolved").count(),
-            "forms_total": f.count(),
-            "forms_ongoing": f.filter(status="published").count(),
-            "forms_open_responses": sum(fm.open_response_count for fm in f),
-            "forms_submitted": sum(fm.response_count for fm in f),
-        })
+    now = timezone.now()
+    payload = {
+        # Outlet-wise summary for home page (like Petpooja)
+        "outlet_summary": aggregates.outlet_summary(org, now),
+    }
 
     # Global stats
-    task_qs = Task.objects.filter(organization=org, is_trashed=False)
-    if outlet:
-        task_qs = task_qs.filter(outlet=outlet)
-
-    total_tasks = task_qs.count()
-    ongoing = task_qs.filter(status="in_progress").count()
-    completed = task_qs.filter(status="completed").count()
-    overdue = task_qs.filter(due_date__lt=timezone.now()).exclude(status="completed").count()
-    scheduled = task_qs.filter(status="scheduled").count()
+    payload.update(aggregates.task_stats(org, outlet, now))
+    payload.update(aggregates.issue_stats(org, outlet))
 
     projects = Project.objects.filter(organization=org, is_active=True)
     if outlet:
         projects = projects.filter(outlet=outlet)
 
-    issue_qs = Issue.objects.filter(organization=org, is_trashed=False)
-    if outlet:
-        issue_qs = issue_qs.filter(outlet=outlet)
-
     form_qs = Form.objects.filter(organization=org)
     if outlet:
         form_qs = form_qs.filter(outlet=outlet)
 
+    payload["projects_count"] = projects.count()
+    payload["forms_count"] = form_qs.count()
+    return payload
+
+
+def dashboard_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+
+    outlet = get_current_outlet(request)
+    payload = caching.get_or_build(
+        "dashboard", org, lambda: _dashboard_payload(org, outlet),
+        settings.CACHE_TTL_DASHBOARD, outlet=outlet,
+    )
+
     # AI Reviews placeholder
     from ai_engine.models import AIAnalysis
     ai_reviews = AIAnalysis.objects.filter(organization=org).count()
@@ -316,20 +319,9 @@ def dashboard_view(request):
     context = {
         "org": org,
         "outlet": outlet,
-        "outlet_summary": outlet_summary,
-        "projects_count": projects.count(),
-        "total_tasks": total_tasks,
-        "ongoing": ongoing,
-        "completed": completed,
-        "overdue": overdue,
-        "scheduled": scheduled,
         "ai_reviews": ai_reviews,
-        "issues_count": issue_qs.count(),
-        "issues_open": issue_qs.filter(status="open").count(),
-        "issues_ignored": issue_qs.filter(status="ignored").count(),
-        "issues_resolved": issue_qs.filter(status="resolved").count(),
-        "forms_count": form_qs.count(),
         "recent_activities": recent_activities,
+        **payload,
     }
     return render(request, "dashboard.html", context)
 
@@ -493,7 +485,7 @@ def user_list_view(request):
             Q(employee_id__icontains=search)
         )
 
-    users = paginate(users, request)
+    users = cursor_paginate(users, request)
     roles = Role.objects.filter(organization=org, is_active=True)
     teams = Team.objects.filter(organization=org, is_active=True)
     return render(request, "users/list.html", {"users": users, "roles": roles, "teams": teams})
@@ -669,42 +661,65 @@ def activity_log_view(request):
     if denied:
         return denied
 
-    activities = ActivityLog.objects.filter(organization=org).select_related("user", "user__user")
     search = request.GET.get("search", "").strip()
     action = request.GET.get("action", "").strip()
-    if search:
-        activities = activities.filter(Q(entity_name__icontains=search) | Q(details__icontains=search))
-    if action:
-        activities = activities.filter(action=action)
+    months = archive.archived_months(org.id)
+    month = request.GET.get("month", "")
 
-    activities = paginate(activities, request, 50)
-    return render(request, "activity_log.html", {"activities": activities})
+    if month in months:
+        # Entries past the retention age are read back from the archive file.
+        try:
+            offset = max(int(request.GET.get("cursor") or 0), 0)
+        except ValueError:
+            offset = 0
+        activities = archive.ArchivePage(archive.iter_archived(org.id, month, search, action), offset, 50)
+    else:
+        month = ""
+        activities = ActivityLog.objects.filter(organization=org).select_related("user", "user__user")
+        if search:
+            activities = activities.filter(Q(entity_name__icontains=search) | Q(details__icontains=search))
+        if action:
+            activities = activities.filter(action=action)
+        activities = cursor_paginate(activities, request, 50)
+
+    return render(request, "activity_log.html", {
+        "activities": activities, "archived_months": months, "month": month,
+    })
 
 
 # ============================================================
 # API ENDPOINTS
 # ============================================================
 
-def api_dashboard_data(request):
-    org = get_current_org(request)
-    if not org:
-        return JsonResponse({"error": "No organization"}, status=400)
-
+def _dashboard_chart_data(org):
     from tasks.models import Task
     tasks = Task.objects.filter(organization=org, is_trashed=False)
+    by_status = aggregates.count_by(tasks, "status")
+    by_priority = aggregates.count_by(tasks, "priority")
 
     data = {
         "status": {
             "labels": ["To Do", "In Progress", "In Review", "Completed", "On Hold"],
-            "data": [tasks.filter(status=s).count() for s in ["todo", "in_progress", "review", "completed", "on_hold"]],
+            "data": [by_status.get(s, 0) for s in ["todo", "in_progress", "review", "completed", "on_hold"]],
             "colors": ["#6b7280", "#3b82f6", "#a855f7", "#22c55e", "#f97316"],
         },
         "priority": {
             "labels": ["Critical", "High", "Medium", "Low"],
-            "data": [tasks.filter(priority=p).count() for p in ["critical", "high", "medium", "low"]],
+            "data": [by_priority.get(p, 0) for p in ["critical", "high", "medium", "low"]],
             "colors": ["#ef4444", "#f97316", "#eab308", "#22c55e"],
         },
     }
+    return data
+
+
+def api_dashboard_data(request):
+    org = get_current_org(request)
+    if not org:
+        return JsonResponse({"error": "No organization"}, status=400)
+
+    data = caching.get_or_build(
+        "dashboard_charts", org, lambda: _dashboard_chart_data(org), settings.CACHE_TTL_DASHBOARD,
+    )
     return JsonResponse(data)
 
 
@@ -713,15 +728,67 @@ def api_notifications(request):
     if not profile:
         return JsonResponse({"error": "Unauthorized"}, status=401)
 
+    from notifications.counters import reset_unread
     from notifications.models import Notification
     if request.method == "POST":
         Notification.objects.filter(user=profile, is_read=False).update(is_read=True)
+        reset_unread([profile.id])
         return JsonResponse({"success": True})
 
+    from notifications.counters import unread_count
     notifs = Notification.objects.filter(user=profile)[:20]
-    data = [{
-        "id": n.id, "title": n.title, "message": n.message,
-        "is_read": n.is_read, "link": n.link,
-        "created_at": n.created_at.strftime("%b %d, %Y %I:%M %p"),
-    } for n in notifs]
-    return JsonResponse({"notifications": data})
\ No newline at end of file
+    data = [n.to_dict() for n in notifs]
+    return JsonResponse({"notifications": data, "unread": unread_count(profile.id)})
+
+
+# entity_type -> (permission, result label, detail URL name)
+GLOBAL_SEARCH_TYPES = {
+    "task": ("view_tasks", "Tasks", "task_detail"),
+    "issue": ("view_issues", "Issues", "issue_detail"),
+    "project": ("view_projects", "Projects", "project_detail"),
+    "form": ("view_forms", "Forms", "form_detail"),
+    "task_template": ("view_templates", "Task Templates", "template_detail"),
+    "project_template": ("view_templates", "Project Templates", "template_library"),
+    "user": ("view_users", "Users", "user_edit"),
+}
+
+
+def _search_url(entity_type, entity_id):
+    url_name = GLOBAL_SEARCH_TYPES[entity_type][2]
+    if entity_type == "project_template":
+        return reverse(url_name) + "?tab=project"
+    return reverse(url_name, args=[entity_id])
+
+
+def _global_search_data(query, org, entity_types):
+    grouped = grouped_search(query, org, entity_types, settings.SEARCH_GLOBAL_PER_TYPE)
+    return [
+        {
+            "type": entity_type,
+            "label": GLOBAL_SEARCH_TYPES[entity_type][1],
+            "results": [
+                {"id": entity_id, "title": title, "url": _search_url(entity_type, entity_id)}
+                for entity_id, title in grouped[entity_type]
+            ],
+        }
+        for entity_type in entity_types if entity_type in grouped
+    ]
+
+
+def api_search(request):
+    """Command-palette search over everything the user may view in the org."""
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    query = " ".join(tokenize(request.GET.get("q", "")))
+    entity_types = [t for t, (perm, _label, _url) in GLOBAL_SEARCH_TYPES.items() if profile.has_perm(perm)]
+    if not query or not entity_types:
+        return JsonResponse({"query": query, "groups": []})
+
+    groups = caching.get_or_build(
+        "search", org, lambda: _global_search_data(query, org, entity_types), settings.CACHE_TTL_SEARCH,
+        params={"q": query.lower(), "types": entity_types},
+    )
+    return JsonResponse({"query": query, "groups": groups})
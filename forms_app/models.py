@@ -1,8 +1,18 @@
 """Forms app models: Form builder with fields, responses."""
 from django.db import models
+from core.aggregates import related_count
 from core.models import Organization, Outlet, Team, UserProfile
 
 
+class FormQuerySet(models.QuerySet):
+    def with_response_counts(self):
+        responses = FormResponse.objects.all()
+        return self.annotate(
+            num_responses=related_count(responses, "form"),
+            num_open_responses=related_count(responses.filter(status="open"), "form"),
+        )
+
+
 class Form(models.Model):
     STATUS_CHOICES = [
         ("saved", "Saved"),
@@ -31,15 +41,21 @@ class Form(models.Model):
             models.Index(fields=["created_at"]),
         ]
 
+    objects = FormQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     @property
     def response_count(self):
+        if hasattr(self, "num_responses"):
+            return self.num_responses
         return self.responses.count()
 
     @property
     def open_response_count(self):
+        if hasattr(self, "num_open_responses"):
+            return self.num_open_responses
         return self.responses.filter(status="open").count()
 
 
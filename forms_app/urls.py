@@ -7,4 +7,5 @@ urlpatterns = [
     path("<int:form_id>/", views.form_detail_view, name="form_detail"),
     path("<int:form_id>/respond/", views.form_respond_view, name="form_respond"),
     path("<int:form_id>/response/<int:response_id>/", views.form_response_detail_view, name="form_response_detail"),
+    path("<int:form_id>/export/", views.form_responses_export_view, name="form_responses_export"),
 ]
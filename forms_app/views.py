@@ -5,10 +5,12 @@ import json
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Q
 
+from core import export
+from core.search import filter_queryset
 from core.views import get_current_org, get_current_profile, get_current_outlet, log_activity, paginate, require_perm
 from core.models import Outlet, Team, UserProfile
+from notifications.service import notify
 from .models import Form, FormResponse
 
 
@@ -23,7 +25,7 @@ def form_list_view(request):
 
     forms = Form.objects.filter(organization=org).exclude(status="trashed").select_related(
         "outlet", "team", "created_by", "created_by__user"
-    )
+    ).with_response_counts()
 
     outlet = get_current_outlet(request)
     if outlet:
@@ -35,7 +37,7 @@ def form_list_view(request):
     if status:
         forms = forms.filter(status=status)
     if search:
-        forms = forms.filter(Q(title__icontains=search) | Q(description__icontains=search))
+        forms = filter_queryset(forms, search, "form", org, outlet)
 
     forms = paginate(forms, request)
     return render(request, "forms/list.html", {
@@ -161,18 +163,16 @@ def form_respond_view(request, form_id):
         FormResponse.objects.create(
             form=form, submitted_by=profile, data=data, status="submitted"
         )
-        log_activity(org, profile, "responded", "form", form.id, form.title)
-
-        from notifications.models import Notification
-        if form.created_by and form.created_by != profile:
-            Notification.objects.create(
-                organization=org, user=form.created_by,
-                notification_type="form_response",
-                title="New Form Response",
-                message=f"{profile.full_name} responded to '{form.title}'",
-                link=f"/forms/{form.id}/",
-                entity_type="form", entity_id=form.id,
-            )
+        log_activity(org, profile, "responded", "form", form.id, form.name)
+
+        notify(
+            [form.created_by_id], exclude=[profile], organization=org,
+            notification_type="form_response",
+            title="New Form Response",
+            message=f"{profile.full_name} responded to '{form.name}'",
+            link=f"/forms/{form.id}/",
+            entity_type="form", entity_id=form.id,
+        )
 
         return redirect("form_detail", form_id=form.id)
 
@@ -205,3 +205,44 @@ def form_response_detail_view(request, form_id, response_id):
         "form": form, "response": response,
         "fields": form.fields_schema if form.fields_schema else [],
     })
+
+
+def form_responses_export_view(request, form_id):
+    """Stream a form's responses as CSV or XLSX (``?format=``), one column per field."""
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_forms")
+    if denied:
+        return denied
+    fmt = export.requested_format(request)
+    if not fmt:
+        return JsonResponse({"error": "Unknown export format"}, status=400)
+
+    form = get_object_or_404(Form, id=form_id, organization=org)
+    labels = [f.get("label", "") for f in (form.fields_schema or []) if f.get("label")]
+    columns = [
+        ("id", "ID"), ("submitted_by", "Submitted By"), ("status", "Status"),
+        ("submitted_at", "Submitted At"), ("created_at", "Created At"),
+    ] + [(f"field:{label}", label) for label in labels]
+    status_labels = dict(FormResponse.STATUS_CHOICES)
+
+    def rows():
+        responses = FormResponse.objects.filter(form=form)
+        for r in export.iter_values(
+            responses, "id", "status", "submitted_at", "created_at", "data",
+            "submitted_by__user__first_name", "submitted_by__user__last_name", "submitted_by__user__username",
+        ):
+            data = r["data"] or {}
+            yield {
+                **r,
+                **{f"field:{label}": data.get(label) for label in labels},
+                "status": status_labels.get(r["status"], r["status"]),
+                "submitted_by": export.full_name(
+                    r["submitted_by__user__first_name"], r["submitted_by__user__last_name"],
+                    r["submitted_by__user__username"],
+                ),
+            }
+
+    return export.export_response(request, columns, rows(), f"form-{form.id}-responses", fmt)
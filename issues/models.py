@@ -50,6 +50,12 @@ class Issue(models.Model):
     def __str__(self):
         return self.title
 
+    @property
+    def assignee_list(self):
+        if "assigned_to" in getattr(self, "_prefetched_objects_cache", {}):
+            return self.assigned_to.all()
+        return self.assigned_to.select_related("user").all()
+
     @property
     def priority_color(self):
         colors = {
@@ -4,7 +4,9 @@ from . import views
 urlpatterns = [
     path("", views.issue_list_view, name="issue_list"),
     path("board/", views.issue_board_view, name="issue_board"),
+    path("board/column/<str:status>/", views.api_issue_board_column, name="api_issue_board_column"),
     path("create/", views.issue_create_view, name="issue_create"),
+    path("export/", views.issue_export_view, name="issue_export"),
     path("<int:issue_id>/", views.issue_detail_view, name="issue_detail"),
     path("api/<int:issue_id>/status/", views.api_issue_status_update, name="api_issue_status"),
 ]
@@ -5,14 +5,33 @@ import json
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
 
-from core.views import get_current_org, get_current_profile, get_current_outlet, log_activity, paginate, require_perm
+from core import export
+from core.search import filter_queryset
+from core.views import board_column_response, board_columns, cursor_paginate, get_current_org, get_current_profile, get_current_outlet, log_activity, require_perm
 from core.models import Outlet, Team, UserProfile
+from notifications.service import notify
 from .models import Issue, IssueComment
 
 
+def _filter_issues(request, org, issues):
+    """Apply the current outlet and the issue list's GET filters; returns the
+    queryset and the filter values for the template."""
+    outlet = get_current_outlet(request)
+    if outlet:
+        issues = issues.filter(outlet=outlet)
+
+    filters = {key: request.GET.get(key, "") for key in ("status", "priority", "search")}
+    if filters["status"]:
+        issues = issues.filter(status=filters["status"])
+    if filters["priority"]:
+        issues = issues.filter(priority=filters["priority"])
+    if filters["search"]:
+        issues = filter_queryset(issues, filters["search"], "issue", org, outlet)
+    return issues, filters
+
+
 def issue_list_view(request):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -26,23 +45,10 @@ def issue_list_view(request):
         "outlet", "team", "created_by", "created_by__user"
     ).prefetch_related("assigned_to", "assigned_to__user")
 
-    outlet = get_current_outlet(request)
-    if outlet:
-        issues = issues.filter(outlet=outlet)
-
-    status = request.GET.get("status", "")
-    priority = request.GET.get("priority", "")
-    search = request.GET.get("search", "")
+    issues, filters = _filter_issues(request, org, issues)
     view_mode = request.GET.get("view", "list")
 
-    if status:
-        issues = issues.filter(status=status)
-    if priority:
-        issues = issues.filter(priority=priority)
-    if search:
-        issues = issues.filter(Q(title__icontains=search) | Q(description__icontains=search))
-
-    issues = paginate(issues, request)
+    issues = cursor_paginate(issues, request)
     outlets = Outlet.objects.filter(organization=org, is_active=True)
     teams = Team.objects.filter(organization=org, is_active=True)
     members = UserProfile.objects.filter(organization=org, is_active=True).select_related("user")
@@ -50,13 +56,44 @@ def issue_list_view(request):
     return render(request, "issues/list.html", {
         "issues": issues, "outlets": outlets, "teams": teams, "members": members,
         "view_mode": view_mode,
-        "filters": {"status": status, "priority": priority, "search": search},
+        "filters": filters,
         "status_choices": Issue.STATUS_CHOICES,
         "priority_choices": Issue.PRIORITY_CHOICES,
     })
 
 
-def issue_board_view(request):
+EXPORT_COLUMNS = [
+    ("id", "ID"), ("title", "Title"), ("status", "Status"), ("priority", "Priority"),
+    ("outlet", "Outlet"), ("team", "Team"), ("assignees", "Assigned To"), ("created_by", "Created By"),
+    ("start_date", "Start Date"), ("resolved_at", "Resolved At"), ("created_at", "Created At"),
+]
+
+EXPORT_FIELDS = [
+    "id", "title", "status", "priority", "start_date", "resolved_at", "created_at", "outlet__name", "team__name",
+    "created_by__user__first_name", "created_by__user__last_name", "created_by__user__username",
+]
+
+
+def _export_rows(issues):
+    status_labels, priority_labels = dict(Issue.STATUS_CHOICES), dict(Issue.PRIORITY_CHOICES)
+    for chunk in export.chunked(export.iter_values(issues, *EXPORT_FIELDS)):
+        assignees = export.member_names(Issue.assigned_to.through, "issue_id", [r["id"] for r in chunk])
+        for r in chunk:
+            yield {
+                **r,
+                "status": status_labels.get(r["status"], r["status"]),
+                "priority": priority_labels.get(r["priority"], r["priority"]),
+                "outlet": r["outlet__name"], "team": r["team__name"],
+                "assignees": assignees.get(r["id"], ""),
+                "created_by": export.full_name(
+                    r["created_by__user__first_name"], r["created_by__user__last_name"],
+                    r["created_by__user__username"],
+                ),
+            }
+
+
+def issue_export_view(request):
+    """Stream the filtered issue list as CSV or XLSX (``?format=``)."""
     org = get_current_org(request)
     profile = get_current_profile(request)
     if not org or not profile:
@@ -64,7 +101,24 @@ def issue_board_view(request):
     denied = require_perm(profile, "view_issues")
     if denied:
         return denied
+    fmt = export.requested_format(request)
+    if not fmt:
+        return JsonResponse({"error": "Unknown export format"}, status=400)
+
+    issues, _filters = _filter_issues(request, org, Issue.objects.filter(organization=org, is_trashed=False))
+    return export.export_response(request, EXPORT_COLUMNS, _export_rows(issues), "issues", fmt)
 
+
+# status -> (column label, color)
+BOARD_COLUMNS = {
+    "open": ("Open", "#ef4444"),
+    "resolved": ("Resolved", "#22c55e"),
+    "ignored": ("Ignored", "#6b7280"),
+    "closed": ("Closed", "#3b82f6"),
+}
+
+
+def _board_issues(request, org):
     issues = Issue.objects.filter(organization=org, is_trashed=False).select_related(
         "outlet", "team", "created_by", "created_by__user"
     ).prefetch_related("assigned_to", "assigned_to__user")
@@ -72,20 +126,38 @@ def issue_board_view(request):
     outlet = get_current_outlet(request)
     if outlet:
         issues = issues.filter(outlet=outlet)
+    return issues
+
 
-    columns = {
-        "open": {"label": "Open", "color": "#ef4444", "issues": []},
-        "resolved": {"label": "Resolved", "color": "#22c55e", "issues": []},
-        "ignored": {"label": "Ignored", "color": "#6b7280", "issues": []},
-        "closed": {"label": "Closed", "color": "#3b82f6", "issues": []},
-    }
-    for i in issues:
-        if i.status in columns:
-            columns[i.status]["issues"].append(i)
+def issue_board_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_issues")
+    if denied:
+        return denied
+
+    columns = board_columns(_board_issues(request, org), "status", {
+        status: {"label": label, "color": color} for status, (label, color) in BOARD_COLUMNS.items()
+    })
 
     return render(request, "issues/board.html", {"columns": columns})
 
 
+def api_issue_board_column(request, status):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    if not profile.has_perm("view_issues"):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    if status not in BOARD_COLUMNS:
+        return JsonResponse({"error": "Unknown column"}, status=404)
+
+    return board_column_response(request, _board_issues(request, org).filter(status=status), "issues/board_cards.html")
+
+
 def issue_create_view(request):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -106,26 +178,24 @@ def issue_create_view(request):
                 team_id=request.POST.get("team") or None,
                 created_by=profile,
                 start_date=request.POST.get("start_date") or None,
-                due_date=request.POST.get("due_date") or None,
                 tags=request.POST.get("tags", ""),
             )
-            assigned_ids = request.POST.getlist("assigned_to")
-            if assigned_ids:
-                issue.assigned_to.set(UserProfile.objects.filter(id__in=assigned_ids, organization=org))
+            assignees = list(UserProfile.objects.filter(
+                id__in=request.POST.getlist("assigned_to"), organization=org,
+            ).values_list("id", flat=True))
+            if assignees:
+                issue.assigned_to.set(assignees)
 
             log_activity(org, profile, "created", "issue", issue.id, issue.title)
 
-            from notifications.models import Notification
-            for assignee in issue.assigned_to.all():
-                if assignee != profile:
-                    Notification.objects.create(
-                        organization=org, user=assignee,
-                        notification_type="issue_created",
-                        title="New Issue Assigned",
-                        message=f"Issue: '{issue.title}'",
-                        link=f"/issues/{issue.id}/",
-                        entity_type="issue", entity_id=issue.id,
-                    )
+            notify(
+                assignees, exclude=[profile], organization=org,
+                notification_type="issue_created",
+                title="New Issue Assigned",
+                message=f"Issue: '{issue.title}'",
+                link=f"/issues/{issue.id}/",
+                entity_type="issue", entity_id=issue.id,
+            )
 
             return redirect("issue_list")
 
@@ -168,9 +238,11 @@ def issue_detail_view(request, issue_id):
                 issue.resolved_at = timezone.now()
 
             issue.save()
-            assigned_ids = request.POST.getlist("assigned_to")
-            if assigned_ids:
-                issue.assigned_to.set(UserProfile.objects.filter(id__in=assigned_ids, organization=org))
+            assignees = list(UserProfile.objects.filter(
+                id__in=request.POST.getlist("assigned_to"), organization=org,
+            ).values_list("id", flat=True))
+            if assignees:
+                issue.assigned_to.set(assignees)
             log_activity(org, profile, "updated", "issue", issue.id, issue.title)
             return redirect("issue_detail", issue_id=issue.id)
 
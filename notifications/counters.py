@@ -0,0 +1,149 @@
+"""
+Unread-notification counters.
+
+Each user's count is stored in ``UserProfile.unread_notifications`` and mirrored
+in the cache under ``unread:<profile id>``. Creating an unread notification
+increments both atomically (an ``F()`` UPDATE, then ``cache.incr`` after commit),
+so reading the badge costs no query while the cache is warm. Marking read resets
+both. Every change is pushed to the user's open streams (notifications.pubsub).
+Save/delete signals cover single rows; bulk paths call ``add_unread``
+(``bulk_create``) or ``reset_unread`` (``QuerySet.update``) themselves, and
+``manage.py repair_unread_counts`` recomputes the column from the table.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .pubsub import publish, publish_on_commit
+
+
+def _key(profile_id):
+    return f"unread:{profile_id}"
+
+
+def unread_count(profile_id):
+    """Number of unread notifications of a user."""
+    from core.models import UserProfile
+
+    count = cache.get(_key(profile_id))
+    if count is None:
+        count = UserProfile.objects.filter(id=profile_id).values_list(
+            "unread_notifications", flat=True
+        ).first() or 0
+        cache.add(_key(profile_id), count, settings.CACHE_TTL_UNREAD)
+    return max(count, 0)
+
+
+def _incr_cached(deltas):
+    for profile_id, delta in deltas.items():
+        try:
+            cache.incr(_key(profile_id), delta)
+        except ValueError:
+            pass  # not cached; the next read loads the column
+        publish(profile_id, "badge", {"unread": unread_count(profile_id)})
+
+
+def add_unread(deltas):
+    """Apply {profile_id: delta} to the counters (one UPDATE per distinct delta)."""
+    from core.models import UserProfile
+
+    deltas = {pid: d for pid, d in deltas.items() if pid and d}
+    if not deltas:
+        return
+    by_delta = defaultdict(list)
+    for profile_id, delta in deltas.items():
+        by_delta[delta].append(profile_id)
+    for delta, profile_ids in by_delta.items():
+        UserProfile.objects.filter(id__in=profile_ids).update(
+            unread_notifications=F("unread_notifications") + delta
+        )
+    transaction.on_commit(lambda: _incr_cached(deltas))
+
+
+def count_created(notifications):
+    """Increment the counters for notifications inserted with ``bulk_create``."""
+    add_unread(Counter(n.user_id for n in notifications if not n.is_read))
+    for n in notifications:
+        publish_on_commit(n.user_id, "notification", n.to_dict())
+
+
+def reset_unread(profile_ids):
+    """Zero the counters after all of the users' notifications were marked read."""
+    from core.models import UserProfile
+
+    profile_ids = [pid for pid in set(profile_ids) if pid]
+    if not profile_ids:
+        return
+    UserProfile.objects.filter(id__in=profile_ids).update(unread_notifications=0)
+    transaction.on_commit(lambda: _reset_cached(profile_ids))
+
+
+def _reset_cached(profile_ids):
+    cache.set_many({_key(pid): 0 for pid in profile_ids}, settings.CACHE_TTL_UNREAD)
+    for profile_id in profile_ids:
+        publish(profile_id, "badge", {"unread": 0})
+
+
+def repair_unread_counts(profile_ids=None):
+    """Recompute the column from the notification table and drop cached values.
+
+    Returns the number of profiles whose stored count was wrong.
+    """
+    from core.models import UserProfile
+    from .models import Notification
+
+    profiles = UserProfile.objects.all()
+    unread = Notification.objects.filter(is_read=False)
+    if profile_ids is not None:
+        profiles = profiles.filter(id__in=profile_ids)
+        unread = unread.filter(user_id__in=profile_ids)
+    actual = dict(unread.values_list("user_id").annotate(n=Count("id")).order_by())
+
+    wrong = [
+        UserProfile(id=profile_id, unread_notifications=actual.get(profile_id, 0))
+        for profile_id, stored in profiles.values_list("id", "unread_notifications").iterator()
+        if stored != actual.get(profile_id, 0)
+    ]
+    UserProfile.objects.bulk_update(wrong, ["unread_notifications"], batch_size=500)
+    cache.delete_many([_key(pid) for pid in profiles.values_list("id", flat=True)])
+    return len(wrong)
+
+
+def _on_init(sender, instance, **kwargs):
+    # None: loaded without is_read, so the previous state is unknown.
+    if instance.pk is None:
+        instance._was_unread = False
+    elif "is_read" in instance.__dict__:
+        instance._was_unread = not instance.is_read
+    else:
+        instance._was_unread = None
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        publish_on_commit(instance.user_id, "notification", instance.to_dict())
+    elif instance._was_unread is None:
+        return
+    unread = not instance.is_read
+    if unread != bool(instance._was_unread):
+        add_unread({instance.user_id: 1 if unread else -1})
+    instance._was_unread = unread
+
+
+def _on_delete(sender, instance, **kwargs):
+    if instance._was_unread:
+        add_unread({instance.user_id: -1})
+
+
+def connect_signals():
+    from .models import Notification
+
+    post_init.connect(_on_init, sender=Notification, dispatch_uid="unread_counter")
+    post_save.connect(_on_save, sender=Notification, dispatch_uid="unread_counter")
+    post_delete.connect(_on_delete, sender=Notification, dispatch_uid="unread_counter")
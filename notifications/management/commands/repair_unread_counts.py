@@ -0,0 +1,18 @@
+"""
+Recompute UserProfile.unread_notifications from the notification table.
+"""
+from django.core.management.base import BaseCommand
+
+from notifications.counters import repair_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized unread notification counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="UserProfile id to repair (repeatable; default: everyone)")
+
+    def handle(self, *args, **options):
+        fixed = repair_unread_counts(options["users"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired {fixed} unread counters"))
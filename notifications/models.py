@@ -46,3 +46,11 @@ class Notification(models.Model):
 
     def __str__(self):
         return self.title
+
+    def to_dict(self):
+        """JSON shape shared by the notifications API and the push stream."""
+        return {
+            "id": self.id, "title": self.title, "message": self.message,
+            "is_read": self.is_read, "link": self.link,
+            "created_at": self.created_at.strftime("%b %d, %Y %I:%M %p"),
+        }
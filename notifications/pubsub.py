@@ -0,0 +1,136 @@
+"""
+Pub/sub channel behind the notification stream.
+
+Publishers are ordinary sync code (views, signals, Celery tasks) and call
+``publish(profile_id, event, data)``; the SSE view holds a subscription per
+connected tab. The backend is chosen by ``NOTIFICATION_PUBSUB_BACKEND``:
+
+    notifications.pubsub.InProcessBackend  single process (runserver, one worker)
+    notifications.pubsub.RedisBackend      Redis PUBLISH/SUBSCRIBE, shared by all
+                                           web and Celery processes
+
+Publishing never raises: a lost event only delays the badge until the next one.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(profile_id):
+    return f"notifications:user:{profile_id}"
+
+
+class InProcessBackend:
+    """Delivers to subscribers of the current process only."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                pass  # the subscriber's loop is closed; it unsubscribes itself
+
+    def subscribe(self, channel):
+        return _InProcessSubscription(self, channel)
+
+
+class _InProcessSubscription:
+    def __init__(self, backend, channel):
+        self.backend = backend
+        self.channel = channel
+        self.queue = None
+
+    async def __aenter__(self):
+        self.queue = asyncio.Queue()
+        self._entry = (asyncio.get_running_loop(), self.queue)
+        with self.backend._lock:
+            self.backend._subscribers[self.channel].add(self._entry)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        with self.backend._lock:
+            subscribers = self.backend._subscribers.get(self.channel)
+            if subscribers is not None:
+                subscribers.discard(self._entry)
+                if not subscribers:
+                    del self.backend._subscribers[self.channel]
+
+    async def get(self, timeout):
+        """Next message, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBackend:
+    """Redis PUBLISH/SUBSCRIBE on ``NOTIFICATION_PUBSUB_URL``."""
+
+    def __init__(self):
+        self.url = settings.NOTIFICATION_PUBSUB_URL
+        self._client = None
+
+    def publish(self, channel, message):
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, json.dumps(message))
+
+    def subscribe(self, channel):
+        return _RedisSubscription(self.url, channel)
+
+
+class _RedisSubscription:
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+
+    async def __aenter__(self):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis.from_url(self.url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def get(self, timeout):
+        """Next message, or None if nothing arrived within ``timeout`` seconds."""
+        message = await self.pubsub.get_message(timeout=timeout)
+        return json.loads(message["data"]) if message else None
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.NOTIFICATION_PUBSUB_BACKEND)()
+
+
+def publish(profile_id, event, data):
+    """Send an event to every open stream of a user."""
+    try:
+        get_backend().publish(user_channel(profile_id), {"event": event, "data": data})
+    except Exception:
+        logger.warning("notification publish failed for user %s", profile_id, exc_info=True)
+
+
+def publish_on_commit(profile_id, event, data):
+    transaction.on_commit(lambda: publish(profile_id, event, data))
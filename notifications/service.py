@@ -0,0 +1,102 @@
+"""
+Notification fan-out.
+
+Every code path that notifies people goes through ``notify`` (one payload, many
+recipients) or ``notify_many`` (a stream of (recipient, payload) pairs, for
+sweeps where each task has its own message). Both:
+
+    - drop recipients in ``exclude`` (usually the acting user),
+    - skip a notification identical to one the recipient got within the dedupe
+      window (same type, entity and message), and duplicates within the call,
+    - insert in chunks of CHUNK_SIZE with one ``bulk_create`` each, and
+    - bump the unread counters and publish to the recipients' streams after
+      commit (``counters.count_created``).
+
+So notifying a 60-person team is one SELECT and one INSERT.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+
+from .counters import count_created
+
+CHUNK_SIZE = 500
+
+PAYLOAD_FIELDS = {
+    "organization", "notification_type", "title", "message", "link",
+    "entity_type", "entity_id", "priority",
+}
+
+
+def _pk(obj):
+    return getattr(obj, "pk", obj)
+
+
+def _key(user_id, payload):
+    return (
+        user_id, payload.get("notification_type", "system"),
+        payload.get("entity_type", ""), payload.get("entity_id"), payload.get("message", ""),
+    )
+
+
+def _build(user_id, payload):
+    from .models import Notification
+
+    values = dict(payload)
+    organization = values.pop("organization", None)
+    return Notification(user_id=user_id, organization_id=_pk(organization), **values)
+
+
+def _recently_sent(chunk, since):
+    from .models import Notification
+
+    return set(
+        Notification.objects.filter(
+            created_at__gte=since,
+            user_id__in={user_id for user_id, _payload in chunk},
+            notification_type__in={p.get("notification_type", "system") for _u, p in chunk},
+        ).values_list("user_id", "notification_type", "entity_type", "entity_id", "message")
+    )
+
+
+def notify_many(pairs, exclude=(), dedupe_within=None):
+    """Create one notification per (recipient, payload) pair; recipients are
+    profiles or profile ids. Returns the number of notifications created.
+
+    ``dedupe_within`` (a timedelta) defaults to NOTIFICATION_DEDUPE_WINDOW.
+    """
+    from .models import Notification
+
+    if dedupe_within is None:
+        dedupe_within = timedelta(seconds=settings.NOTIFICATION_DEDUPE_WINDOW)
+    since = timezone.now() - dedupe_within
+    excluded = {_pk(e) for e in exclude if e is not None}
+    unsent = ((_pk(r), payload) for r, payload in pairs if r is not None and _pk(r) not in excluded)
+
+    seen, created = set(), 0
+    while True:
+        chunk = list(islice(unsent, CHUNK_SIZE))
+        if not chunk:
+            return created
+        sent = _recently_sent(chunk, since) if dedupe_within else set()
+        batch = []
+        for user_id, payload in chunk:
+            key = _key(user_id, payload)
+            if key in sent or key in seen:
+                continue
+            seen.add(key)
+            batch.append(_build(user_id, payload))
+        if batch:
+            count_created(Notification.objects.bulk_create(batch))
+            created += len(batch)
+
+
+def notify(recipients, exclude=(), dedupe_within=None, **payload):
+    """Send the notification described by ``payload`` (Notification field
+    values; ``organization`` may be an object or id) to every recipient."""
+    unknown = set(payload) - PAYLOAD_FIELDS
+    if unknown:
+        raise TypeError(f"Unknown notification fields: {', '.join(sorted(unknown))}")
+    return notify_many(((r, payload) for r in recipients), exclude, dedupe_within)
@@ -1,122 +1,113 @@
 """
 Celery tasks for notifications and overdue checking.
 """
+import logging
+import time
+from collections import defaultdict
+
 from celery import shared_task
 from django.utils import timezone
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task
 def check_overdue_tasks():
-    """Check for overdue tasks and create notifications."""
+    """Mark past-due tasks as overdue and notify their assignees.
+
+    Set-based per organization: one UPDATE moves the tasks and their assignees
+    are notified through the fan-out service, which skips (user, task) pairs
+    already notified in the last 24h and inserts in chunks.
+    """
     from tasks.models import Task
     from core.models import Organization
-    from notifications.models import Notification
+    from core.caching import bump_org_version
+    from core.stats import rebuild_outlet_stats
+    from notifications.service import CHUNK_SIZE, notify_many
 
     now = timezone.now()
-    orgs = Organization.objects.filter(is_active=True)
+    Assignment = Task.assigned_to.through
 
-    count = 0
-    for org in orgs:
-        overdue = Task.objects.filter(
+    total_tasks = total_notifications = 0
+    for org in Organization.objects.filter(is_active=True):
+        started = time.monotonic()
+
+        # Stamping updated_at with this run's timestamp tags exactly the rows
+        # this UPDATE moved, without holding their ids in memory.
+        moved = Task.objects.filter(
             organization=org, is_trashed=False,
             due_date__lt=now, status__in=["todo", "in_progress", "review"],
-        ).prefetch_related("assigned_to")
-
-        for task in overdue:
-            if task.status != "overdue":
-                task.status = "overdue"
-                task.save(update_fields=["status"])
-
-            for assignee in task.assigned_to.all():
-                exists = Notification.objects.filter(
-                    user=assignee, entity_type="task", entity_id=task.id,
-                    notification_type="task_overdue",
-                    created_at__gte=now - timedelta(hours=24),
-                ).exists()
-                if not exists:
-                    Notification.objects.create(
-                        organization=org, user=assignee,
-                        notification_type="task_overdue",
-                        title="Task Overdue",
-                        message=f"'{task.title}' is past its due date.",
-                        link=f"/tasks/{task.id}/",
-                        entity_type="task", entity_id=task.id,
-                        priority="high",
-                    )
-                    count += 1
-
-    return f"Created {count} overdue notifications"
+        ).update(status="overdue", updated_at=now)
+        if not moved:
+            continue
+
+        swept = Task.objects.filter(organization=org, status="overdue", updated_at=now)
+        pairs = Assignment.objects.filter(task__in=swept).values_list(
+            "userprofile_id", "task_id", "task__title"
+        ).iterator(chunk_size=CHUNK_SIZE)
+        created = notify_many(
+            ((user_id, {
+                "organization": org, "notification_type": "task_overdue",
+                "title": "Task Overdue", "message": f"'{title}' is past its due date.",
+                "link": f"/tasks/{task_id}/", "entity_type": "task", "entity_id": task_id,
+                "priority": "high",
+            }) for user_id, task_id, title in pairs),
+            dedupe_within=timedelta(hours=24),
+        )
+
+        # The UPDATE and bulk_create bypassed save signals.
+        rebuild_outlet_stats(org.id, entity_types=["task"])
+        bump_org_version(org.id)
+
+        total_tasks += moved
+        total_notifications += created
+        logger.info(
+            "check_overdue_tasks org=%s tasks=%d notifications=%d elapsed=%.3fs",
+            org.code, moved, created, time.monotonic() - started,
+        )
+
+    return f"Marked {total_tasks} tasks overdue, created {total_notifications} overdue notifications"
 
 
 @shared_task
 def send_smart_reminders():
-    """Send smart AI-based reminders."""
+    """Send smart AI-based reminders to the assignees of the tasks they concern."""
     from core.models import Organization
     from core.ai_engine import AIEngine
-    from notifications.models import Notification
+    from notifications.service import notify_many
+    from tasks.models import Task
 
-    orgs = Organization.objects.filter(is_active=True)
+    Assignment = Task.assigned_to.through
     count = 0
 
-    for org in orgs:
+    for org in Organization.objects.filter(is_active=True):
         reminders = AIEngine.generate_smart_reminders(org)
-        for r in reminders:
-            from tasks.models import Task
-            try:
-                task = Task.objects.get(id=r["task_id"])
-            except Task.DoesNotExist:
-                continue
-
-            for assignee in task.assigned_to.all():
-                Notification.objects.create(
-                    organization=org, user=assignee,
-                    notification_type="reminder",
-                    title=f"Smart Reminder: {r['type'].replace('_', ' ').title()}",
-                    message=r["message"],
-                    link=f"/tasks/{task.id}/",
-                    entity_type="task", entity_id=task.id,
-                    priority=r.get("priority", "normal"),
-                )
-                count += 1
+        assignees = defaultdict(list)
+        for task_id, user_id in Assignment.objects.filter(
+            task__organization=org, task_id__in={r["task_id"] for r in reminders},
+        ).values_list("task_id", "userprofile_id"):
+            assignees[task_id].append(user_id)
+
+        count += notify_many(
+            (user_id, {
+                "organization": org, "notification_type": "reminder",
+                "title": f"Smart Reminder: {r['type'].replace('_', ' ').title()}",
+                "message": r["message"],
+                "link": f"/tasks/{r['task_id']}/",
+                "entity_type": "task", "entity_id": r["task_id"],
+                "priority": r.get("priority", "normal"),
+            })
+            for r in reminders for user_id in assignees[r["task_id"]]
+        )
 
     return f"Sent {count} smart reminders"
 
 
 @shared_task
 def process_recurring_tasks():
-    """Create new instances of recurring tasks that are due."""
-    from tasks.models import Task
-    from core.models import Organization
-
-    now = timezone.now()
-    count = 0
-
-    recurring = Task.objects.filter(
-        is_trashed=False, status="completed",
-        recurrence__in=["daily", "weekly", "monthly"],
-    )
-
-    for task in recurring:
-        if task.recurrence == "daily":
-            next_due = task.completed_at + timedelta(days=1) if task.completed_at else now + timedelta(days=1)
-        elif task.recurrence == "weekly":
-            next_due = task.completed_at + timedelta(weeks=1) if task.completed_at else now + timedelta(weeks=1)
-        else:
-            next_due = task.completed_at + timedelta(days=30) if task.completed_at else now + timedelta(days=30)
-
-        if next_due <= now:
-            new_task = Task.objects.create(
-                organization=task.organization,
-                project=task.project, outlet=task.outlet, team=task.team,
-                title=task.title, description=task.description,
-                task_type=task.task_type, priority=task.priority,
-                category=task.category, created_by=task.created_by,
-                due_date=next_due, points=task.points,
-                recurrence=task.recurrence,
-                recurrence_details=task.recurrence_details,
-            )
-            new_task.assigned_to.set(task.assigned_to.all())
-            count += 1
+    """Create the next instance of every recurring series that is due."""
+    from tasks.recurrence import generate_due_instances
 
+    count = generate_due_instances()
     return f"Created {count} recurring tasks"
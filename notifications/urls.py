@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path("", views.notification_list_view, name="notification_list"),
     path("mark-all-read/", views.mark_all_read_view, name="mark_all_read"),
+    path("stream/", views.notification_stream_view, name="notification_stream"),
 ]
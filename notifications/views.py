@@ -1,10 +1,18 @@
 """
 Notifications app views.
 """
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 
-from core.views import get_current_org, get_current_profile, paginate
+from core.views import cursor_paginate, get_current_org, get_current_profile
+from . import pubsub
+from .counters import reset_unread, unread_count
 from .models import Notification
 
 
@@ -15,7 +23,7 @@ def notification_list_view(request):
         return redirect("login")
 
     notifications = Notification.objects.filter(user=profile)
-    notifications = paginate(notifications, request, 30)
+    notifications = cursor_paginate(notifications, request, 30)
     return render(request, "notifications/list.html", {"notifications": notifications})
 
 
@@ -23,4 +31,41 @@ def mark_all_read_view(request):
     profile = get_current_profile(request)
     if profile:
         Notification.objects.filter(user=profile, is_read=False).update(is_read=True)
+        reset_unread([profile.id])
     return redirect("notification_list")
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def notification_stream_view(request):
+    """Server-sent events: new notifications and badge counts for the current user.
+
+    Only served under ASGI; a WSGI worker would be pinned by the open stream, so
+    there it answers 204, which makes EventSource give up and the page poll.
+    The stream ends after NOTIFICATION_STREAM_MAX_AGE and the browser reconnects.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    profile = await sync_to_async(get_current_profile)(request)
+    if not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    unread = await sync_to_async(unread_count)(profile.id)
+
+    async def events():
+        deadline = time.monotonic() + settings.NOTIFICATION_STREAM_MAX_AGE
+        yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n"
+        yield _sse("badge", {"unread": unread})
+        async with pubsub.get_backend().subscribe(pubsub.user_channel(profile.id)) as subscription:
+            while time.monotonic() < deadline:
+                message = await subscription.get(settings.NOTIFICATION_STREAM_HEARTBEAT)
+                if message is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield _sse(message["event"], message["data"])
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,8 +1,11 @@
 """
 Projects app models: Project with overview, board, and list views.
 """
+from datetime import datetime, time
+
 from django.db import models
 from django.utils import timezone
+from core.aggregates import related_count
 from core.models import Organization, Outlet, UserProfile
 
 
@@ -20,6 +23,25 @@ class ProjectTag(models.Model):
         return self.name
 
 
+def _start_of_today():
+    return timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_progress(self):
+        """Annotate the task counts behind the progress properties in the main
+        query (the properties fall back to one COUNT each without it)."""
+        tasks = self.model._meta.get_field("tasks").related_model.objects.all()
+        return self.annotate(
+            num_tasks=related_count(tasks, "project"),
+            num_completed_tasks=related_count(tasks.filter(status="completed"), "project"),
+            num_ongoing_tasks=related_count(tasks.filter(status__in=["in_progress", "todo"]), "project"),
+            num_overdue_tasks=related_count(
+                tasks.filter(due_date__lt=_start_of_today()).exclude(status="completed"), "project",
+            ),
+        )
+
+
 class Project(models.Model):
     STATUS_CHOICES = [
         ("active", "Active"),
@@ -52,25 +74,34 @@ class Project(models.Model):
             models.Index(fields=["created_at"]),
         ]
 
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     @property
     def total_tasks(self):
+        if hasattr(self, "num_tasks"):
+            return self.num_tasks
         return self.tasks.count()
 
     @property
     def completed_tasks(self):
+        if hasattr(self, "num_completed_tasks"):
+            return self.num_completed_tasks
         return self.tasks.filter(status="completed").count()
 
     @property
     def ongoing_tasks(self):
+        if hasattr(self, "num_ongoing_tasks"):
+            return self.num_ongoing_tasks
         return self.tasks.filter(status__in=["in_progress", "todo"]).count()
 
     @property
     def overdue_tasks(self):
-        today = timezone.now().date()
-        return self.tasks.filter(due_date__lt=today).exclude(status="completed").count()
+        if hasattr(self, "num_overdue_tasks"):
+            return self.num_overdue_tasks
+        return self.tasks.filter(due_date__lt=_start_of_today()).exclude(status="completed").count()
 
     @property
     def progress_percent(self):
@@ -5,10 +5,14 @@ import json
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.views.decorators.csrf import csrf_exempt
 
-from core.views import get_current_org, get_current_profile, get_current_outlet, log_activity, paginate, require_perm
+from core.search import filter_queryset
+from core.views import (
+    board_column_response, board_columns, get_current_org, get_current_profile, get_current_outlet,
+    log_activity, paginate, require_perm,
+)
 from core.models import Outlet, UserProfile
 from .models import Project, ProjectTag
 
@@ -24,7 +28,7 @@ def project_list_view(request):
 
     projects = Project.objects.filter(organization=org, is_active=True).select_related(
         "outlet", "created_by", "created_by__user"
-    ).prefetch_related("tags", "members")
+    ).prefetch_related("tags", "members__user").with_progress()
 
     outlet = get_current_outlet(request)
     if outlet:
@@ -37,7 +41,7 @@ def project_list_view(request):
     if status:
         projects = projects.filter(status=status)
     if search:
-        projects = projects.filter(Q(name__icontains=search) | Q(description__icontains=search))
+        projects = filter_queryset(projects, search, "project", org, outlet)
 
     projects = paginate(projects, request)
     tags = ProjectTag.objects.filter(organization=org)
@@ -52,6 +56,26 @@ def project_list_view(request):
     })
 
 
+# status -> (column label, color)
+BOARD_COLUMNS = {
+    "active": ("Active", "#3b82f6"),
+    "on_hold": ("On Hold", "#f97316"),
+    "completed": ("Completed", "#22c55e"),
+    "archived": ("Archived", "#6b7280"),
+}
+
+
+def _board_projects(request, org):
+    projects = Project.objects.filter(organization=org, is_active=True).select_related(
+        "outlet", "created_by", "created_by__user"
+    ).prefetch_related("tags", "members__user").with_progress()
+
+    outlet = get_current_outlet(request)
+    if outlet:
+        projects = projects.filter(outlet=outlet)
+    return projects
+
+
 def project_board_view(request):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -61,25 +85,26 @@ def project_board_view(request):
     if denied:
         return denied
 
-    projects = Project.objects.filter(organization=org, is_active=True).select_related(
-        "outlet", "created_by", "created_by__user"
-    ).prefetch_related("tags", "members")
+    columns = board_columns(_board_projects(request, org), "status", {
+        status: {"label": label, "color": color} for status, (label, color) in BOARD_COLUMNS.items()
+    })
 
-    outlet = get_current_outlet(request)
-    if outlet:
-        projects = projects.filter(outlet=outlet)
+    return render(request, "projects/board.html", {"columns": columns})
 
-    columns = {
-        "active": {"label": "Active", "color": "#3b82f6", "projects": []},
-        "on_hold": {"label": "On Hold", "color": "#f97316", "projects": []},
-        "completed": {"label": "Completed", "color": "#22c55e", "projects": []},
-        "archived": {"label": "Archived", "color": "#6b7280", "projects": []},
-    }
-    for p in projects:
-        if p.status in columns:
-            columns[p.status]["projects"].append(p)
 
-    return render(request, "projects/board.html", {"columns": columns})
+def api_project_board_column(request, status):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    if not profile.has_perm("view_projects"):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    if status not in BOARD_COLUMNS:
+        return JsonResponse({"error": "Unknown column"}, status=404)
+
+    return board_column_response(
+        request, _board_projects(request, org).filter(status=status), "projects/board_cards.html",
+    )
 
 
 def project_create_view(request):
@@ -132,12 +157,17 @@ def project_detail_view(request, project_id):
     if denied:
         return denied
 
-    project = get_object_or_404(Project, id=project_id, organization=org)
+    project = get_object_or_404(
+        Project.objects.with_progress().select_related("outlet", "created_by__user").prefetch_related(
+            "tags", "members__user", "members__role__organization",
+        ),
+        id=project_id, organization=org,
+    )
 
     from tasks.models import Task
     tasks = Task.objects.filter(organization=org, project=project, is_trashed=False, parent__isnull=True).select_related(
         "category", "created_by", "created_by__user"
-    ).prefetch_related("assigned_to", "assigned_to__user")
+    ).with_list_stats()
 
     if request.method == "POST":
         action = request.POST.get("action")
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ReportsConfig(AppConfig):
     name = "reports"
+
+    def ready(self):
+        from . import facts, snapshots
+
+        facts.connect_signals()
+        snapshots.connect_signals()
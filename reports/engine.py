@@ -0,0 +1,413 @@
+"""
+Report engine: every report is built from a fixed number of queries (its
+counters plus one query for the row labels, outlets or members), however many
+outlets or employees the org has.
+
+The outlet reports read the incrementally maintained ``OutletStats`` counters
+(core.stats), plus one grouped query for overdue tasks, which depend on the
+clock. The employee reports use conditional aggregates
+(``Count(filter=Q(...))``) grouped by ``userprofile_id`` on the
+``assigned_to`` through table. Each report returns a
+list of typed rows (dataclasses) that the templates, the chart API and the
+exports all read; ``COLUMNS`` lists the exported fields with their headers and
+``to_dict``/``from_dict`` round-trip rows through JSON snapshots.
+
+The month-on-month reports read the daily stats rollup (reports.facts) instead
+of the task history, so a 12-month trend groups about 365 rows per member.
+"""
+from dataclasses import asdict, dataclass, field, fields
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core import aggregates, stats
+from core.models import Outlet, UserProfile
+
+ONGOING_TASK = ["todo", "in_progress", "review"]
+
+
+class Row:
+    COLUMNS = []
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    @classmethod
+    def export_columns(cls, rows):
+        return cls.COLUMNS
+
+    def export_dict(self):
+        return self.to_dict()
+
+
+class MonthlyRow(Row):
+    """A row with one value per month in ``months`` ({"YYYY-MM": value}),
+    exported as one column per month."""
+
+    @classmethod
+    def export_columns(cls, rows):
+        months = rows[0].months if rows else {}
+        return cls.COLUMNS + [(m, m) for m in months] + [("total", "Total")]
+
+    def export_dict(self):
+        return {**self.to_dict(), **self.months}
+
+
+@dataclass
+class OutletTaskRow(Row):
+    outlet_id: int
+    outlet_name: str
+    total: int = 0
+    completed: int = 0
+    ongoing: int = 0
+    overdue: int = 0
+    on_hold: int = 0
+
+    COLUMNS = [("outlet_name", "Outlet"), ("total", "Total"), ("completed", "Completed"),
+               ("ongoing", "Ongoing"), ("overdue", "Overdue"), ("on_hold", "On Hold")]
+
+
+@dataclass
+class OutletIssueRow(Row):
+    outlet_id: int
+    outlet_name: str
+    total: int = 0
+    open: int = 0
+    resolved: int = 0
+    ignored: int = 0
+    closed: int = 0
+
+    COLUMNS = [("outlet_name", "Outlet"), ("total", "Total"), ("open", "Open"),
+               ("resolved", "Resolved"), ("ignored", "Ignored"), ("closed", "Closed")]
+
+
+@dataclass
+class EmployeeTaskRow(Row):
+    member_id: int
+    employee_name: str
+    outlet: str
+    team: str
+    total: int = 0
+    completed: int = 0
+    ongoing: int = 0
+    overdue: int = 0
+    points: int = 0
+
+    COLUMNS = [("employee_name", "Employee"), ("outlet", "Outlet"), ("team", "Team"),
+               ("total", "Total"), ("completed", "Completed"), ("ongoing", "Ongoing"),
+               ("overdue", "Overdue"), ("points", "Points")]
+
+
+@dataclass
+class EmployeeIssueRow(Row):
+    member_id: int
+    employee_name: str
+    outlet: str
+    team: str
+    total: int = 0
+    open: int = 0
+    resolved: int = 0
+    ignored: int = 0
+
+    COLUMNS = [("employee_name", "Employee"), ("outlet", "Outlet"), ("team", "Team"),
+               ("total", "Total"), ("open", "Open"), ("resolved", "Resolved"), ("ignored", "Ignored")]
+
+
+@dataclass
+class PointsRow(Row):
+    member_id: int
+    employee_name: str
+    outlet: str
+    team: str
+    points: int = 0
+    tasks_completed: int = 0
+
+    COLUMNS = [("employee_name", "Employee"), ("outlet", "Outlet"), ("team", "Team"),
+               ("points", "Points"), ("tasks_completed", "Tasks Completed")]
+
+
+@dataclass
+class MonthlyPointsRow(MonthlyRow):
+    member_id: int
+    employee_name: str
+    outlet: str
+    team: str
+    months: dict = field(default_factory=dict)
+    total: int = 0
+
+    COLUMNS = [("employee_name", "Employee"), ("outlet", "Outlet"), ("team", "Team")]
+
+
+@dataclass
+class OutletChecklistRow(MonthlyRow):
+    outlet_id: int
+    outlet_name: str
+    months: dict = field(default_factory=dict)
+    total: int = 0
+
+    COLUMNS = [("outlet_name", "Outlet")]
+
+
+@dataclass
+class EmployeeMonthRow(Row):
+    member_id: int
+    employee_name: str
+    outlet: str
+    team: str
+    month: str
+    tasks_completed: int = 0
+    tasks_overdue: int = 0
+    steps_completed: int = 0
+    points: int = 0
+
+    COLUMNS = [("employee_name", "Employee"), ("outlet", "Outlet"), ("team", "Team"), ("month", "Month"),
+               ("tasks_completed", "Tasks Completed"), ("tasks_overdue", "Tasks Overdue"),
+               ("steps_completed", "Checklist Steps"), ("points", "Points")]
+
+
+@dataclass
+class OutletMonthRow(Row):
+    outlet_id: int
+    outlet_name: str
+    month: str
+    tasks_completed: int = 0
+    tasks_overdue: int = 0
+    steps_completed: int = 0
+    points: int = 0
+
+    COLUMNS = [("outlet_name", "Outlet"), ("month", "Month"), ("tasks_completed", "Tasks Completed"),
+               ("tasks_overdue", "Tasks Overdue"), ("steps_completed", "Checklist Steps"), ("points", "Points")]
+
+
+# ============================================================
+# QUERY HELPERS
+# ============================================================
+
+def _count(field, **lookups):
+    return Count(field, filter=Q(**lookups))
+
+
+def grouped(queryset, key, **aggregates):
+    """{key value: {aggregate: value}} from a single GROUP BY ``key`` query."""
+    rows = queryset.order_by().values(key).annotate(**aggregates)
+    return {row.pop(key): row for row in rows}
+
+
+def _outlets(org, outlet=None):
+    outlets = Outlet.objects.filter(organization=org, is_active=True)
+    if outlet:
+        outlets = outlets.filter(pk=getattr(outlet, "pk", outlet))
+    return outlets.values_list("id", "name")
+
+
+def _members(org, outlet=None):
+    members = UserProfile.objects.filter(organization=org, is_active=True).select_related("user", "outlet", "team")
+    if outlet:
+        members = members.filter(outlet=outlet)
+    return members
+
+
+def _member_labels(m):
+    return {
+        "member_id": m.id, "employee_name": m.full_name,
+        "outlet": m.outlet.name if m.outlet else "", "team": m.team.name if m.team else "",
+    }
+
+
+def _task_assignments(org, **task_lookups):
+    from tasks.models import Task
+
+    lookups = {f"task__{k}": v for k, v in task_lookups.items()}
+    return Task.assigned_to.through.objects.filter(task__organization=org, task__is_trashed=False, **lookups)
+
+
+def _trend_months(now):
+    """First day of each of the last REPORT_TREND_MONTHS months, oldest first."""
+    month = timezone.localdate(now).replace(day=1)
+    months = [month]
+    for _ in range(settings.REPORT_TREND_MONTHS - 1):
+        month = (month - timedelta(days=1)).replace(day=1)
+        months.append(month)
+    return months[::-1]
+
+
+def _monthly_stats(org, outlet, months, key, **aggregates):
+    """Daily stats of the trend window summed per (``key``, month), one query.
+
+    Outlet sums read ``OutletDailyStats``, where a task counts once; member
+    sums read ``MemberDailyStats``, where it counts once per assignee.
+    """
+    from .models import MemberDailyStats, OutletDailyStats
+
+    model = OutletDailyStats if key == "outlet_id" else MemberDailyStats
+    stats = model.objects.filter(organization=org, day__gte=months[0])
+    if outlet:
+        stats = stats.filter(outlet=outlet)
+    rows = stats.order_by().values(key, month=TruncMonth("day")).annotate(**aggregates)
+    return {(r.pop(key), f"{r.pop('month'):%Y-%m}"): r for r in rows}
+
+
+MONTH_TOTALS = {
+    "tasks_completed": Sum("tasks_completed"), "tasks_overdue": Sum("tasks_overdue"),
+    "steps_completed": Sum("steps_completed"), "points": Sum("points"),
+}
+
+
+# ============================================================
+# REPORTS
+# ============================================================
+
+def outlet_tasks(org, outlet=None, now=None):
+    counts = stats.status_counts(org, ["task"])["task"]
+    overdue = aggregates.overdue_by_outlet(org, now, exclude_statuses=["completed"])
+    rows = []
+    for oid, name in _outlets(org, outlet):
+        tasks = counts[oid]
+        rows.append(OutletTaskRow(
+            outlet_id=oid, outlet_name=name,
+            total=stats.total(tasks),
+            completed=tasks.get("completed", 0),
+            ongoing=stats.total(tasks, ONGOING_TASK),
+            overdue=overdue.get(oid, 0),
+            on_hold=tasks.get("on_hold", 0),
+        ))
+    return rows
+
+
+def outlet_issues(org, outlet=None, now=None):
+    counts = stats.status_counts(org, ["issue"])["issue"]
+    rows = []
+    for oid, name in _outlets(org, outlet):
+        issues = counts[oid]
+        rows.append(OutletIssueRow(
+            outlet_id=oid, outlet_name=name,
+            total=stats.total(issues),
+            open=issues.get("open", 0),
+            resolved=issues.get("resolved", 0),
+            ignored=issues.get("ignored", 0),
+            closed=issues.get("closed", 0),
+        ))
+    return rows
+
+
+def employee_tasks(org, outlet=None, now=None):
+    now = now or timezone.now()
+    counts = grouped(
+        _task_assignments(org),
+        "userprofile_id",
+        total=Count("task_id"),
+        completed=_count("task_id", task__status="completed"),
+        ongoing=_count("task_id", task__status__in=ONGOING_TASK),
+        overdue=Count("task_id", filter=Q(task__due_date__lt=now) & ~Q(task__status="completed")),
+        points=Sum("task__points", filter=Q(task__status="completed"), default=0),
+    )
+    return [EmployeeTaskRow(**_member_labels(m), **counts.get(m.id, {})) for m in _members(org, outlet)]
+
+
+def employee_issues(org, outlet=None, now=None):
+    from issues.models import Issue
+
+    counts = grouped(
+        Issue.assigned_to.through.objects.filter(issue__organization=org, issue__is_trashed=False),
+        "userprofile_id",
+        total=Count("issue_id"),
+        open=_count("issue_id", issue__status="open"),
+        resolved=_count("issue_id", issue__status="resolved"),
+        ignored=_count("issue_id", issue__status="ignored"),
+    )
+    return [EmployeeIssueRow(**_member_labels(m), **counts.get(m.id, {})) for m in _members(org, outlet)]
+
+
+def points(org, outlet=None, now=None):
+    counts = grouped(
+        _task_assignments(org, status="completed"),
+        "userprofile_id",
+        points=Sum("task__points", default=0),
+        tasks_completed=Count("task_id"),
+    )
+    rows = [PointsRow(**_member_labels(m), **counts.get(m.id, {})) for m in _members(org, outlet)]
+    rows.sort(key=lambda r: r.points, reverse=True)
+    return rows
+
+
+def monthly_points(org, outlet=None, now=None):
+    months = _trend_months(now or timezone.now())
+    labels = [f"{m:%Y-%m}" for m in months]
+    stats = _monthly_stats(org, outlet, months, "member_id", points=Sum("points"))
+    rows = []
+    for m in _members(org, outlet):
+        months = {label: stats.get((m.id, label), {}).get("points", 0) for label in labels}
+        rows.append(MonthlyPointsRow(**_member_labels(m), months=months, total=sum(months.values())))
+    rows.sort(key=lambda r: r.total, reverse=True)
+    return rows
+
+
+def outlet_checklist(org, outlet=None, now=None):
+    months = _trend_months(now or timezone.now())
+    labels = [f"{m:%Y-%m}" for m in months]
+    stats = _monthly_stats(org, outlet, months, "outlet_id", steps=Sum("steps_completed"))
+    rows = []
+    for oid, name in _outlets(org, outlet):
+        values = {label: stats.get((oid, label), {}).get("steps", 0) for label in labels}
+        rows.append(OutletChecklistRow(outlet_id=oid, outlet_name=name, months=values, total=sum(values.values())))
+    return rows
+
+
+def employee_taskwise(org, outlet=None, now=None):
+    months = _trend_months(now or timezone.now())
+    stats = _monthly_stats(org, outlet, months, "member_id", **MONTH_TOTALS)
+    rows = []
+    for m in _members(org, outlet):
+        for month in (f"{d:%Y-%m}" for d in months):
+            if (m.id, month) in stats:
+                rows.append(EmployeeMonthRow(**_member_labels(m), month=month, **stats[(m.id, month)]))
+    return rows
+
+
+def task_submission(org, outlet=None, now=None):
+    months = _trend_months(now or timezone.now())
+    stats = _monthly_stats(org, outlet, months, "outlet_id", **MONTH_TOTALS)
+    rows = []
+    for oid, name in _outlets(org, outlet):
+        for month in (f"{d:%Y-%m}" for d in months):
+            if (oid, month) in stats:
+                rows.append(OutletMonthRow(outlet_id=oid, outlet_name=name, month=month, **stats[(oid, month)]))
+    return rows
+
+
+# report type -> (builder, row class)
+REPORTS = {
+    "outlet_tasks": (outlet_tasks, OutletTaskRow),
+    "outlet_issues": (outlet_issues, OutletIssueRow),
+    "employee_tasks": (employee_tasks, EmployeeTaskRow),
+    "employee_issues": (employee_issues, EmployeeIssueRow),
+    "points": (points, PointsRow),
+    "monthly_points": (monthly_points, MonthlyPointsRow),
+    "outlet_checklist": (outlet_checklist, OutletChecklistRow),
+    "employee_taskwise": (employee_taskwise, EmployeeMonthRow),
+    "task_submission": (task_submission, OutletMonthRow),
+}
+
+
+def build(report_type, org, outlet=None):
+    builder, _row = REPORTS[report_type]
+    return builder(org, outlet)
+
+
+def outlet_tasks_chart(rows):
+    """Chart.js payload of the outlet tasks report."""
+    return {
+        "labels": [r.outlet_name for r in rows],
+        "datasets": [
+            {"label": "Completed", "data": [r.completed for r in rows], "backgroundColor": "#22c55e"},
+            {"label": "Ongoing", "data": [r.ongoing for r in rows], "backgroundColor": "#3b82f6"},
+        ],
+    }
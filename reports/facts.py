@@ -0,0 +1,265 @@
+"""
+Daily stats rollup behind the month-on-month reports.
+
+``MemberDailyStats`` holds one row per (org, outlet, member, day):
+
+    tasks_completed, points   tasks completed that day (by completed_at), per assignee
+    tasks_overdue             tasks due that day and not completed by their due date
+    steps_completed           checklist steps ticked that day, by whoever ticked them
+
+``OutletDailyStats`` holds the same counters per (org, outlet, day). They are
+grouped by outlet alone, so a task with several assignees counts once there,
+while it counts once per assignee in the member rows; outlet totals must be
+read from the outlet rows, never summed from the member rows.
+
+``rollup`` is incremental. For each org it rebuilds only the days touched since
+its previous run (the org's ``DailyStatsWatermark``): the completion and due
+days of tasks whose ``updated_at`` is newer than the watermark, the days of
+steps completed since then, and the days queued in ``DailyStatsDirtyDay``.
+
+Changes that leave no timestamp behind queue the day they took away from:
+deleted tasks and steps, undone completions, unticked steps, moved due dates
+and reassignments. The save/delete signals below queue them, and bulk paths
+that skip the signals call ``mark_dirty`` themselves. Only past days are
+queued; the trailing FACT_REBUILD_DAYS, always rebuilt, cover the rest.
+
+A day is rebuilt by deleting its rows and inserting the output of three
+grouped queries per table. Today is left to the next run, as it is still changing.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import m2m_changed, post_delete, post_init, pre_save
+from django.utils import timezone
+
+from core.caching import bump_org_version_on_commit
+from core.export import chunked
+
+DAYS_PER_BATCH = 31  # days rebuilt per delete/insert transaction
+
+
+def _days(queryset, field):
+    return set(queryset.annotate(day=TruncDate(field)).values_list("day", flat=True).distinct())
+
+
+def dirty_days(org_id, since, today):
+    """Days before ``today`` whose stats may have changed since ``since``
+    (None: every day with activity)."""
+    from tasks.models import Task, TaskStep
+
+    tasks = Task.objects.filter(organization_id=org_id).order_by()
+    steps = TaskStep.objects.filter(task__organization_id=org_id, completed_at__isnull=False).order_by()
+    if since:
+        tasks = tasks.filter(updated_at__gte=since)
+        steps = steps.filter(completed_at__gte=since)
+    days = (
+        _days(tasks.filter(completed_at__isnull=False), "completed_at")
+        | _days(tasks.filter(due_date__isnull=False), "due_date")
+        | _days(steps, "completed_at")
+        | {today - timedelta(days=n) for n in range(1, settings.FACT_REBUILD_DAYS + 1)}
+    )
+    return sorted(d for d in days if d and d < today)
+
+
+def _compute(model, org_id, days, computed_at, task_member=None, step_member=None):
+    """Unsaved ``model`` rows of ``days`` grouped by outlet, and by member when
+    ``task_member``/``step_member`` name the member of a task and of a step."""
+    from tasks.models import Task, TaskStep
+
+    stats = {}
+
+    def row(outlet_id, day, member_id=None):
+        key = (outlet_id, member_id, day)
+        if key not in stats:
+            member = {"member_id": member_id} if task_member else {}
+            stats[key] = model(organization_id=org_id, outlet_id=outlet_id, day=day, computed_at=computed_at, **member)
+        return stats[key]
+
+    task_keys = ["outlet_id", task_member] if task_member else ["outlet_id"]
+    tasks = Task.objects.filter(organization_id=org_id, is_trashed=False, is_template=False).order_by()
+    completed = tasks.filter(status="completed", completed_at__date__in=days).values(
+        *task_keys, day=TruncDate("completed_at"),
+    ).annotate(n=Count("id"), points_sum=Sum("points"))
+    for r in completed:
+        stat = row(r["outlet_id"], r["day"], r.get(task_member))
+        stat.tasks_completed, stat.points = r["n"], r["points_sum"] or 0
+
+    overdue = tasks.filter(due_date__date__in=days).filter(
+        Q(completed_at__isnull=True) | Q(completed_at__gt=F("due_date")),
+    ).values(*task_keys, day=TruncDate("due_date")).annotate(n=Count("id"))
+    for r in overdue:
+        row(r["outlet_id"], r["day"], r.get(task_member)).tasks_overdue = r["n"]
+
+    step_keys = ["task__outlet_id", step_member] if step_member else ["task__outlet_id"]
+    steps = TaskStep.objects.filter(
+        task__organization_id=org_id, task__is_trashed=False, is_completed=True, completed_at__date__in=days,
+    ).order_by().values(*step_keys, day=TruncDate("completed_at")).annotate(n=Count("id"))
+    for r in steps:
+        row(r["task__outlet_id"], r["day"], r.get(step_member)).steps_completed = r["n"]
+
+    return list(stats.values())
+
+
+def compute(org_id, days, computed_at):
+    """Unsaved (MemberDailyStats, OutletDailyStats) of ``days`` for one org."""
+    from .models import MemberDailyStats, OutletDailyStats
+
+    # values("assigned_to") joins the assignees: one group per assignee, or a null one for unassigned tasks.
+    members = _compute(MemberDailyStats, org_id, days, computed_at, "assigned_to", "completed_by_id")
+    outlets = _compute(OutletDailyStats, org_id, days, computed_at)
+    return members, outlets
+
+
+def rollup(org_ids=None, days=None):
+    """Rebuild the daily stats of ``days`` for each org (default: the days
+    touched since the org's previous run). Returns the number of org-days rebuilt."""
+    from core.models import Organization
+    from .models import DailyStatsDirtyDay, DailyStatsWatermark, MemberDailyStats, OutletDailyStats
+
+    started = timezone.now()
+    today = timezone.localdate(started)
+    if org_ids is None:
+        org_ids = Organization.objects.filter(is_active=True).values_list("id", flat=True)
+
+    rebuilt = 0
+    for org_id in org_ids:
+        queued = DailyStatsDirtyDay.objects.filter(organization_id=org_id, day__lt=today)
+        last_queued = None
+        if days is None:
+            since = DailyStatsWatermark.objects.filter(organization_id=org_id).values_list("computed_at", flat=True).first()
+            last_queued = queued.aggregate(last=Max("id"))["last"]
+            org_days = sorted(
+                set(dirty_days(org_id, since, today))
+                | set(queued.filter(id__lte=last_queued or 0).values_list("day", flat=True).distinct())
+            )
+        else:
+            org_days = sorted(d for d in days if d < today)
+        for batch in chunked(org_days, DAYS_PER_BATCH):
+            members, outlets = compute(org_id, batch, started)
+            with transaction.atomic():
+                MemberDailyStats.objects.filter(organization_id=org_id, day__in=batch).delete()
+                OutletDailyStats.objects.filter(organization_id=org_id, day__in=batch).delete()
+                MemberDailyStats.objects.bulk_create(members, batch_size=1000)
+                OutletDailyStats.objects.bulk_create(outlets, batch_size=1000)
+            rebuilt += len(batch)
+        if days is None:
+            # Days queued while this run was going on have higher ids and wait for the next one.
+            if last_queued:
+                queued.filter(id__lte=last_queued).delete()
+            DailyStatsWatermark.objects.update_or_create(organization_id=org_id, defaults={"computed_at": started})
+        if org_days:
+            bump_org_version_on_commit(org_id)  # bulk writes skip the signals; refresh report snapshots
+    return rebuilt
+
+
+# ============================================================
+# DIRTY DAYS
+# ============================================================
+
+def mark_dirty(org_id, moments):
+    """Queue the past days of ``moments`` (datetimes, None skipped) for the
+    org's next rollup."""
+    from .models import DailyStatsDirtyDay
+
+    today = timezone.localdate()
+    days = {d for d in (timezone.localdate(m) for m in moments if m) if d < today}
+    if org_id and days:
+        DailyStatsDirtyDay.objects.bulk_create([DailyStatsDirtyDay(organization_id=org_id, day=d) for d in days])
+
+
+def mark_tasks_dirty(tasks):
+    """Queue the completion and due days of ``tasks`` (a Task queryset)."""
+    by_org = {}
+    for org_id, completed_at, due_date in tasks.order_by().values_list("organization_id", "completed_at", "due_date"):
+        by_org.setdefault(org_id, []).extend((completed_at, due_date))
+    for org_id, moments in by_org.items():
+        mark_dirty(org_id, moments)
+
+
+TASK_DATES = ("completed_at", "due_date")
+STEP_DATES = ("completed_at",)
+
+
+def _dates(instance, fields):
+    """The instance's ``fields`` as loaded, or None if any was deferred."""
+    d = instance.__dict__
+    if any(f not in d for f in fields):
+        return None
+    return tuple(d[f] for f in fields)
+
+
+def _on_task_init(sender, instance, **kwargs):
+    instance._stats_dates = _dates(instance, TASK_DATES)
+
+
+def _on_step_init(sender, instance, **kwargs):
+    instance._stats_dates = _dates(instance, STEP_DATES)
+
+
+def _on_task_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and not set(TASK_DATES) & set(update_fields)):
+        return
+    old = instance._stats_dates or sender._base_manager.filter(pk=instance.pk).values_list(*TASK_DATES).first()
+    new = (instance.completed_at, instance.due_date)
+    if old and old != new:
+        mark_dirty(instance.organization_id, [o for o, n in zip(old, new) if o != n])
+    instance._stats_dates = new
+
+
+def _on_task_delete(sender, instance, **kwargs):
+    mark_dirty(instance.organization_id, _dates(instance, TASK_DATES) or ())
+
+
+def _on_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    from tasks.models import Task
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        mark_dirty(instance.organization_id, _dates(instance, TASK_DATES) or ())
+    elif action == "pre_clear":
+        mark_tasks_dirty(Task.objects.filter(assigned_to=instance))
+    elif pk_set:
+        mark_tasks_dirty(Task.objects.filter(pk__in=pk_set))
+
+
+def _step_org(step):
+    from tasks.models import Task
+
+    task = step._state.fields_cache.get("task")
+    if task is not None:
+        return task.organization_id
+    return Task._base_manager.filter(pk=step.task_id).values_list("organization_id", flat=True).first()
+
+
+def _on_step_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and "completed_at" not in update_fields):
+        return
+    old = instance._stats_dates or sender._base_manager.filter(pk=instance.pk).values_list(*STEP_DATES).first()
+    if old and old[0] and old[0] != instance.completed_at:
+        mark_dirty(_step_org(instance), old)
+    instance._stats_dates = (instance.completed_at,)
+
+
+def _on_step_delete(sender, instance, **kwargs):
+    if instance.__dict__.get("completed_at"):
+        mark_dirty(_step_org(instance), [instance.completed_at])
+
+
+def connect_signals():
+    """Queue dirty days on task and step writes (called from ReportsConfig.ready)."""
+    from tasks.models import Task, TaskStep
+
+    handlers = {
+        Task: (_on_task_init, _on_task_pre_save, _on_task_delete),
+        TaskStep: (_on_step_init, _on_step_pre_save, _on_step_delete),
+    }
+    for model, (on_init, on_pre_save, on_delete) in handlers.items():
+        uid = f"daily_stats_{model.__name__.lower()}"
+        post_init.connect(on_init, sender=model, dispatch_uid=uid)
+        pre_save.connect(on_pre_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(on_delete, sender=model, dispatch_uid=uid)
+    m2m_changed.connect(_on_assignees_changed, sender=Task.assigned_to.through, dispatch_uid="daily_stats_assignees")
@@ -0,0 +1,27 @@
+"""
+Rebuild the daily stats behind the month-on-month reports.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports.facts import rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily task stats: incrementally, or the last --days days in full"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            help="Rebuild every one of the last DAYS days (default: only days changed since the last run)")
+        parser.add_argument("--org", type=int, action="append", dest="org_ids",
+                            help="Only this organization id (repeatable)")
+
+    def handle(self, *args, **options):
+        days = None
+        if options["days"]:
+            today = timezone.localdate()
+            days = [today - timedelta(days=n) for n in range(1, options["days"] + 1)]
+        rebuilt = rollup(options["org_ids"], days)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt daily stats for {rebuilt} org-days"))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MemberDailyStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("tasks_completed", models.PositiveIntegerField(default=0)),
+                ("points", models.IntegerField(default=0)),
+                ("tasks_overdue", models.PositiveIntegerField(default=0, help_text="Tasks due this day and not completed by their due date")),
+                ("steps_completed", models.PositiveIntegerField(default=0)),
+                ("computed_at", models.DateTimeField(default=django.utils.timezone.now, help_text="Start of the rollup run that wrote this row")),
+                ("member", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="daily_stats", to="core.userprofile")),
+                ("organization", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="daily_stats", to="core.organization")),
+                ("outlet", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="daily_stats", to="core.outlet")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["organization", "day"], name="reports_mem_organiz_4f1df5_idx"), models.Index(fields=["organization", "outlet", "day"], name="reports_mem_organiz_119030_idx"), models.Index(fields=["member", "day"], name="reports_mem_member__d92c84_idx"), models.Index(fields=["organization", "computed_at"], name="reports_mem_organiz_af53ec_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_watermarks(apps, schema_editor):
+    """Start each org's watermark where the rollup left off (its newest computed_at)."""
+    MemberDailyStats = apps.get_model("reports", "MemberDailyStats")
+    DailyStatsWatermark = apps.get_model("reports", "DailyStatsWatermark")
+    DailyStatsWatermark.objects.bulk_create([
+        DailyStatsWatermark(organization_id=r["organization_id"], computed_at=r["last"])
+        for r in MemberDailyStats.objects.order_by().values("organization_id").annotate(last=Max("computed_at"))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("reports", "0002_member_daily_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyStatsWatermark",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("computed_at", models.DateTimeField()),
+                ("organization", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="stats_watermark", to="core.organization")),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyStatsDirtyDay",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("organization", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="dirty_stat_days", to="core.organization")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["organization", "day"], name="reports_dai_organiz_60996b_idx")],
+            },
+        ),
+        migrations.RunPython(backfill_watermarks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def reset_watermarks(apps, schema_editor):
+    """Make the next rollup rebuild every org's history, filling the new table."""
+    apps.get_model("reports", "DailyStatsWatermark").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("reports", "0003_stats_dirty_days"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutletDailyStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("tasks_completed", models.PositiveIntegerField(default=0)),
+                ("points", models.IntegerField(default=0)),
+                ("tasks_overdue", models.PositiveIntegerField(default=0, help_text="Tasks due this day and not completed by their due date")),
+                ("steps_completed", models.PositiveIntegerField(default=0)),
+                ("computed_at", models.DateTimeField(default=django.utils.timezone.now, help_text="Start of the rollup run that wrote this row")),
+                ("organization", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="outlet_daily_stats", to="core.organization")),
+                ("outlet", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="outlet_daily_stats", to="core.outlet")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["organization", "day"], name="reports_out_organiz_d28f5a_idx"), models.Index(fields=["organization", "outlet", "day"], name="reports_out_organiz_4f0b1f_idx")],
+            },
+        ),
+        migrations.RunPython(reset_watermarks, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
-"""Reports app models: Saved/generated reports."""
+"""Reports app models: Saved/generated reports, daily stats rollup."""
 from django.db import models
-from core.models import Organization, UserProfile
+from django.utils import timezone
+from core.models import Organization, Outlet, UserProfile
 
 
 class SavedReport(models.Model):
@@ -47,3 +48,75 @@ class ReportCache(models.Model):
 
     def __str__(self):
         return self.report_key
+
+
+class MemberDailyStats(models.Model):
+    """Daily rollup of task activity per (org, outlet, member, day), written
+    by reports.facts. Task counts are per assignment; member is null for
+    unassigned tasks."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="daily_stats")
+    outlet = models.ForeignKey(Outlet, on_delete=models.SET_NULL, null=True, blank=True, related_name="daily_stats")
+    member = models.ForeignKey(UserProfile, on_delete=models.CASCADE, null=True, blank=True, related_name="daily_stats")
+    day = models.DateField()
+    tasks_completed = models.PositiveIntegerField(default=0)
+    points = models.IntegerField(default=0)
+    tasks_overdue = models.PositiveIntegerField(default=0, help_text="Tasks due this day and not completed by their due date")
+    steps_completed = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now, help_text="Start of the rollup run that wrote this row")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "day"]),
+            models.Index(fields=["organization", "outlet", "day"]),
+            models.Index(fields=["member", "day"]),
+            models.Index(fields=["organization", "computed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.member_id} @ {self.outlet_id} on {self.day}"
+
+
+class OutletDailyStats(models.Model):
+    """Daily rollup of task activity per (org, outlet, day), written by
+    reports.facts. Unlike MemberDailyStats, a task counts once however many
+    people it is assigned to."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="outlet_daily_stats")
+    outlet = models.ForeignKey(Outlet, on_delete=models.SET_NULL, null=True, blank=True, related_name="outlet_daily_stats")
+    day = models.DateField()
+    tasks_completed = models.PositiveIntegerField(default=0)
+    points = models.IntegerField(default=0)
+    tasks_overdue = models.PositiveIntegerField(default=0, help_text="Tasks due this day and not completed by their due date")
+    steps_completed = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(default=timezone.now, help_text="Start of the rollup run that wrote this row")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "day"]),
+            models.Index(fields=["organization", "outlet", "day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.outlet_id} on {self.day}"
+
+
+class DailyStatsDirtyDay(models.Model):
+    """A day whose MemberDailyStats must be rebuilt by the next rollup,
+    recorded by writes that leave no timestamp behind (deletes, undone
+    completions, moved due dates, reassignments). Duplicates are allowed."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="dirty_stat_days")
+    day = models.DateField()
+
+    class Meta:
+        indexes = [models.Index(fields=["organization", "day"])]
+
+    def __str__(self):
+        return f"{self.organization_id} on {self.day}"
+
+
+class DailyStatsWatermark(models.Model):
+    """Start of the last incremental rollup run for an organization."""
+    organization = models.OneToOneField(Organization, on_delete=models.CASCADE, related_name="stats_watermark")
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.organization_id} @ {self.computed_at}"
@@ -0,0 +1,196 @@
+"""
+Precomputed report snapshots in ``ReportCache``.
+
+A snapshot is the JSON rows of one report (see reports.engine) for one
+(report type, org, outlet, filters) key, stamped with the org data version it
+was built from. Reads follow stale-while-revalidate:
+
+    fresh     younger than CACHE_TTL_REPORTS and built from the current
+              data version: served as is
+    stale     otherwise, but younger than REPORT_SNAPSHOT_MAX_AGE: served as is
+              while the ``regenerate_report_snapshot`` job rebuilds it (with
+              REPORT_SNAPSHOT_EAGER, after the response has been sent)
+    expired   missing or older than REPORT_SNAPSHOT_MAX_AGE: rebuilt inline
+
+Rebuilds are single-flight: a ``cache.add`` lock per key lets one process
+build while concurrent misses wait for its result (up to REPORT_SNAPSHOT_WAIT
+seconds) instead of all recomputing. That only holds across processes when
+the cache is shared (Redis); LocMemCache locks are per process, so each
+worker may rebuild the same snapshot once. ``refresh_report_cache`` rebuilds
+the org-wide snapshots ahead of time so pages rarely hit the inline path.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.caching import org_version
+from . import engine
+
+logger = logging.getLogger(__name__)
+
+WAIT_INTERVAL = 0.2  # seconds between checks while another process builds
+
+# Eager rebuilds queued by the current request, run once its response is sent.
+_deferred = threading.local()
+
+
+class Snapshot:
+    def __init__(self, report_type, entry):
+        row = engine.REPORTS[report_type][1]
+        self.rows = [row.from_dict(d) for d in entry.data["rows"]]
+        self.generated_at = entry.generated_at
+        self.version = entry.data.get("version")
+
+
+def snapshot_key(report_type, org_id, outlet_id=None, filters=None):
+    key = f"{report_type}:org{org_id}:outlet{outlet_id or 0}"
+    if filters:
+        key += ":" + hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return key
+
+
+def _lock_key(key):
+    return f"reportlock:{key}"
+
+
+def _is_fresh(entry, now, version):
+    return (
+        now - entry.generated_at < timedelta(seconds=settings.CACHE_TTL_REPORTS)
+        and entry.data.get("version") == version
+    )
+
+
+def _load(key):
+    from .models import ReportCache
+
+    return ReportCache.objects.filter(report_key=key).first()
+
+
+def _build(report_type, org_id, outlet_id, filters):
+    from core.models import Organization
+    from .models import ReportCache
+
+    version = org_version(org_id)  # read first: a write during the build leaves it stale, not fresh
+    builder, _row = engine.REPORTS[report_type]
+    rows = builder(Organization(pk=org_id), outlet_id)
+    entry, _created = ReportCache.objects.update_or_create(
+        report_key=snapshot_key(report_type, org_id, outlet_id, filters),
+        defaults={
+            "organization_id": org_id,
+            "data": {"version": version, "rows": [r.to_dict() for r in rows]},
+            "expires_at": timezone.now() + timedelta(seconds=settings.REPORT_SNAPSHOT_MAX_AGE),
+        },
+    )
+    return entry
+
+
+def regenerate(report_type, org_id, outlet_id=None, filters=None, locked=False):
+    """Rebuild a snapshot. With ``locked`` the caller already holds the key's
+    lock (it is released here); otherwise it is taken, and the rebuild skipped
+    if another process holds it. Returns the new entry or None."""
+    lock = _lock_key(snapshot_key(report_type, org_id, outlet_id, filters))
+    if not locked and not cache.add(lock, 1, settings.REPORT_SNAPSHOT_LOCK_TIMEOUT):
+        return None
+    try:
+        return _build(report_type, org_id, outlet_id, filters)
+    finally:
+        cache.delete(lock)
+
+
+def _start_request(sender, **kwargs):
+    _deferred.jobs = []
+
+
+def _finish_request(sender, **kwargs):
+    jobs, _deferred.jobs = getattr(_deferred, "jobs", None), None
+    if not jobs:
+        return
+    for args in jobs:
+        try:
+            regenerate(*args, locked=True)
+        except Exception:
+            logger.exception("Deferred rebuild of %s snapshot failed", args[0])
+    close_old_connections()
+
+
+def connect_signals():
+    """Run eager rebuilds after the response (called from ReportsConfig.ready)."""
+    request_started.connect(_start_request, dispatch_uid="report_snapshot_start")
+    request_finished.connect(_finish_request, dispatch_uid="report_snapshot_finish")
+
+
+def _rebuild_after_response(report_type, org_id, outlet_id, filters):
+    """Rebuild once the current response is finished; outside a request
+    (shell, Celery, management commands) rebuild now."""
+    jobs = getattr(_deferred, "jobs", None)
+    if jobs is None:
+        regenerate(report_type, org_id, outlet_id, filters, locked=True)
+    else:
+        jobs.append((report_type, org_id, outlet_id, filters))
+
+
+def _revalidate(report_type, org_id, outlet_id, filters):
+    lock = _lock_key(snapshot_key(report_type, org_id, outlet_id, filters))
+    if not cache.add(lock, 1, settings.REPORT_SNAPSHOT_LOCK_TIMEOUT):
+        return  # someone is already rebuilding it
+    if settings.REPORT_SNAPSHOT_EAGER:
+        _rebuild_after_response(report_type, org_id, outlet_id, filters)
+        return
+    from kombu.exceptions import OperationalError
+    from .tasks import regenerate_report_snapshot
+
+    try:
+        regenerate_report_snapshot.delay(report_type, org_id, outlet_id, filters)
+    except OperationalError:
+        logger.warning("Celery broker unavailable; rebuilding %s snapshot after the response", report_type)
+        _rebuild_after_response(report_type, org_id, outlet_id, filters)
+
+
+def get(report_type, org, outlet=None, filters=None):
+    """Return the Snapshot of a report, serving stale data while it is rebuilt."""
+    org_id, outlet_id = getattr(org, "pk", org), getattr(outlet, "pk", outlet)
+    key = snapshot_key(report_type, org_id, outlet_id, filters)
+    entry = _load(key)
+    now = timezone.now()
+
+    if entry and now - entry.generated_at < timedelta(seconds=settings.REPORT_SNAPSHOT_MAX_AGE):
+        if not _is_fresh(entry, now, org_version(org_id)):
+            _revalidate(report_type, org_id, outlet_id, filters)
+        return Snapshot(report_type, entry)
+
+    if cache.add(_lock_key(key), 1, settings.REPORT_SNAPSHOT_LOCK_TIMEOUT):
+        return Snapshot(report_type, regenerate(report_type, org_id, outlet_id, filters, locked=True))
+
+    # Another process is building this snapshot: wait for its result.
+    previous = entry.generated_at if entry else None
+    deadline = time.monotonic() + settings.REPORT_SNAPSHOT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = _load(key)
+        if entry and entry.generated_at != previous:
+            return Snapshot(report_type, entry)
+    return Snapshot(report_type, _build(report_type, org_id, outlet_id, filters))
+
+
+def refresh_all(orgs):
+    """Rebuild every org-wide snapshot that is not fresh; returns how many."""
+    rebuilt = 0
+    for org_id in orgs:
+        version = org_version(org_id)
+        now = timezone.now()
+        for report_type in engine.REPORTS:
+            entry = _load(snapshot_key(report_type, org_id))
+            if entry and _is_fresh(entry, now, version):
+                continue
+            if regenerate(report_type, org_id) is not None:
+                rebuilt += 1
+    return rebuilt
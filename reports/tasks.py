@@ -1,17 +1,33 @@
 """
-Celery tasks for report cache refresh.
+Celery tasks for report snapshots (see reports.snapshots).
 """
 from celery import shared_task
 
 
 @shared_task
 def refresh_report_cache():
-    """Refresh cached report data."""
+    """Drop expired report snapshots and rebuild the org-wide ones that are stale."""
+    from django.utils import timezone
     from core.models import Organization
     from reports.models import ReportCache
+    from reports.snapshots import refresh_all
 
-    # Clear expired cache entries
-    from django.utils import timezone
-    ReportCache.objects.filter(expires_at__lt=timezone.now()).delete()
+    deleted, _ = ReportCache.objects.filter(expires_at__lt=timezone.now()).delete()
+    rebuilt = refresh_all(Organization.objects.filter(is_active=True).values_list("id", flat=True))
+    return f"Rebuilt {rebuilt} report snapshots, deleted {deleted} expired"
+
+
+@shared_task(ignore_result=True)
+def regenerate_report_snapshot(report_type, org_id, outlet_id=None, filters=None):
+    """Rebuild one stale snapshot; the requesting process holds its lock."""
+    from reports.snapshots import regenerate
+
+    regenerate(report_type, org_id, outlet_id, filters, locked=True)
+
+
+@shared_task
+def rollup_daily_stats():
+    """Nightly incremental rebuild of the daily stats behind the trend reports."""
+    from reports.facts import rollup
 
-    return "Report cache refreshed"
+    return f"Rebuilt daily stats for {rollup()} org-days"
@@ -1,3 +1,44 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Organization, Outlet, UserProfile
+from tasks.models import Task
+from . import engine, facts
+
+
+class DailyStatsGrainTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org", code="ORG")
+        self.outlet = Outlet.objects.create(organization=self.org, name="Main Store")
+        self.members = [
+            UserProfile.objects.create(user=User.objects.create(username=f"m{i}"), organization=self.org, outlet=self.outlet)
+            for i in range(3)
+        ]
+        # Noon yesterday, so the due and completion times share a day and a month.
+        yesterday = timezone.localtime().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        shared = Task.objects.create(
+            organization=self.org, outlet=self.outlet, created_by=self.members[0], title="Stock count",
+            status="completed", points=10, due_date=yesterday - timedelta(hours=2), completed_at=yesterday,
+        )
+        shared.assigned_to.set(self.members)
+        Task.objects.create(
+            organization=self.org, outlet=self.outlet, created_by=self.members[0], title="Unassigned",
+            status="completed", points=5, completed_at=yesterday,
+        )
+        self.month = f"{timezone.localdate(yesterday):%Y-%m}"
+
+        facts.rollup([self.org.id])
+
+    def test_outlet_totals_count_multi_assignee_task_once(self):
+        [row] = engine.task_submission(self.org)
+
+        self.assertEqual((row.month, row.tasks_completed, row.points, row.tasks_overdue), (self.month, 2, 15, 1))
+
+    def test_member_rows_count_task_per_assignee(self):
+        rows = engine.employee_taskwise(self.org)
 
-# Create your tests here.
+        self.assertEqual(sorted((r.member_id, r.tasks_completed, r.points) for r in rows),
+                         sorted((m.id, 1, 10) for m in self.members))
@@ -9,5 +9,10 @@ urlpatterns = [
     path("employee-issues/", views.report_employee_issues_view, name="report_employee_issues"),
     path("backlog/", views.report_backlog_view, name="report_backlog"),
     path("points/", views.report_points_view, name="report_points"),
+    path("monthly-points/", views.report_monthly_points_view, name="report_monthly_points"),
+    path("outlet-checklist/", views.report_outlet_checklist_view, name="report_outlet_checklist"),
+    path("employee-taskwise/", views.report_employee_taskwise_view, name="report_employee_taskwise"),
+    path("task-submission/", views.report_task_submission_view, name="report_task_submission"),
     path("api/<str:report_type>/chart/", views.api_report_chart_data, name="api_report_chart"),
+    path("export/<str:report_type>/", views.report_export_view, name="report_export"),
 ]
@@ -6,12 +6,17 @@ from datetime import date, timedelta
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Count, Q, Sum, Avg
 
+from core import export
 from core.views import get_current_org, get_current_profile, get_current_outlet, require_perm
-from core.models import Outlet, Team, UserProfile
+from tasks import export as task_export
 from tasks.models import Task
-from issues.models import Issue
+from . import engine, snapshots
+
+
+def _report_rows(org, report_type):
+    """Rows of a report (see reports.engine), served from its ReportCache snapshot."""
+    return snapshots.get(report_type, org).rows
 
 
 def reports_dashboard_view(request):
@@ -35,18 +40,7 @@ def report_outlet_tasks_view(request):
     if denied:
         return denied
 
-    outlets = Outlet.objects.filter(organization=org, is_active=True)
-    data = []
-    for o in outlets:
-        tasks = Task.objects.filter(organization=org, outlet=o, is_trashed=False)
-        data.append({
-            "outlet": o,
-            "total": tasks.count(),
-            "completed": tasks.filter(status="completed").count(),
-            "ongoing": tasks.filter(status__in=["todo", "in_progress", "review"]).count(),
-            "overdue": tasks.filter(due_date__lt=timezone.now()).exclude(status="completed").count(),
-            "on_hold": tasks.filter(status="on_hold").count(),
-        })
+    data = _report_rows(org, "outlet_tasks")
 
     return render(request, "reports/outlet_tasks.html", {"data": data})
 
@@ -60,18 +54,7 @@ def report_outlet_issues_view(request):
     if denied:
         return denied
 
-    outlets = Outlet.objects.filter(organization=org, is_active=True)
-    data = []
-    for o in outlets:
-        issues = Issue.objects.filter(organization=org, outlet=o, is_trashed=False)
-        data.append({
-            "outlet": o,
-            "total": issues.count(),
-            "open": issues.filter(status="open").count(),
-            "resolved": issues.filter(status="resolved").count(),
-            "ignored": issues.filter(status="ignored").count(),
-            "closed": issues.filter(status="closed").count(),
-        })
+    data = _report_rows(org, "outlet_issues")
 
     return render(request, "reports/outlet_issues.html", {"data": data})
 
@@ -85,18 +68,7 @@ def report_employee_tasks_view(request):
     if denied:
         return denied
 
-    members = UserProfile.objects.filter(organization=org, is_active=True).select_related("user", "outlet", "team")
-    data = []
-    for m in members:
-        tasks = Task.objects.filter(organization=org, assigned_to=m, is_trashed=False)
-        data.append({
-            "member": m,
-            "total": tasks.count(),
-            "completed": tasks.filter(status="completed").count(),
-            "ongoing": tasks.filter(status__in=["todo", "in_progress", "review"]).count(),
-            "overdue": tasks.filter(due_date__lt=timezone.now()).exclude(status="completed").count(),
-            "points": tasks.filter(status="completed").aggregate(total=Sum("points"))["total"] or 0,
-        })
+    data = _report_rows(org, "employee_tasks")
 
     return render(request, "reports/employee_tasks.html", {"data": data})
 
@@ -110,21 +82,22 @@ def report_employee_issues_view(request):
     if denied:
         return denied
 
-    members = UserProfile.objects.filter(organization=org, is_active=True).select_related("user", "outlet", "team")
-    data = []
-    for m in members:
-        issues = Issue.objects.filter(organization=org, assigned_to=m, is_trashed=False)
-        data.append({
-            "member": m,
-            "total": issues.count(),
-            "open": issues.filter(status="open").count(),
-            "resolved": issues.filter(status="resolved").count(),
-            "ignored": issues.filter(status="ignored").count(),
-        })
+    data = _report_rows(org, "employee_issues")
 
     return render(request, "reports/employee_issues.html", {"data": data})
 
 
+def _backlog_tasks(request, org):
+    """Open tasks past their due date, in the current outlet if one is selected."""
+    tasks = Task.objects.filter(
+        organization=org, is_trashed=False, due_date__lt=timezone.now(),
+    ).exclude(status="completed")
+    outlet = get_current_outlet(request)
+    if outlet:
+        tasks = tasks.filter(outlet=outlet)
+    return tasks
+
+
 def report_backlog_view(request):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -134,17 +107,10 @@ def report_backlog_view(request):
     if denied:
         return denied
 
-    overdue_tasks = Task.objects.filter(
-        organization=org, is_trashed=False,
-        due_date__lt=timezone.now()
-    ).exclude(status="completed").select_related(
+    overdue_tasks = _backlog_tasks(request, org).select_related(
         "outlet", "team", "category"
     ).prefetch_related("assigned_to", "assigned_to__user")
 
-    outlet = get_current_outlet(request)
-    if outlet:
-        overdue_tasks = overdue_tasks.filter(outlet=outlet)
-
     return render(request, "reports/backlog.html", {"overdue_tasks": overdue_tasks})
 
 
@@ -157,25 +123,67 @@ def report_points_view(request):
     if denied:
         return denied
 
-    members = UserProfile.objects.filter(
-        organization=org, is_active=True
-    ).select_related("user", "outlet", "team")
-
-    data = []
-    for m in members:
-        completed = Task.objects.filter(
-            organization=org, assigned_to=m, is_trashed=False, status="completed"
-        )
-        data.append({
-            "member": m,
-            "total_points": completed.aggregate(total=Sum("points"))["total"] or 0,
-            "tasks_completed": completed.count(),
-        })
-
-    data.sort(key=lambda x: x["total_points"], reverse=True)
+    data = _report_rows(org, "points")
+
     return render(request, "reports/points.html", {"data": data})
 
 
+def report_monthly_points_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_reports")
+    if denied:
+        return denied
+
+    data = _report_rows(org, "monthly_points")
+
+    return render(request, "reports/monthly_points.html", {"data": data, "months": list(data[0].months) if data else []})
+
+
+def report_outlet_checklist_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_reports")
+    if denied:
+        return denied
+
+    data = _report_rows(org, "outlet_checklist")
+
+    return render(request, "reports/outlet_checklist.html", {"data": data, "months": list(data[0].months) if data else []})
+
+
+def report_employee_taskwise_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_reports")
+    if denied:
+        return denied
+
+    data = _report_rows(org, "employee_taskwise")
+
+    return render(request, "reports/employee_taskwise.html", {"data": data})
+
+
+def report_task_submission_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_reports")
+    if denied:
+        return denied
+
+    data = _report_rows(org, "task_submission")
+
+    return render(request, "reports/task_submission.html", {"data": data})
+
+
 def api_report_chart_data(request, report_type):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -185,16 +193,31 @@ def api_report_chart_data(request, report_type):
         return JsonResponse({"error": "Permission denied"}, status=403)
 
     if report_type == "outlet_tasks":
-        outlets = Outlet.objects.filter(organization=org, is_active=True)
-        labels = [o.name for o in outlets]
-        completed = [Task.objects.filter(organization=org, outlet=o, status="completed", is_trashed=False).count() for o in outlets]
-        ongoing = [Task.objects.filter(organization=org, outlet=o, status__in=["todo", "in_progress"], is_trashed=False).count() for o in outlets]
-        return JsonResponse({
-            "labels": labels,
-            "datasets": [
-                {"label": "Completed", "data": completed, "backgroundColor": "#22c55e"},
-                {"label": "Ongoing", "data": ongoing, "backgroundColor": "#3b82f6"},
-            ]
-        })
+        return JsonResponse(engine.outlet_tasks_chart(_report_rows(org, "outlet_tasks")))
+
+    return JsonResponse({"error": "Unknown report type"}, status=400)
+
+
+def report_export_view(request, report_type):
+    """Stream a report as CSV or XLSX (``?format=``)."""
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "export_reports")
+    if denied:
+        return denied
+    fmt = export.requested_format(request)
+    if not fmt:
+        return JsonResponse({"error": "Unknown export format"}, status=400)
+
+    filename = f"report-{report_type.replace('_', '-')}"
+    if report_type == "backlog":
+        rows = task_export.rows(_backlog_tasks(request, org))
+        return export.export_response(request, task_export.COLUMNS, rows, filename, fmt)
+    if report_type in engine.REPORTS:
+        row_class = engine.REPORTS[report_type][1]
+        rows = _report_rows(org, report_type)
+        return export.export_response(request, row_class.export_columns(rows), (r.export_dict() for r in rows), filename, fmt)
 
     return JsonResponse({"error": "Unknown report type"}, status=400)
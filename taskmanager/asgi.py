@@ -2,6 +2,9 @@
 ASGI config for taskmanager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it (e.g. ``uvicorn taskmanager.asgi:application``) to enable the
+notification stream at /notifications/stream/; under WSGI the pages fall back
+to polling.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.ActivityFlushMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -43,6 +44,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.LoginRequiredMiddleware",
+    "core.middleware.CurrentContextMiddleware",
 ]
 
 ROOT_URLCONF = "taskmanager.urls"
@@ -133,8 +135,58 @@ else:
 
 # Cache timeouts (seconds)
 CACHE_TTL_DASHBOARD = 120   # 2 minutes
-CACHE_TTL_REPORTS = 600     # 10 minutes
+CACHE_TTL_REPORTS = 600     # 10 minutes, then report snapshots are rebuilt in the background
 CACHE_TTL_TEMPLATES = 1800  # 30 minutes
+CACHE_TTL_ROLE_PERMS = 3600  # 1 hour, invalidated on change
+CACHE_TTL_UNREAD = 3600      # 1 hour, invalidated on change
+CACHE_TTL_PAGE_COUNT = 300   # approximate totals shown under cursor-paginated lists
+CACHE_TTL_SEARCH = 60        # global search results, per org/query
+
+# Process-local copy of role permission sets (see core.permissions)
+ROLE_PERMS_LOCAL_TTL = 10    # seconds
+ROLE_PERMS_LOCAL_SIZE = 256  # roles
+
+# ============================================================
+# SEARCH (see core.search)
+# ============================================================
+SEARCH_MAX_TERMS = 8
+SEARCH_GLOBAL_PER_TYPE = 5
+
+# ============================================================
+# REPORT SNAPSHOTS (ReportCache, see reports.snapshots)
+# ============================================================
+REPORT_SNAPSHOT_MAX_AGE = 3600      # oldest snapshot ever served; older ones are rebuilt inline
+REPORT_SNAPSHOT_LOCK_TIMEOUT = 120  # seconds one rebuild may hold a snapshot's lock
+REPORT_SNAPSHOT_WAIT = 10           # seconds a miss waits for a concurrent rebuild
+# Without a broker, stale snapshots are rebuilt in-process once the response that found them is sent.
+REPORT_SNAPSHOT_EAGER = os.environ.get("REPORT_SNAPSHOT_EAGER", str(not USE_REDIS)).lower() == "true"
+REPORT_TREND_MONTHS = 12  # months shown by the month-on-month reports
+FACT_REBUILD_DAYS = 3     # trailing days every nightly stats rollup rebuilds (see reports.facts)
+
+# ============================================================
+# ACTIVITY LOG (write-behind buffer, see core.activity)
+# ============================================================
+ACTIVITY_LOG_SYNC = os.environ.get("ACTIVITY_LOG_SYNC", "false").lower() == "true"  # write every entry at once
+ACTIVITY_LOG_SINK = os.environ.get("ACTIVITY_LOG_SINK", "db")  # "db" or "celery"
+ACTIVITY_BUFFER_SIZE = 200     # entries buffered before a flush
+ACTIVITY_BUFFER_MAX_AGE = 5    # seconds the oldest buffered entry may wait
+ACTIVITY_FLUSH_ATTEMPTS = 5    # tries at writing an entry before it is dropped
+ACTIVITY_RETENTION_DAYS = 90   # older entries move to the archive (see core.archive)
+ACTIVITY_ARCHIVE_DIR = os.environ.get("ACTIVITY_ARCHIVE_DIR", BASE_DIR / "archive" / "activity")
+ACTIVITY_ARCHIVE_CHUNK = 2000  # rows archived and deleted per statement
+
+# ============================================================
+# NOTIFICATION STREAM (server-sent events, served under ASGI)
+# ============================================================
+NOTIFICATION_PUBSUB_BACKEND = (
+    "notifications.pubsub.RedisBackend" if USE_REDIS else "notifications.pubsub.InProcessBackend"
+)
+NOTIFICATION_PUBSUB_URL = os.environ.get("NOTIFICATION_PUBSUB_URL", os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"))
+NOTIFICATION_STREAM_HEARTBEAT = 25     # seconds between keepalive comments
+NOTIFICATION_STREAM_MAX_AGE = 300      # seconds before the client is asked to reconnect
+NOTIFICATION_STREAM_RETRY_MS = 3000
+NOTIFICATION_POLL_INTERVAL_MS = 60000  # fallback polling when the stream is unavailable
+NOTIFICATION_DEDUPE_WINDOW = 300       # seconds an identical notification is not sent again
 
 # ============================================================
 # CELERY CONFIGURATION
@@ -147,9 +199,12 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 300  # 5 minutes
+# Without a broker, AI enrichment runs in-process right after the request commits.
+AI_ENRICHMENT_EAGER = os.environ.get("AI_ENRICHMENT_EAGER", str(not USE_REDIS)).lower() == "true"
 
 # Celery Beat schedule (periodic tasks)
 from datetime import timedelta
+from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
     "check-overdue-tasks": {
         "task": "notifications.tasks.check_overdue_tasks",
@@ -161,12 +216,28 @@ CELERY_BEAT_SCHEDULE = {
     },
     "refresh-report-cache": {
         "task": "reports.tasks.refresh_report_cache",
+        "schedule": timedelta(minutes=30),
+    },
+    "reconcile-outlet-stats": {
+        "task": "core.tasks.reconcile_outlet_stats",
         "schedule": timedelta(hours=6),
     },
     "check-recurring-tasks": {
-        "task": "tasks.celery_tasks.process_recurring_tasks",
+        "task": "notifications.tasks.process_recurring_tasks",
         "schedule": timedelta(hours=1),
     },
+    "archive-activity-logs": {
+        "task": "core.tasks.archive_activity_logs",
+        "schedule": timedelta(days=1),
+    },
+    "rollup-daily-stats": {
+        "task": "reports.tasks.rollup_daily_stats",
+        "schedule": crontab(hour=1, minute=30),
+    },
+    "enrich-stale-tasks": {
+        "task": "tasks.tasks.enrich_stale_tasks",
+        "schedule": timedelta(minutes=15),
+    },
 }
 
 # ============================================================
@@ -174,3 +245,7 @@ CELERY_BEAT_SCHEDULE = {
 # ============================================================
 DEFAULT_PAGE_SIZE = 10
 PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+BOARD_COLUMN_SIZE = 20  # cards rendered per kanban column; more load on scroll
+CALENDAR_MAX_RANGE_DAYS = 62  # widest window the calendar event feed serves
+BULK_TASK_LIMIT = 500  # tasks one bulk action may select
+EXPORT_CHUNK_SIZE = 2000  # rows per database round trip in streaming exports (see core.export)
@@ -0,0 +1,173 @@
+"""
+Bulk task operations (the multi-select actions of the task list).
+
+Each action costs a fixed handful of statements however many tasks it touches:
+one SELECT of the selected rows, set-based ``UPDATE`` (or ``bulk_update`` where
+every row gets its own value), and ``bulk_create`` for the activity entries;
+notifications go through the chunked fan-out in ``notifications.service``.
+These writes skip the save signals, so the derived state they would have
+maintained is refreshed explicitly: the outlet counters, the search index,
+the daily stats days they moved away from and the org's cache version.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.caching import bump_org_version_on_commit
+from core.models import ActivityLog, UserProfile
+from core.search import unindex
+from core.stats import rebuild_outlet_stats
+from notifications.service import notify_many
+from reports.facts import mark_dirty
+from . import recurrence
+from .models import Task
+
+
+# action -> permission needed to run it
+ACTIONS = {
+    "status": "change_task_status",
+    "assign": "assign_task",
+    "priority": "edit_task",
+    "shift_due": "edit_task",
+    "star": "edit_task",
+    "trash": "delete_task",
+    "delete": "delete_task",
+}
+
+MAX_SHIFT_DAYS = 3650
+
+
+class BulkActionError(ValueError):
+    pass
+
+
+def _activity(org, profile, tasks, action, details=""):
+    """One unsaved ActivityLog per task; ``details`` may be a {task_id: text} map."""
+    return [
+        ActivityLog(
+            organization=org, user=profile, action=action, entity_type="task",
+            entity_id=None if action == "deleted" else t.id, entity_name=t.title[:255],
+            details=details.get(t.id, "") if isinstance(details, dict) else details,
+        )
+        for t in tasks
+    ]
+
+
+def _set_status(org, tasks, status):
+    if status not in dict(Task.STATUS_CHOICES):
+        raise BulkActionError(f"Unknown status {status!r}")
+    now = timezone.now()
+    changed, details = [t for t in tasks if t.status != status], {}
+    mark_dirty(org.id, [t.completed_at for t in changed])
+    for task in changed:
+        details[task.id] = f"{task.status} → {status}"
+        task.status = status
+        if status == "completed":
+            task.completed_at = now
+            recurrence.arm(task)
+        else:
+            task.completed_at = None
+            task.next_run_at = None
+        task.updated_at = now
+    Task.objects.bulk_update(changed, ["status", "completed_at", "next_run_at", "updated_at"], batch_size=500)
+    return changed, details
+
+
+def _assign(org, profile, tasks, profile_ids):
+    """Make ``profile_ids`` the exact assignee set of every task and notify the
+    people newly assigned."""
+    assignees = set(UserProfile.objects.filter(
+        organization=org, is_active=True, id__in=profile_ids,
+    ).values_list("id", flat=True))
+    Assignment = Task.assigned_to.through
+    task_ids = [t.id for t in tasks]
+    existing = set(Assignment.objects.filter(task_id__in=task_ids).values_list("task_id", "userprofile_id"))
+    added = {(task_id, pid) for task_id in task_ids for pid in assignees} - existing
+
+    Assignment.objects.filter(task_id__in=task_ids).exclude(userprofile_id__in=assignees).delete()
+    Assignment.objects.bulk_create(
+        [Assignment(task_id=task_id, userprofile_id=pid) for task_id, pid in added], batch_size=500,
+    )
+    titles = {t.id: t.title for t in tasks}
+    notify_many(
+        ((pid, {
+            "organization": org, "notification_type": "task_assigned",
+            "title": "New Task Assigned", "message": f"You've been assigned: '{titles[task_id]}'",
+            "link": f"/tasks/{task_id}/", "entity_type": "task", "entity_id": task_id,
+        }) for task_id, pid in sorted(added)),
+        exclude=[profile],
+    )
+
+
+@transaction.atomic
+def apply(org, profile, action, ids, value=None):
+    """Run ``action`` on the organization's tasks among ``ids``.
+
+    The caller has checked ``ACTIONS[action]``. Returns the number of tasks
+    affected; raises BulkActionError for an unknown action or bad value.
+    """
+    if action not in ACTIONS:
+        raise BulkActionError(f"Unknown action {action!r}")
+    tasks = list(Task.objects.filter(organization=org, id__in=ids).only(
+        "id", "organization_id", "outlet_id", "title", "status", "is_trashed",
+        "start_date", "due_date", "completed_at", "recurrence", "recurrence_details", "next_run_at",
+    ))
+    if not tasks:
+        return 0
+    selected = Task.objects.filter(id__in=[t.id for t in tasks])
+    now = timezone.now()
+    activity, counters_stale = [], False
+
+    if action == "status":
+        changed, details = _set_status(org, tasks, value)
+        activity = _activity(org, profile, changed, "status_changed", details)
+        counters_stale = True
+        tasks = changed
+    elif action == "assign":
+        if not isinstance(value, list) or not all(type(pid) is int for pid in value):
+            raise BulkActionError("assign needs a list of member ids")
+        _assign(org, profile, tasks, value)
+        mark_dirty(org.id, [d for t in tasks for d in (t.completed_at, t.due_date)])
+        activity = _activity(org, profile, tasks, "assigned")
+    elif action == "priority":
+        if value not in dict(Task.PRIORITY_CHOICES):
+            raise BulkActionError(f"Unknown priority {value!r}")
+        selected.update(priority=value, updated_at=now)
+        activity = _activity(org, profile, tasks, "updated", f"priority → {value}")
+    elif action == "shift_due":
+        try:
+            days = int(value)
+        except (TypeError, ValueError):
+            raise BulkActionError("shift_due needs a number of days")
+        if not days or abs(days) > MAX_SHIFT_DAYS:
+            raise BulkActionError("shift_due is out of range")
+        tasks = [t for t in tasks if t.due_date]
+        mark_dirty(org.id, [t.due_date for t in tasks])
+        try:
+            with transaction.atomic():
+                selected.filter(due_date__isnull=False).update(
+                    due_date=F("due_date") + timedelta(days=days), updated_at=now,
+                )
+        except IntegrityError:
+            raise BulkActionError("Shifting would give two instances of a recurring series the same due date")
+        activity = _activity(org, profile, tasks, "updated", f"due date shifted {days:+d} days")
+    elif action == "star":
+        selected.update(is_starred=bool(value))
+    elif action == "trash":
+        selected.update(is_trashed=True, updated_at=now)
+        unindex("task", [t.id for t in tasks])
+        activity = _activity(org, profile, tasks, "trashed")
+        counters_stale = True
+    elif action == "delete":
+        activity = _activity(org, profile, tasks, "deleted")
+        selected.delete()  # delete signals keep the counters and search index in sync
+
+    ActivityLog.objects.bulk_create(activity, batch_size=500)
+    if counters_stale:
+        outlet_ids = {t.outlet_id for t in tasks if t.outlet_id}
+        if outlet_ids:
+            rebuild_outlet_stats(org.id, outlet_ids=outlet_ids, entity_types=["task"])
+    bump_org_version_on_commit(org.id)
+    return len(tasks)
@@ -0,0 +1,109 @@
+"""
+AI enrichment of tasks: summary, suggested priority and delay prediction.
+
+Enrichment never runs on the request path. A task that needs it is stamped
+with ``ai_requested_at`` and, once the transaction commits, its id is handed to
+the ``tasks.tasks.enrich_tasks`` Celery job (or enriched in-process after the
+commit when AI_ENRICHMENT_EAGER is set, for deployments without a broker). The
+job reads pending rows in batches and writes each batch back with a single
+``bulk_update``, clearing the stamp; the periodic sweep picks up requests whose
+job was lost.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.aggregates import related_count
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+# A request still pending after this long lost its job; the sweep redoes it.
+STALE_AFTER = timedelta(minutes=10)
+
+FIELDS = ["ai_summary", "ai_priority_suggestion", "ai_delay_prediction", "ai_requested_at"]
+
+
+def enqueue(task_ids):
+    """Enrich already-stamped tasks once the current transaction commits."""
+    task_ids = list(task_ids)
+    if task_ids:
+        transaction.on_commit(lambda: _dispatch(task_ids))
+
+
+def request_refresh(task_ids):
+    """Stamp tasks as pending and queue their enrichment."""
+    from .models import Task
+
+    task_ids = list(task_ids)
+    Task.objects.filter(id__in=task_ids).update(ai_requested_at=timezone.now())
+    enqueue(task_ids)
+
+
+def _dispatch(task_ids):
+    if settings.AI_ENRICHMENT_EAGER:
+        enrich_pending(task_ids)
+        return
+    from kombu.exceptions import OperationalError
+    from .tasks import enrich_tasks
+
+    try:
+        enrich_tasks.delay(task_ids)
+    except OperationalError:
+        logger.warning("Celery broker unavailable; enriching %d tasks in-process", len(task_ids))
+        enrich_pending(task_ids)
+
+
+def _enrich(task, now):
+    from core.ai_engine import AIEngine
+
+    task.ai_summary = AIEngine.generate_summary({
+        "title": task.title, "description": task.description, "priority": task.priority,
+    })
+    task.ai_priority_suggestion = AIEngine.predict_priority(task.title, task.description)["predicted_priority"]
+    task.ai_delay_prediction = AIEngine.predict_delay({
+        "title": task.title,
+        "priority": task.priority,
+        "assignee_count": task.num_assignees,
+        "days_until_due": (task.due_date - now).days if task.due_date else 7,
+        "has_subtasks": task.num_subtasks > 0,
+    })
+    task.ai_requested_at = None
+
+
+def enrich_pending(task_ids=None, requested_before=None, batch_size=BATCH_SIZE):
+    """Enrich pending tasks, limited to ``task_ids`` and/or to requests made
+    before ``requested_before``. Returns the number of tasks written.
+
+    Each batch is one SELECT (assignee and subtask counts annotated) and one
+    ``bulk_update``; written rows drop out of the pending set, so the loop ends.
+    """
+    from .models import Task
+
+    pending = Task.objects.filter(ai_requested_at__isnull=False)
+    if task_ids is not None:
+        pending = pending.filter(id__in=task_ids)
+    if requested_before is not None:
+        pending = pending.filter(ai_requested_at__lt=requested_before)
+    pending = pending.only(
+        "id", "title", "description", "priority", "due_date", "ai_requested_at",
+    ).annotate(
+        num_assignees=related_count(Task.assigned_to.through.objects.all(), "task"),
+        num_subtasks=related_count(Task.objects.filter(is_trashed=False), "parent"),
+    ).order_by("ai_requested_at", "id")
+
+    written = 0
+    while True:
+        batch = list(pending[:batch_size])
+        if not batch:
+            break
+        now = timezone.now()
+        for task in batch:
+            _enrich(task, now)
+        Task.objects.bulk_update(batch, FIELDS)
+        written += len(batch)
+    return written
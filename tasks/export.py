@@ -0,0 +1,44 @@
+"""
+Task rows for the streaming exports (task list and backlog report).
+"""
+from core import export
+from .models import Task
+
+COLUMNS = [
+    ("id", "ID"), ("title", "Title"), ("status", "Status"), ("priority", "Priority"),
+    ("task_type", "Type"), ("outlet", "Outlet"), ("team", "Team"), ("project", "Project"),
+    ("category", "Category"), ("assignees", "Assigned To"), ("created_by", "Created By"),
+    ("start_date", "Start Date"), ("due_date", "Due Date"), ("completed_at", "Completed At"),
+    ("points", "Points"), ("created_at", "Created At"),
+]
+
+FIELDS = [
+    "id", "title", "status", "priority", "task_type", "start_date", "due_date", "completed_at",
+    "points", "created_at", "outlet__name", "team__name", "project__name", "category__name",
+    "created_by__user__first_name", "created_by__user__last_name", "created_by__user__username",
+]
+
+STATUS_LABELS = dict(Task.STATUS_CHOICES)
+PRIORITY_LABELS = dict(Task.PRIORITY_CHOICES)
+TYPE_LABELS = dict(Task.TYPE_CHOICES)
+
+
+def rows(tasks):
+    """Export rows of a task queryset: one projection streamed in chunks plus
+    one assignee query per chunk."""
+    for chunk in export.chunked(export.iter_values(tasks, *FIELDS)):
+        assignees = export.member_names(Task.assigned_to.through, "task_id", [r["id"] for r in chunk])
+        for r in chunk:
+            yield {
+                **r,
+                "status": STATUS_LABELS.get(r["status"], r["status"]),
+                "priority": PRIORITY_LABELS.get(r["priority"], r["priority"]),
+                "task_type": TYPE_LABELS.get(r["task_type"], r["task_type"]),
+                "outlet": r["outlet__name"], "team": r["team__name"],
+                "project": r["project__name"], "category": r["category__name"],
+                "assignees": assignees.get(r["id"], ""),
+                "created_by": export.full_name(
+                    r["created_by__user__first_name"], r["created_by__user__last_name"],
+                    r["created_by__user__username"],
+                ),
+            }
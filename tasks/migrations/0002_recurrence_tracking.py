@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def arm_completed_series(apps, schema_editor):
+    """Give each recurring series a single pending successor.
+
+    Existing rows have no recurrence_source link yet, so a series is the
+    tasks sharing (organization, title, recurrence, outlet, created_by). Only
+    its latest completed instance is armed, and only when no sibling is still
+    open or due after it: arming older instances would generate one overdue
+    duplicate per historical instance. Those older instances stay unarmed.
+    """
+    from tasks.recurrence import RECURRING, plan_next
+
+    Task = apps.get_model("tasks", "Task")
+    series = {}
+    for task in Task.objects.filter(is_trashed=False, recurrence__in=RECURRING).order_by("pk"):
+        key = (task.organization_id, task.title, task.recurrence, task.outlet_id, task.created_by_id)
+        series.setdefault(key, []).append(task)
+
+    armed = []
+    for tasks in series.values():
+        if any(t.status != "completed" for t in tasks):
+            continue
+        latest = max(tasks, key=lambda t: (t.completed_at or t.updated_at, t.pk))
+        if latest.due_date and any(t.due_date and t.due_date > latest.due_date for t in tasks):
+            continue
+        latest.next_run_at = plan_next(latest)[0]
+        if latest.next_run_at:
+            armed.append(latest)
+    Task.objects.bulk_update(armed, ["next_run_at"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_outlet_stats"),
+        ("projects", "0001_initial"),
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="next_run_at",
+            field=models.DateTimeField(blank=True, help_text="When the next instance of the series is due to be generated", null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="recurrence_source",
+            field=models.ForeignKey(blank=True, help_text="Instance of the series this task was generated from", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="recurrences", to="tasks.task"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="task",
+            unique_together={("recurrence_source", "due_date")},
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["next_run_at"], name="tasks_task_next_ru_456be7_idx"),
+        ),
+        migrations.RunPython(arm_completed_series, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_recurrence_tracking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="ai_requested_at",
+            field=models.DateTimeField(blank=True, help_text="When AI enrichment was queued; cleared once it is written", null=True),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["ai_requested_at"], name="tasks_task_ai_requ_0dcebd_idx"),
+        ),
+    ]
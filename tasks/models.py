@@ -1,6 +1,7 @@
 """Tasks app models: Task, SubTask, TaskStep, TaskComment, TaskAttachment."""
 from django.db import models
 from django.utils import timezone
+from core.aggregates import related_count
 from core.models import Organization, Outlet, Team, UserProfile
 from projects.models import Project
 
@@ -21,6 +22,17 @@ class TaskCategory(models.Model):
         return self.name
 
 
+class TaskQuerySet(models.QuerySet):
+    def with_list_stats(self):
+        """Annotate the subtask counts and prefetch the assignees shown on list
+        and board rows, so rendering a page issues no per-row queries."""
+        subtasks = self.model.objects.all()
+        return self.annotate(
+            num_subtasks=related_count(subtasks, "parent"),
+            num_completed_subtasks=related_count(subtasks.filter(status="completed"), "parent"),
+        ).prefetch_related("assigned_to", "assigned_to__user")
+
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ("critical", "Critical"),
@@ -45,6 +57,11 @@ class Task(models.Model):
         ("group", "Group Task"),
     ]
 
+    PRIORITY_COLORS = {
+        "critical": "#ef4444", "high": "#f97316",
+        "medium": "#eab308", "low": "#22c55e", "none": "#6b7280",
+    }
+
     RECURRENCE_CHOICES = [
         ("none", "None"),
         ("daily", "Daily"),
@@ -73,6 +90,11 @@ class Task(models.Model):
     points = models.IntegerField(default=0)
     recurrence = models.CharField(max_length=20, choices=RECURRENCE_CHOICES, default="none")
     recurrence_details = models.JSONField(default=dict, blank=True)
+    recurrence_source = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name="recurrences",
+        help_text="Instance of the series this task was generated from",
+    )
+    next_run_at = models.DateTimeField(null=True, blank=True, help_text="When the next instance of the series is due to be generated")
     needs_approval = models.BooleanField(default=False)
     is_starred = models.BooleanField(default=False)
     is_template = models.BooleanField(default=False)
@@ -80,6 +102,7 @@ class Task(models.Model):
     ai_summary = models.TextField(blank=True)
     ai_priority_suggestion = models.CharField(max_length=20, blank=True)
     ai_delay_prediction = models.JSONField(default=dict, blank=True)
+    ai_requested_at = models.DateTimeField(null=True, blank=True, help_text="When AI enrichment was queued; cleared once it is written")
     tags = models.CharField(max_length=500, blank=True)
     is_trashed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -100,7 +123,12 @@ class Task(models.Model):
             models.Index(fields=["parent"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["is_template"]),
+            models.Index(fields=["next_run_at"]),
+            models.Index(fields=["ai_requested_at"]),
         ]
+        unique_together = ["recurrence_source", "due_date"]
+
+    objects = TaskQuerySet.as_manager()
 
     def __str__(self):
         return self.title
@@ -113,19 +141,19 @@ class Task(models.Model):
 
     @property
     def subtask_count(self):
+        if hasattr(self, "num_subtasks"):
+            return self.num_subtasks
         return self.subtasks.count()
 
     @property
     def completed_subtask_count(self):
+        if hasattr(self, "num_completed_subtasks"):
+            return self.num_completed_subtasks
         return self.subtasks.filter(status="completed").count()
 
     @property
     def priority_color(self):
-        colors = {
-            "critical": "#ef4444", "high": "#f97316",
-            "medium": "#eab308", "low": "#22c55e", "none": "#6b7280",
-        }
-        return colors.get(self.priority, "#6b7280")
+        return self.PRIORITY_COLORS.get(self.priority, "#6b7280")
 
     @property
     def status_color(self):
@@ -138,6 +166,8 @@ class Task(models.Model):
 
     @property
     def assignee_list(self):
+        if "assigned_to" in getattr(self, "_prefetched_objects_cache", {}):
+            return self.assigned_to.all()
         return self.assigned_to.select_related('user').all()
 
 
@@ -0,0 +1,199 @@
+"""
+Recurrence engine for recurring tasks.
+
+A recurring series is a chain of Task rows linked through ``recurrence_source``.
+When an instance is completed it is armed with ``next_run_at`` (the moment its
+successor should appear); ``generate_due_instances`` then creates the successors
+of every armed task whose ``next_run_at`` has passed and disarms the sources.
+Only armed rows are read, through the ``next_run_at`` index, and
+(recurrence_source, due_date) is unique so a generation run can be repeated or
+raced without creating duplicates.
+
+``recurrence_details`` understands these optional keys:
+
+    interval      every N days/weeks/months (default 1)
+    unit          "days", "weeks" or "months" (only for "custom")
+    weekdays      list of weekday numbers, Monday=0 (weekly rules)
+    day_of_month  day to recur on for monthly rules (default: anchor's day)
+    until         ISO date after which the series stops
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+RECURRING = ["daily", "weekly", "monthly", "custom"]
+
+UNITS = {"daily": "days", "weekly": "weeks", "monthly": "months"}
+
+BATCH_SIZE = 500
+
+
+def _add_months(dt, months, day=None):
+    month_index = dt.month - 1 + months
+    year, month = dt.year + month_index // 12, month_index % 12 + 1
+    day = min(day or dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+def next_occurrence(recurrence, details, anchor):
+    """Return the first occurrence of the rule strictly after ``anchor``, or None
+    if the rule is not recurring or its ``until`` date has passed."""
+    if recurrence not in RECURRING or anchor is None:
+        return None
+    details = details or {}
+    unit = details.get("unit", "days") if recurrence == "custom" else UNITS[recurrence]
+    try:
+        interval = max(int(details.get("interval") or 1), 1)
+    except (TypeError, ValueError):
+        interval = 1
+    local = timezone.localtime(anchor) if timezone.is_aware(anchor) else anchor
+
+    if unit == "months":
+        nxt = _add_months(local, interval, details.get("day_of_month"))
+    elif unit == "weeks" and details.get("weekdays"):
+        weekdays = {int(d) % 7 for d in details["weekdays"]}
+        anchor_week = local.date() - timedelta(days=local.weekday())
+        nxt = None
+        for offset in range(1, 7 * interval + 8):
+            candidate = local + timedelta(days=offset)
+            week = (candidate.date() - timedelta(days=candidate.weekday()) - anchor_week).days // 7
+            if candidate.weekday() in weekdays and week % interval == 0:
+                nxt = candidate
+                break
+        if nxt is None:
+            return None
+    elif unit == "weeks":
+        nxt = local + timedelta(weeks=interval)
+    else:
+        nxt = local + timedelta(days=interval)
+
+    until = details.get("until")
+    if until:
+        until = until if isinstance(until, date) else parse_date(str(until))
+        if until and nxt.date() > until:
+            return None
+    return nxt
+
+
+def _as_datetime(value):
+    """Coerce raw form values (views assign POST strings before saving)."""
+    if value is None or not isinstance(value, str):
+        return value
+    from .models import Task
+
+    value = Task._meta.get_field("due_date").to_python(value)
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def plan_next(task, completed_at=None):
+    """Return (next_run_at, start_date, due_date) of the successor of ``task``.
+
+    The successor's due date follows the rule from the task's due date (or its
+    completion time when undated), rolled forward past the completion time so a
+    late completion does not spawn already-overdue instances. If the task had a
+    start..due window, the successor appears when its own window opens;
+    otherwise it appears right away.
+    """
+    completed_at = completed_at or task.completed_at or timezone.now()
+    start_date, due_date = _as_datetime(task.start_date), _as_datetime(task.due_date)
+    anchor = due_date or completed_at
+    due = next_occurrence(task.recurrence, task.recurrence_details, anchor)
+    while due is not None and due <= completed_at:
+        due = next_occurrence(task.recurrence, task.recurrence_details, due)
+    if due is None:
+        return None, None, None
+
+    start = None
+    run_at = completed_at
+    if start_date and due_date and start_date < due_date:
+        start = due - (due_date - start_date)
+        run_at = max(start, completed_at)
+    return run_at, start, due
+
+
+def arm(task):
+    """Set ``next_run_at`` on a task that has just been completed (caller saves)."""
+    task.next_run_at = plan_next(task)[0] if task.recurrence in RECURRING else None
+
+
+def _successor(source, now):
+    _run_at, start, due = plan_next(source, source.completed_at or now)
+    if due is None:
+        return None
+    from .models import Task
+
+    return Task(
+        organization_id=source.organization_id,
+        project_id=source.project_id, outlet_id=source.outlet_id, team_id=source.team_id,
+        title=source.title, description=source.description, sop_content=source.sop_content,
+        task_type=source.task_type, priority=source.priority,
+        category_id=source.category_id, created_by_id=source.created_by_id,
+        start_date=start, due_date=due, points=source.points,
+        recurrence=source.recurrence, recurrence_details=source.recurrence_details,
+        needs_approval=source.needs_approval, tags=source.tags,
+        recurrence_source_id=source.id,
+    )
+
+
+def generate_due_instances(now=None, batch_size=BATCH_SIZE):
+    """Create the successor of every armed task whose ``next_run_at`` has passed.
+
+    Each batch is one SELECT over the ``next_run_at`` index, one bulk INSERT of
+    tasks, one of assignments and one UPDATE disarming the sources. Returns the
+    number of instances created.
+    """
+    from core.caching import bump_org_version
+    from core.search import index_objects
+    from core.stats import rebuild_outlet_stats
+    from .models import Task
+
+    now = now or timezone.now()
+    Assignment = Task.assigned_to.through
+    created = 0
+    touched_orgs = set()
+
+    while True:
+        sources = list(
+            Task.objects.filter(next_run_at__lte=now, is_trashed=False, recurrence__in=RECURRING)
+            .order_by("next_run_at")[:batch_size]
+        )
+        if not sources:
+            break
+        source_ids = [s.id for s in sources]
+
+        with transaction.atomic():
+            successors = [t for t in (_successor(s, now) for s in sources) if t is not None]
+            Task.objects.bulk_create(successors, ignore_conflicts=True)
+
+            wanted = {(t.recurrence_source_id, t.due_date) for t in successors}
+            new_ids = {
+                source_id: task_id
+                for task_id, source_id, due in Task.objects.filter(
+                    recurrence_source_id__in=source_ids
+                ).values_list("id", "recurrence_source_id", "due_date")
+                if (source_id, due) in wanted
+            }
+            Assignment.objects.bulk_create([
+                Assignment(task_id=new_ids[task_id], userprofile_id=user_id)
+                for task_id, user_id in Assignment.objects.filter(
+                    task_id__in=new_ids
+                ).values_list("task_id", "userprofile_id")
+            ], ignore_conflicts=True)
+
+            Task.objects.filter(id__in=source_ids).update(next_run_at=None)
+            index_objects(list(Task.objects.filter(id__in=new_ids.values())))
+
+        created += len(new_ids)
+        touched_orgs.update(s.organization_id for s in sources)
+
+    # bulk_create bypassed the save signals that maintain the stats.
+    for org_id in touched_orgs:
+        rebuild_outlet_stats(org_id, entity_types=["task"])
+        bump_org_version(org_id)
+    return created
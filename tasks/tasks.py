@@ -0,0 +1,23 @@
+"""
+Celery tasks for task enrichment.
+"""
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def enrich_tasks(task_ids):
+    """Write the AI summary, priority suggestion and delay prediction of the
+    given tasks (those still pending)."""
+    from tasks.enrichment import enrich_pending
+
+    return f"Enriched {enrich_pending(task_ids)} tasks"
+
+
+@shared_task(ignore_result=True)
+def enrich_stale_tasks():
+    """Enrich tasks whose queued job never ran (broker outage, worker crash)."""
+    from django.utils import timezone
+    from tasks.enrichment import STALE_AFTER, enrich_pending
+
+    written = enrich_pending(requested_before=timezone.now() - STALE_AFTER)
+    return f"Enriched {written} stale tasks"
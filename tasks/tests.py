@@ -1,3 +1,79 @@
+import importlib
+import warnings
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
 from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Organization, Permission, Role, UserProfile
+from .models import Task
+
+recurrence_tracking = importlib.import_module("tasks.migrations.0002_recurrence_tracking")
+
+
+class ArmCompletedSeriesTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org", code="ORG")
+        self.profile = UserProfile.objects.create(user=User.objects.create(username="owner"), organization=self.org)
+        self.now = timezone.now()
+
+    def _series(self, title, count, recurrence="daily", open_last=False):
+        interval = timedelta(days=7 if recurrence == "weekly" else 1)
+        tasks = []
+        for i in range(count, 0, -1):
+            due = self.now - interval * i
+            done = not (open_last and i == 1)
+            tasks.append(Task.objects.create(
+                organization=self.org, created_by=self.profile, title=title, recurrence=recurrence,
+                status="completed" if done else "todo", due_date=due,
+                completed_at=due - timedelta(hours=1) if done else None,
+            ))
+        return tasks
+
+    def test_arms_only_latest_instance_of_each_series(self):
+        daily = self._series("Open store", 30)
+        weekly = self._series("Count stock", 5, "weekly")
+
+        recurrence_tracking.arm_completed_series(apps, None)
+
+        armed = {t.pk: t.recurrence for t in Task.objects.filter(next_run_at__isnull=False)}
+        self.assertEqual(armed, {daily[-1].pk: "daily", weekly[-1].pk: "weekly"})
+
+    def test_series_with_open_instance_is_not_armed(self):
+        self._series("Clean shelves", 10, open_last=True)
+
+        recurrence_tracking.arm_completed_series(apps, None)
+
+        self.assertFalse(Task.objects.filter(next_run_at__isnull=False).exists())
+
+
+class TaskExportAsgiTests(TestCase):
+    def setUp(self):
+        org = Organization.objects.create(name="Org", code="ORG")
+        role = Role.objects.create(organization=org, name="Staff")
+        role.permissions.add(Permission.objects.get_or_create(
+            codename="view_tasks", defaults={"name": "View Tasks", "module": "tasks"},
+        )[0])
+        profile = UserProfile.objects.create(user=User.objects.create(username="staff"), organization=org, role=role)
+        Task.objects.bulk_create(
+            [Task(organization=org, created_by=profile, title=f"Task {i}") for i in range(1200)], batch_size=500,
+        )
+        session = SessionStore()
+        session["user_id"], session["current_org_id"] = profile.id, org.id
+        session.create()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    async def test_export_streams_async_iterator_under_asgi(self):
+        response = await self.async_client.get("/tasks/export/?format=csv")
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # Django warns when it has to buffer a sync iterator
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(b"".join(chunks).decode().count("\n"), 1201)
@@ -4,10 +4,15 @@ from . import views
 urlpatterns = [
     path("", views.task_list_view, name="task_list"),
     path("board/", views.task_board_view, name="task_board"),
+    path("board/column/<str:status>/", views.api_task_board_column, name="api_task_board_column"),
     path("calendar/", views.task_calendar_view, name="task_calendar"),
+    path("calendar/events/", views.api_task_calendar_events, name="api_task_calendar_events"),
+    path("export/", views.task_export_view, name="task_export"),
     path("create/", views.task_create_view, name="task_create"),
     path("<int:task_id>/", views.task_detail_view, name="task_detail"),
+    path("api/bulk/", views.api_task_bulk, name="api_task_bulk"),
     path("api/<int:task_id>/status/", views.api_task_status_update, name="api_task_status"),
     path("api/<int:task_id>/star/", views.api_task_star_toggle, name="api_task_star"),
+    path("api/<int:task_id>/ai/", views.api_task_ai, name="api_task_ai"),
     path("api/team/<int:team_id>/members/", views.api_team_members, name="api_team_members"),
 ]
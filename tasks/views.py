@@ -1,20 +1,62 @@
 """
 Tasks app views: list, board, calendar, create, detail, subtasks, steps.
 """
+import hashlib
 import json
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import condition
+from django.db.models import Count
 from django.views.decorators.csrf import csrf_exempt
 
-from core.views import get_current_org, get_current_profile, get_current_outlet, log_activity, paginate, require_perm
+from core import caching, export
+from core.search import filter_queryset
+from core.views import board_column_response, board_columns, cursor_paginate, get_current_org, get_current_profile, get_current_outlet, log_activity, require_perm
 from core.models import Outlet, Team, UserProfile
+from notifications.service import notify
 from projects.models import Project
+from . import bulk, enrichment, recurrence
+from . import export as task_export
 from .models import Task, TaskCategory, TaskStep, TaskComment, TaskAttachment
 
 
+def _filter_tasks(request, org, tasks):
+    """Apply the current outlet and the task list's GET filters; returns the
+    queryset and the filter values for the template."""
+    outlet = get_current_outlet(request)
+    if outlet:
+        tasks = tasks.filter(outlet=outlet)
+
+    filters = {
+        key: request.GET.get(key, "")
+        for key in ("status", "priority", "category", "project", "team", "assigned_to", "task_type", "search", "starred")
+    }
+    if filters["status"]:
+        tasks = tasks.filter(status=filters["status"])
+    if filters["priority"]:
+        tasks = tasks.filter(priority=filters["priority"])
+    if filters["category"]:
+        tasks = tasks.filter(category_id=filters["category"])
+    if filters["project"]:
+        tasks = tasks.filter(project_id=filters["project"])
+    if filters["team"]:
+        tasks = tasks.filter(team_id=filters["team"])
+    if filters["assigned_to"]:
+        tasks = tasks.filter(assigned_to__id=filters["assigned_to"])
+    if filters["task_type"]:
+        tasks = tasks.filter(task_type=filters["task_type"])
+    if filters["starred"]:
+        tasks = tasks.filter(is_starred=True)
+    if filters["search"]:
+        tasks = filter_queryset(tasks, filters["search"], "task", org, outlet)
+    return tasks, filters
+
+
 def task_list_view(request):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -28,44 +70,12 @@ def task_list_view(request):
         organization=org, is_trashed=False, parent__isnull=True
     ).select_related(
         "category", "project", "outlet", "team", "created_by", "created_by__user"
-    ).prefetch_related("assigned_to", "assigned_to__user")
+    ).with_list_stats()
 
-    outlet = get_current_outlet(request)
-    if outlet:
-        tasks = tasks.filter(outlet=outlet)
-
-    # Filters
-    status = request.GET.get("status", "")
-    priority = request.GET.get("priority", "")
-    category = request.GET.get("category", "")
-    project_id = request.GET.get("project", "")
-    team_id = request.GET.get("team", "")
-    assigned = request.GET.get("assigned_to", "")
-    task_type = request.GET.get("task_type", "")
-    search = request.GET.get("search", "")
+    tasks, filters = _filter_tasks(request, org, tasks)
     view_mode = request.GET.get("view", "list")
-    starred = request.GET.get("starred", "")
-
-    if status:
-        tasks = tasks.filter(status=status)
-    if priority:
-        tasks = tasks.filter(priority=priority)
-    if category:
-        tasks = tasks.filter(category_id=category)
-    if project_id:
-        tasks = tasks.filter(project_id=project_id)
-    if team_id:
-        tasks = tasks.filter(team_id=team_id)
-    if assigned:
-        tasks = tasks.filter(assigned_to__id=assigned)
-    if task_type:
-        tasks = tasks.filter(task_type=task_type)
-    if starred:
-        tasks = tasks.filter(is_starred=True)
-    if search:
-        tasks = tasks.filter(Q(title__icontains=search) | Q(description__icontains=search))
 
-    tasks = paginate(tasks, request)
+    tasks = cursor_paginate(tasks, request)
 
     categories = TaskCategory.objects.filter(organization=org, is_active=True)
     projects = Project.objects.filter(organization=org, is_active=True)
@@ -78,17 +88,14 @@ def task_list_view(request):
         "categories": categories, "projects": projects,
         "teams": teams, "members": members, "outlets": outlets,
         "view_mode": view_mode,
-        "filters": {
-            "status": status, "priority": priority, "category": category,
-            "project": project_id, "team": team_id, "assigned_to": assigned,
-            "task_type": task_type, "search": search, "starred": starred,
-        },
+        "filters": filters,
         "status_choices": Task.STATUS_CHOICES,
         "priority_choices": Task.PRIORITY_CHOICES,
     })
 
 
-def task_board_view(request):
+def task_export_view(request):
+    """Stream the filtered task list as CSV or XLSX (``?format=``)."""
     org = get_current_org(request)
     profile = get_current_profile(request)
     if not org or not profile:
@@ -96,29 +103,65 @@ def task_board_view(request):
     denied = require_perm(profile, "view_tasks")
     if denied:
         return denied
+    fmt = export.requested_format(request)
+    if not fmt:
+        return JsonResponse({"error": "Unknown export format"}, status=400)
+
+    tasks = Task.objects.filter(organization=org, is_trashed=False, parent__isnull=True)
+    tasks, _filters = _filter_tasks(request, org, tasks)
+    return export.export_response(request, task_export.COLUMNS, task_export.rows(tasks), "tasks", fmt)
+
 
+# status -> (column label, color)
+BOARD_COLUMNS = {
+    "todo": ("To Do", "#6b7280"),
+    "in_progress": ("In Progress", "#3b82f6"),
+    "review": ("In Review", "#a855f7"),
+    "completed": ("Completed", "#22c55e"),
+    "on_hold": ("On Hold", "#f97316"),
+}
+
+
+def _board_tasks(request, org):
     tasks = Task.objects.filter(
         organization=org, is_trashed=False, parent__isnull=True
-    ).select_related("category", "created_by", "created_by__user").prefetch_related("assigned_to", "assigned_to__user")
+    ).select_related("category", "created_by", "created_by__user").with_list_stats()
 
     outlet = get_current_outlet(request)
     if outlet:
         tasks = tasks.filter(outlet=outlet)
+    return tasks
 
-    columns = {
-        "todo": {"label": "To Do", "color": "#6b7280", "tasks": []},
-        "in_progress": {"label": "In Progress", "color": "#3b82f6", "tasks": []},
-        "review": {"label": "In Review", "color": "#a855f7", "tasks": []},
-        "completed": {"label": "Completed", "color": "#22c55e", "tasks": []},
-        "on_hold": {"label": "On Hold", "color": "#f97316", "tasks": []},
-    }
-    for t in tasks:
-        if t.status in columns:
-            columns[t.status]["tasks"].append(t)
+
+def task_board_view(request):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return redirect("login")
+    denied = require_perm(profile, "view_tasks")
+    if denied:
+        return denied
+
+    columns = board_columns(_board_tasks(request, org), "status", {
+        status: {"label": label, "color": color} for status, (label, color) in BOARD_COLUMNS.items()
+    })
 
     return render(request, "tasks/board.html", {"columns": columns})
 
 
+def api_task_board_column(request, status):
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    if not profile.has_perm("view_tasks"):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    if status not in BOARD_COLUMNS:
+        return JsonResponse({"error": "Unknown column"}, status=404)
+
+    return board_column_response(request, _board_tasks(request, org).filter(status=status), "tasks/board_cards.html")
+
+
 def task_calendar_view(request):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -128,21 +171,72 @@ def task_calendar_view(request):
     if denied:
         return denied
 
-    tasks = Task.objects.filter(
-        organization=org, is_trashed=False, parent__isnull=True, due_date__isnull=False
-    ).select_related("category").prefetch_related("assigned_to", "assigned_to__user")
+    return render(request, "tasks/calendar.html")
+
+
+def _calendar_range(request):
+    """The [start, end) window requested by the calendar, or None if missing,
+    malformed or longer than CALENDAR_MAX_RANGE_DAYS."""
+    bounds = []
+    for name in ("start", "end"):
+        raw = request.GET.get(name, "").replace(" ", "+")  # an unescaped UTC offset
+        try:
+            value = parse_datetime(raw) or datetime.combine(parse_date(raw), time.min)
+        except (TypeError, ValueError):
+            return None
+        bounds.append(value if timezone.is_aware(value) else timezone.make_aware(value))
+    start, end = bounds
+    if not start < end <= start + timedelta(days=settings.CALENDAR_MAX_RANGE_DAYS):
+        return None
+    return start, end
+
+
+def _calendar_feed_etag(request):
+    # The org's data version changes on every task write, so (version, outlet,
+    # range) identifies the feed's content without querying it.
+    org = get_current_org(request)
+    if not org:
+        return None
+    outlet = get_current_outlet(request)
+    key = "{}:{}:{}:{}".format(
+        caching.org_version(org.id), getattr(outlet, "id", 0),
+        request.GET.get("start", ""), request.GET.get("end", ""),
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+@condition(etag_func=_calendar_feed_etag)
+def api_task_calendar_events(request):
+    """Tasks due in the ?start=&end= window, for the calendar's event source."""
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    if not profile.has_perm("view_tasks"):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    window = _calendar_range(request)
+    if window is None:
+        return JsonResponse({"error": "Invalid start/end range"}, status=400)
 
+    tasks = Task.objects.filter(
+        organization=org, due_date__gte=window[0], due_date__lt=window[1],
+        is_trashed=False, parent__isnull=True,
+    )
     outlet = get_current_outlet(request)
     if outlet:
         tasks = tasks.filter(outlet=outlet)
 
+    statuses, priorities = dict(Task.STATUS_CHOICES), dict(Task.PRIORITY_CHOICES)
     events = [{
-        "id": t.id, "title": t.title, "start": t.due_date.isoformat(),
-        "color": t.priority_color, "status": t.get_status_display(),
-        "priority": t.get_priority_display(),
-    } for t in tasks]
-
-    return render(request, "tasks/calendar.html", {"events_json": json.dumps(events)})
+        "id": pk, "title": title, "start": due_date.isoformat(),
+        "color": Task.PRIORITY_COLORS.get(priority, "#6b7280"),
+        "status": statuses.get(status, status), "priority": priorities.get(priority, priority),
+    } for pk, title, due_date, status, priority in tasks.order_by("due_date").values_list(
+        "id", "title", "due_date", "status", "priority",
+    )]
+    response = JsonResponse(events, safe=False)
+    response["Cache-Control"] = "private, no-cache"
+    return response
 
 
 def task_create_view(request):
@@ -174,10 +268,13 @@ def task_create_view(request):
                 points=int(request.POST.get("points", 0) or 0),
                 recurrence=request.POST.get("recurrence", "none"),
                 needs_approval=request.POST.get("needs_approval") == "on",
+                ai_requested_at=timezone.now(),
             )
-            assigned_ids = request.POST.getlist("assigned_to")
-            if assigned_ids:
-                task.assigned_to.set(UserProfile.objects.filter(id__in=assigned_ids, organization=org))
+            assignees = list(UserProfile.objects.filter(
+                id__in=request.POST.getlist("assigned_to"), organization=org,
+            ).values_list("id", flat=True))
+            if assignees:
+                task.assigned_to.set(assignees)
 
             # Create steps
             step_titles = request.POST.getlist("step_title")
@@ -185,27 +282,18 @@ def task_create_view(request):
                 if st.strip():
                     TaskStep.objects.create(task=task, title=st.strip(), order=i)
 
-            # AI summary
-            from core.ai_engine import AIEngine
-            task.ai_summary = AIEngine.generate_summary({
-                "title": task.title, "description": task.description, "priority": task.priority,
-            })
-            task.ai_priority_suggestion = AIEngine.predict_priority(task.title, task.description).get("priority", "")
-            task.save(update_fields=["ai_summary", "ai_priority_suggestion"])
+            enrichment.enqueue([task.id])
 
             log_activity(org, profile, "created", "task", task.id, task.title)
 
-            from notifications.models import Notification
-            for assignee in task.assigned_to.all():
-                if assignee != profile:
-                    Notification.objects.create(
-                        organization=org, user=assignee,
-                        notification_type="task_assigned",
-                        title="New Task Assigned",
-                        message=f"You've been assigned: '{task.title}'",
-                        link=f"/tasks/{task.id}/",
-                        entity_type="task", entity_id=task.id,
-                    )
+            notify(
+                assignees, exclude=[profile], organization=org,
+                notification_type="task_assigned",
+                title="New Task Assigned",
+                message=f"You've been assigned: '{task.title}'",
+                link=f"/tasks/{task.id}/",
+                entity_type="task", entity_id=task.id,
+            )
 
             redirect_to = request.POST.get("redirect_to", "")
             if redirect_to == "project" and task.project_id:
@@ -241,6 +329,25 @@ def api_team_members(request, team_id):
     return JsonResponse(data, safe=False)
 
 
+def api_task_ai(request, task_id):
+    """The task's AI card, for the detail page to poll while enrichment is pending."""
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    if not profile.has_perm("view_tasks"):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    task = Task.objects.filter(id=task_id, organization=org).only(
+        "id", "ai_summary", "ai_priority_suggestion", "ai_delay_prediction", "ai_requested_at",
+    ).first()
+    if task is None:
+        return JsonResponse({"error": "Not found"}, status=404)
+    return JsonResponse({
+        "pending": task.ai_requested_at is not None,
+        "html": render_to_string("tasks/ai_summary.html", {"task": task}, request),
+    })
+
+
 def task_detail_view(request, task_id):
     org = get_current_org(request)
     profile = get_current_profile(request)
@@ -274,8 +381,10 @@ def task_detail_view(request, task_id):
 
             if task.status == "completed" and old_status != "completed":
                 task.completed_at = timezone.now()
+                recurrence.arm(task)
             elif task.status != "completed":
                 task.completed_at = None
+                task.next_run_at = None
 
             task.save()
             assigned_ids = request.POST.getlist("assigned_to")
@@ -327,11 +436,7 @@ def task_detail_view(request, task_id):
             return redirect("task_list")
 
         elif action == "ai_summary":
-            from core.ai_engine import AIEngine
-            task.ai_summary = AIEngine.generate_summary({
-                "title": task.title, "description": task.description, "priority": task.priority,
-            })
-            task.save(update_fields=["ai_summary"])
+            enrichment.request_refresh([task.id])
             return redirect("task_detail", task_id=task.id)
 
         elif action == "add_subtask":
@@ -360,6 +465,34 @@ def task_detail_view(request, task_id):
     })
 
 
+def api_task_bulk(request):
+    """POST {"action", "ids", "value"}: apply one change to many tasks (see tasks.bulk)."""
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+    org = get_current_org(request)
+    profile = get_current_profile(request)
+    if not org or not profile:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+    try:
+        data = json.loads(request.body)
+        action = data.get("action")
+        ids = [int(i) for i in data.get("ids") or []]
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({"error": "Invalid request body"}, status=400)
+    if action not in bulk.ACTIONS:
+        return JsonResponse({"error": "Unknown action"}, status=400)
+    if not ids or len(ids) > settings.BULK_TASK_LIMIT:
+        return JsonResponse({"error": f"Select between 1 and {settings.BULK_TASK_LIMIT} tasks"}, status=400)
+    if not profile.has_perm(bulk.ACTIONS[action]):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    try:
+        affected = bulk.apply(org, profile, action, ids, data.get("value"))
+    except bulk.BulkActionError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"success": True, "affected": affected})
+
+
 @csrf_exempt
 def api_task_status_update(request, task_id):
     if request.method == "POST":
@@ -376,8 +509,10 @@ def api_task_status_update(request, task_id):
             task.status = data.get("status", task.status)
             if task.status == "completed" and old_status != "completed":
                 task.completed_at = timezone.now()
+                recurrence.arm(task)
             elif task.status != "completed":
                 task.completed_at = None
+                task.next_run_at = None
             task.save()
             log_activity(org, profile, "status_changed", "task", task.id, task.title,
                         f"{old_status} → {task.status}")
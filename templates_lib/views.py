@@ -4,6 +4,7 @@ Templates Library views: browse, create, use templates.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.db.models import Q
 
+from core.search import filter_queryset
 from core.views import get_current_org, get_current_profile, log_activity, paginate, require_perm
 from core.models import Outlet, Team, UserProfile
 from .models import TemplateCategory, TemplateIndustry, TaskTemplate, TaskTemplateSubtask, ProjectTemplate
@@ -28,7 +29,7 @@ def template_library_view(request):
             Q(organization=org) | Q(organization__isnull=True), is_active=True
         )
         if search:
-            templates = templates.filter(Q(name__icontains=search) | Q(description__icontains=search))
+            templates = filter_queryset(templates, search, "project_template", org)
         templates = paginate(templates, request)
     else:
         templates = TaskTemplate.objects.filter(
@@ -36,7 +37,7 @@ def template_library_view(request):
         ).select_related("category").prefetch_related("industries")
 
         if search:
-            templates = templates.filter(Q(name__icontains=search) | Q(description__icontains=search))
+            templates = filter_queryset(templates, search, "task_template", org)
         if category_id:
             templates = templates.filter(category_id=category_id)
         if industry_id: